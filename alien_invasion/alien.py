@@ -15,11 +15,13 @@ class Alien(Sprite):
     
     Attributes:
         fleet (AlienFleet): The fleet to which this alien belongs.
-        x (float): The alien's horizontal position as a float.
-        y (float): The alien's vertical position as a float.
+        home (pygame.Rect): The alien's place in the formation, before the fleet's offset is applied.
+        rect (pygame.Rect): The alien's place on the screen, kept up to date by AlienFleet.sync_rects.
+        mask (pygame.mask.Mask): The alien image's shared collision mask.
 
     Methods:
-        update(self): Updates the alien's position.
+        place(self, x, y): Gives the alien a new place in the formation, so it can be reused in another fleet.
+        update(self, offset_x, offset_y): Moves the alien to its place in the formation at the given offset.
         check_edges(self): Checks if the alien has reached the top or bottom of the screen and returns true if so.
         draw_alien(self): Renders the alien.
     
@@ -35,23 +37,32 @@ class Alien(Sprite):
         self.boundaries = fleet.game.screen.get_rect()
         self.settings = fleet.game.settings
 
-        self.image = pygame.image.load(self.settings.alien_file)
-        self.image = pygame.transform.scale(self.image, (self.settings.alien_w, self.settings.alien_h))
+        self.image = fleet.game.assets.get_image(
+            self.settings.alien_file, (self.settings.alien_w, self.settings.alien_h))
+
+        self.mask = fleet.game.assets.get_mask(
+            self.settings.alien_file, (self.settings.alien_w, self.settings.alien_h))
 
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
+        self.home = self.rect.copy()
+
+    def place(self, x: int, y: int):
+        """
+        Gives the alien a new place in the formation, so it can be reused in another fleet.
+        """
+        self.home.x = x
+        self.home.y = y
+        self.rect.x = x
+        self.rect.y = y
         
-        self.y = float(self.rect.y)
-        self.x = float(self.rect.x)
-        
-    def update(self):
+    def update(self, offset_x: int = 0, offset_y: int = 0):
         """
-        Updates the alien's position.
+        Moves the alien to its place in the formation at the given offset.
         """
-        self.y += self.settings.fleet_speed * self.settings.fleet_direction
-        self.rect.x = self.x
-        self.rect.y = self.y
+        self.rect.x = self.home.x + offset_x
+        self.rect.y = self.home.y + offset_y
         
     def check_edges(self):
         """
@@ -1,38 +1,127 @@
+import math
 import pygame
+from collections import Counter
 from typing import TYPE_CHECKING
 from settings import Settings
 from alien import Alien
+from array_fleet import ArrayFleet
+from fleet_layer import FleetLayer
+from formations import level_formations
 
 if TYPE_CHECKING:
     from alien_invasion import AlienInvasion
+    from render_scale import RenderScaler
+
+class FormationBounds:
+    """
+    Keeps the top, bottom and right extents of the living aliens in formation space, so the fleet's
+    edges can be checked without looking at every alien.  Each extent is backed by a count of how
+    many aliens share it, so a kill only rescans the (few) distinct rows or columns when the last
+    alien on an edge dies.
+
+    Attributes:
+        top (int): The smallest top of any living alien, or None if there are none.
+        bottom (int): The largest bottom of any living alien, or None if there are none.
+        right (int): The largest right of any living alien, or None if there are none.
+
+    Methods:
+        add(self, rect): Counts an alien's rect into the extents.
+        remove(self, rect): Takes an alien's rect out of the extents.
+        clear(self): Forgets every alien.
+    """
+    def __init__(self):
+        self._tops = Counter()
+        self._bottoms = Counter()
+        self._rights = Counter()
+        self.top = None
+        self.bottom = None
+        self.right = None
+
+    def add(self, rect: pygame.Rect):
+        """
+        Counts an alien's rect into the extents.
+        """
+        self._tops[rect.top] += 1
+        self._bottoms[rect.bottom] += 1
+        self._rights[rect.right] += 1
+        self.top = rect.top if self.top is None else min(self.top, rect.top)
+        self.bottom = rect.bottom if self.bottom is None else max(self.bottom, rect.bottom)
+        self.right = rect.right if self.right is None else max(self.right, rect.right)
+
+    def remove(self, rect: pygame.Rect):
+        """
+        Takes an alien's rect out of the extents.
+        """
+        if self._discard(self._tops, rect.top):
+            self.top = min(self._tops, default=None)
+        if self._discard(self._bottoms, rect.bottom):
+            self.bottom = max(self._bottoms, default=None)
+        if self._discard(self._rights, rect.right):
+            self.right = max(self._rights, default=None)
+
+    def _discard(self, counts: Counter, value: int):
+        """
+        Lowers value's count, returning true if that was the last alien with it.
+        """
+        counts[value] -= 1
+        if counts[value] > 0:
+            return False
+        del counts[value]
+        return True
+
+    def clear(self):
+        """
+        Forgets every alien.
+        """
+        self.__init__()
+
 
 class AlienFleet:
     """
     Represents the fleet of aliens in the game.  The AlienFleet class is responsible for:
     -  Creating and managing a group of Alien instances.
-    -  Calculating the size and offsets for positioning the alien fleet.
-    -  Creating the rectangular formation of aliens.
+    -  Laying the aliens out in each level's formation.
     -  Updating the fleet's movement and checking for edge collisions.
     -  Drawing the entire fleet on the screen.
     -  Checking for collisions between the fleet and other game elements.
     -  Checking if the fleet has reached the right edge of the screen.
     -  Checking if the fleet has been destroyed.
 
+    The fleet moves as a rigid block, so instead of moving every alien each frame the fleet keeps a
+    single formation offset, and each alien keeps its place in the formation (its home rect).
+    Edge bouncing and the right-edge check only look at the FormationBounds, and the aliens' screen
+    rects are only brought up to date when something needs them (drawing and brute-force collisions).
+
+    Each level's formation comes from settings.formations, and its layout is worked out once by the
+    Formation and reused.  Aliens that die or are cleared away at the end of a level are kept and placed
+    again when the next fleet is made, so a new level only moves aliens rather than making new ones.
+
+    When settings.fleet_layer is set, the fleet is drawn through a FleetLayer: one pre-rendered
+    surface of the whole formation, blitted once per frame.
+
+    When settings.fleet_mode is 'array', the fleet is stored in an ArrayFleet instead of a
+    sprite group, so movement, edge checks and collisions run as vectorized NumPy operations.
+
 
     Methods:
         __init__(self, game): Initializes the fleet.
-        create_fleet(self): Creates the alien fleet.
-        _create_rectangle_fleet(self, alien_w, alien_h, fleet_w, fleet_h, x_offset, y_offset): Creates a rectangular formation of aliens.
-        calculate_offsets(self, alien_h, fleet_h): Calculates the x and y offsets to center the fleet.
-        calculate_fleet_size(self, alien_w, screen_w, alien_h, screen_h): Calculates the width and height of the fleet.
-        _create_alien(self, current_x, current_y): Creates a single alien and adds it to the fleet.
+        create_fleet(self): Creates the alien fleet in the current level's formation.
+        _add_aliens(self, homes): Adds an alien at each home, reusing spare aliens where there are any.
         _check_fleet_edges(self): Checks if any alien has reached the top or bottom edge of the screen.
         _drop_alien_fleet(self): Moves the entire fleet right when colliding with the top or bottom edges of the screen.
         update_fleet(self): Updates the fleet's position and checks for edge collisions.
         draw(self): Renders the fleet.
+        get_rects(self): Returns the rect of every alien, for the renderer's dirty rects.
+        draw_scaled(self, scaler): Renders the fleet through a RenderScaler.
         check_collisions(self, other_group): Checks for collisions between the aliens and the ship/bullets.
+        screen_centers(self, aliens): Returns the screen centre of each alien.
         check_fleet_right(self): Checks if the fleet has reached the right edge of the screen, if it does, reset the level and have the player lose a life.
         check_destroyed_status(self): Checks if the fleet has been destroyed.
+        empty(self): Removes every alien and moves the formation back to its starting position.
+        pixel_offset(self): Returns the formation offset rounded to whole pixels.
+        sync_rects(self): Brings every alien's screen rect up to date with the formation offset.
+        get_state(self): Returns the living aliens' homes and the formation offset.
+        set_state(self, state): Rebuilds the fleet from get_state's result.
     """
     def __init__(self, game: 'AlienInvasion'):
         """
@@ -40,130 +129,202 @@ class AlienFleet:
         """
         self.game = game
         self.settings = game.settings
-        self.fleet = pygame.sprite.Group()
+        self.array_mode = self.settings.fleet_mode == 'array'
+        if self.array_mode:
+            self.fleet = ArrayFleet(self)
+        else:
+            self.fleet = pygame.sprite.Group()
+        self.bounds = FormationBounds()
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self._synced_offset = None
+        self.layer = FleetLayer(self) if self.settings.fleet_layer else None
+        self.formations = level_formations(self.settings)
+        self._spare = []
+        game.broadphase.register_formation(self.fleet, self)
 
-    def create_fleet(self):
+    def empty(self):
         """
-        Creates the fleet.
+        Removes every alien and moves the formation back to its starting position.
         """
-        alien_w = self.settings.alien_w
-        alien_h = self.settings.alien_h
-        screen_w = self.settings.screen_w
-        screen_h = self.settings.screen_h
-
-        fleet_w, fleet_h = self.calculate_fleet_size(alien_w, screen_w, alien_h, screen_h)
-        x_offset, y_offset = self.calculate_offsets(alien_h, fleet_h)
-
-        self._create_rectangle_fleet(alien_w, alien_h, fleet_w, fleet_h, x_offset, y_offset)
+        if not self.array_mode:
+            self._spare.extend(self.fleet)
+        self.fleet.empty()
+        self.bounds.clear()
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self._synced_offset = None
+        self.game.broadphase.invalidate()
+        if self.layer:
+            self.layer.invalidate()
 
-    def _create_rectangle_fleet(self, alien_w, alien_h, fleet_w, fleet_h, x_offset, y_offset):
+    def pixel_offset(self):
         """
-        Creates a rectangular formation of aliens.
-
-        Args:
-            alien_w (int): The width of a single alien.
-            alien_h (int): The height of a single alien.
-            fleet_w (int): The number of aliens in a row.
-            fleet_h (int): The number of rows in the fleet.
-            x_offset (int): The horizontal offset for the fleet's starting position.
-            y_offset (int): The vertical offset for the fleet's starting position.
+        Returns the formation offset rounded to whole pixels, the way pygame.Rect rounds positive floats.
         """
-        for col in range(fleet_h):
-            for row in range(fleet_w):
-                current_x = alien_w * col + x_offset
-                current_y = alien_h * row + y_offset
-                if col % 2 == 0 or row % 2 == 0:
-                    continue
-                self._create_alien(current_x, current_y)
+        return math.floor(self.offset_x + 0.5), math.floor(self.offset_y + 0.5)
 
-    def calculate_offsets(self, alien_h, fleet_h):
+    def sync_rects(self):
         """
-        Calculates the x and y offsets to center the fleet.
+        Brings every alien's screen rect up to date with the formation offset, if it has moved since the last sync.
+        """
+        offset = self.pixel_offset()
+        if self.array_mode or offset == self._synced_offset:
+            return
+        self.fleet.update(*offset)
+        self._synced_offset = offset
 
+    def get_state(self):
+        """
+        Returns the living aliens' homes, in fleet order, and the formation offset.
         """
-        half_screen = self.settings.screen_h // 2
-        fleet_vertical_space = fleet_h * alien_h
-        x_offset = 0
-        y_offset = int((half_screen - fleet_vertical_space) // 2)
-        return x_offset, y_offset
+        return {
+            'homes': [(alien.home.x, alien.home.y) for alien in self.fleet],
+            'offset': (self.offset_x, self.offset_y),
+        }
 
-    def calculate_fleet_size(self, alien_w, screen_w, alien_h, screen_h):
+    def set_state(self, state: dict):
         """
-        Calculates the width and height of the fleet.
+        Rebuilds the fleet from get_state's result.
         """
-        fleet_w = ((screen_w / 1.5) // alien_w)
-        fleet_h = ((screen_h / 2) // alien_h)
+        self.empty()
+        self._add_aliens(state['homes'])
+        self.offset_x, self.offset_y = state['offset']
 
-        if fleet_w % 2 == 0:
-            fleet_w -= 1
-        else:
-            fleet_w -= 2
-        if fleet_h % 2 == 0:
-            fleet_h -= 1
-        else:
-            fleet_h -= 2
+    def create_fleet(self):
+        """
+        Creates the fleet in the current level's formation.
+        """
+        settings = self.settings
+        formation = self.formations[(self.game.game_stats.level - 1) % len(self.formations)]
+        homes = formation.layout(settings.screen_w, settings.screen_h, settings.alien_w, settings.alien_h)
 
-        return int(fleet_w), int(fleet_h)
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self._add_aliens(homes)
+        self.game.broadphase.invalidate()
+        if self.layer:
+            self.layer.invalidate()
 
-    def _create_alien(self, current_x: int, current_y: int):
+    def _add_aliens(self, homes):
         """
-        Creates a single alien and adds it to the fleet.
+        Adds an alien at each home, reusing spare aliens before making new ones.
 
         Args:
-            current_x (int): The horizontal position of the alien.
-            current_y (int): The vertical position of the alien.
+            homes (sequence): The x and y of each alien's place in the formation.
         """
-        new_alien = Alien(self, current_x, current_y)
-        self.fleet.add(new_alien)
+        alien_w = self.settings.alien_w
+        alien_h = self.settings.alien_h
+        if self.array_mode:
+            self.fleet.add_many([x for x, _ in homes], [y for _, y in homes])
+        else:
+            spare = self._spare
+            aliens = []
+            for x, y in homes:
+                if spare:
+                    alien = spare.pop()
+                    alien.place(x, y)
+                else:
+                    alien = Alien(self, x, y)
+                aliens.append(alien)
+            self.fleet.add(aliens)
+        for x, y in homes:
+            self.bounds.add(pygame.Rect(x, y, alien_w, alien_h))
+        self._synced_offset = None
 
     def _check_fleet_edges(self):
         """
-        Checks if any alien has reached the edge of the screen, and restarts the level if so.
+        Checks if any alien has reached the top or bottom edge of the screen, and drops the fleet if so.
         """
-        alien: Alien
-        for alien in self.fleet:
-            if alien.check_edges():
-                self._drop_alien_fleet()
-                self.settings.fleet_direction *= -1
-                break
+        if self.bounds.top is None:
+            return
+        offset_y = self.pixel_offset()[1]
+        if self.bounds.bottom + offset_y >= self.settings.screen_h or self.bounds.top + offset_y <= 0:
+            self._drop_alien_fleet()
+            self.settings.fleet_direction *= -1
 
     def _drop_alien_fleet(self):
         """
         Moves the entire fleet right when colliding with the top or bottom edges of the screen.
         """
-        for alien in self.fleet:
-            alien.x += self.settings.fleet_drop_speed
+        self.offset_x += self.settings.fleet_drop_speed
 
     def update_fleet(self):
         """
         Updates the fleet's position and checks for edge collisions.
         """
         self._check_fleet_edges()
-        self.fleet.update()
+        self.offset_y += self.settings.fleet_speed * self.settings.fleet_direction
 
     def draw(self):
         """
         Renders the fleet.
         """
+        if self.layer:
+            self.layer.draw()
+            return
+        if self.array_mode:
+            self.fleet.draw()
+            return
+        self.sync_rects()
         alien: 'Alien'
         for alien in self.fleet:
             alien.draw_alien()
 
+    def get_rects(self):
+        """
+        Returns the rect of every alien, for the renderer's dirty rects.
+        """
+        if self.layer:
+            return [self.layer.get_rect()]
+        return self._alien_rects()
+
+    def _alien_rects(self):
+        """
+        Returns every alien's screen rect.
+        """
+        if self.array_mode:
+            return self.fleet.rects()
+        self.sync_rects()
+        return [alien.rect for alien in self.fleet]
+
+    def draw_scaled(self, scaler: 'RenderScaler'):
+        """
+        Renders the fleet through a RenderScaler, with the alien image pre-scaled to its render scale.
+        """
+        scaler.draw(self.settings.alien_file, (self.settings.alien_w, self.settings.alien_h), self._alien_rects())
+
     def check_collisions(self, other_group):
         """
         Checks for collisions between the aliens and the ship/bullets.
         """
-        return pygame.sprite.groupcollide(self.fleet, other_group, True, True)
+        if self.array_mode:
+            collisions = self.fleet.groupcollide(other_group, True)
+        else:
+            collisions = self.game.broadphase.groupcollide(self.fleet, other_group, True, True)
+        for alien in collisions:
+            self.bounds.remove(alien.home)
+            if self.layer:
+                self.layer.remove(alien.home)
+        if not self.array_mode:
+            self._spare.extend(collisions)
+        return collisions
+
+    def screen_centers(self, aliens):
+        """
+        Returns the screen centre of each alien, worked out from its home and the formation offset,
+        since the aliens' rects are only synced when something needs them.
+        """
+        offset_x, offset_y = self.pixel_offset()
+        return [(alien.home.centerx + offset_x, alien.home.centery + offset_y) for alien in aliens]
 
     def check_fleet_right(self):
         """
         Checks if the fleet has reached the right edge of the screen, if it does, reset the level and have the player lose a life.
         """
-        alien: Alien
-        for alien in self.fleet:
-            if alien.rect.right >= self.settings.screen_w:
-                return True
-        return False
+        if self.bounds.right is None:
+            return False
+        return self.bounds.right + self.pixel_offset()[0] >= self.settings.screen_w
 
     def check_destroyed_status(self):
         """
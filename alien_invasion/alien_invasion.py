@@ -1,21 +1,45 @@
+import argparse
 import sys
+import time
 import pygame
+from pathlib import Path
 from settings import Settings
-from game_stats import GameStats
-from ship import ship
-from arsenal import Arsenal
-# from alien import Alien
-from alien_fleet import AlienFleet
-from time import sleep
 from button import Button
 from hud import HUD
+from asset_cache import AssetCache
+from renderer import Renderer
+from simulation import Simulation, FrameInput
+from profiler import FrameProfiler, ProfilerOverlay, StartupTimer
+from replay import Recorder
+from score_store import ScoreStore
+from audio import make_audio
+from game_state import GameStateMachine
+from render_scale import RenderScaler, ScaleGovernor
+from profile_watcher import ProfileWatcher
+from particles import ParticleSystem
+from starfield import Starfield
 
 class AlienInvasion:
     """
-    The class that runs basically everything about this game.
+    The class that runs basically everything about this game.  The game rules themselves live in
+    Simulation; this class owns the window, sounds, HUD and play button, turns key presses into
+    FrameInputs, and reacts to each StepResult.
 
     Attributes:
         event: the event that is fired.
+        sim (Simulation): The game being played.
+        inputs (FrameInput): The input handed to the next simulation step.
+        audio (AudioManager): Plays the laser and impact sounds, or a NullAudio when audio is off.
+        particles (ParticleSystem): The debris thrown out by destroyed aliens.
+        starfield (Starfield): The stars scrolling over the background.
+        startup (StartupTimer): Times startup up to the first frame, then None.
+        states (GameStateMachine): Whether the game is in the menu, playing, or pausing, timed on frame time.
+        frames_skipped (int): How many frames weren't drawn because the simulation was catching up.
+        scaler (RenderScaler): Draws the world at settings.render_scale when it is below 1.
+        governor (ScaleGovernor): Adjusts the render scale to hold settings.FPS when settings.render_scale_governor is set.
+        recorder (Recorder): Records every step's inputs when the game is started with a record path. None otherwise.
+        profile_watcher (ProfileWatcher): Reloads the settings profile between frames when it changes. None without a profile
+            or while recording.
     Methods: 
         run_game(self): Allows the game to run and function, and sets framerate .
         _check_events(self): Makes sure the game properly closes when the user closes the game, and checks for
@@ -26,42 +50,80 @@ class AlienInvasion:
             K_down: Ditto, but down.
             K_Space: Plays a sound when pressed and makes the ship fire a bullet.
             K_q: exits out of the game.
+        _quit(self): Saves the scores and any recording, and exits.
         _check_keyup_event(self, event): Checks if the key is not being pressed. if it isn't pressed, keep the ship completely still.
+        _check_profiler_keys(self, event): Handles the profiler keys, which work in and out of a game. Keys:
+            K_F3: shows or hides the profiler overlay.
+            K_F4: writes the profiler's frame timings to a CSV file.
     """
-    def __init__(self):
+    def __init__(self, settings: Settings = None, record_path=None, profile_path=None):
         """
         Sets the display resolution and name of the window, as well as ensures the program runs. 
         Runs at the number of fps that is displayed in settings.py. 
+
+        Args:
+            settings (Settings): The settings to play with. A default Settings is made if None.
+            record_path (str or Path): Where to record the session for replay.py. Nothing is recorded if None.
+            profile_path (str or Path): A settings profile, already loaded, to reload whenever it is edited.  It isn't
+                reloaded while recording, since a recording only holds the settings it started with.
         """
+        self.startup = StartupTimer()
         pygame.init()
-        self.settings = Settings()
-        self.settings.initialize_dynamic_settings()
+        if settings is None:
+            settings = Settings()
+            settings.initialize_dynamic_settings()
+        self.settings = settings
         
     
 
         self.screen = pygame.display.set_mode((self.settings.screen_w, self.settings.screen_h))
         pygame.display.set_caption(self.settings.name)
-
-        self.bg = pygame.image.load(self.settings.bg_file)
-        self.bg = pygame.transform.scale(self.bg, (self.settings.screen_w, self.settings.screen_h))
-
-        self.game_stats = GameStats(self)
+        self.startup.mark('display')
+
+        self.assets = AssetCache(self.settings.asset_cache_size, self.settings.asset_disk_cache)
+        self.bg = self.assets.get_image(
+            self.settings.bg_file, (self.settings.screen_w, self.settings.screen_h), AssetCache.CONVERT_OPAQUE)
+        self.starfield = Starfield(self, self.bg)
+        self.renderer = Renderer(self, self.starfield.surface)
+        self.scaler = RenderScaler(self)
+        self.startup.mark('background')
+
+        self.sim = Simulation(self.settings, self.screen, self.assets, ScoreStore.from_settings(self.settings))
+        self.startup.mark('simulation')
+        self.game_stats = self.sim.game_stats
+        self.ship = self.sim.ship
+        self.alien_fleet = self.sim.alien_fleet
+        self.inputs = FrameInput()
+        self.recorder = Recorder(record_path, self.settings) if record_path else None
         self.HUD = HUD(self)
+        self.particles = ParticleSystem(self)
+        self.startup.mark('hud')
 
         self.running = True
         self.clock = pygame.time.Clock()
+        self.states = GameStateMachine(self.settings)
+        self.frames_skipped = 0
+
+        self.audio = make_audio(self.settings)
+        self.audio.register('laser', self.settings.laser_sound, self.settings.laser_channels,
+                            priority=0, fadeout_ms=300)
+        self.audio.register('impact', self.settings.impact_sound, self.settings.impact_channels,
+                            priority=1, volume=0.7, fadeout_ms=500)
+        # The sounds aren't needed for the first frame, so they are decoded while it is drawn.
+        self.audio.load_in_background()
+        self.startup.mark('audio')
 
-        pygame.mixer.init()
-        self.laser_sound = pygame.mixer.Sound(self.settings.laser_sound)
-
-        self.ship = ship(self, Arsenal(self))
-        self.alien_fleet = AlienFleet(self)
-        self.alien_fleet.create_fleet()
         self.play_button = Button(self, 'Play')
-        self.game_active = False
 
-        self.impact_sound = pygame.mixer.Sound(self.settings.impact_sound)
-        self.impact_sound.set_volume(0.7)
+        self.profiler = FrameProfiler(self.settings.profiler_capacity)
+        self.sim.profiler = self.profiler
+        self.profiler_overlay = ProfilerOverlay(self, self.profiler)
+        self.governor = ScaleGovernor(self.scaler) if self.settings.render_scale_governor else None
+        if profile_path and record_path:
+            print(f'Not reloading {profile_path} while recording')
+            profile_path = None
+        self.profile_watcher = ProfileWatcher(self.settings, profile_path) if profile_path else None
+        self.startup.mark('ui')
        
 
         
@@ -71,98 +133,162 @@ class AlienInvasion:
     def run_game(self):
         """
         Allows the game to run and function, and sets framerate . Also displays the game BG.
+
+        The simulation runs at a fixed settings.sim_rate steps per second, whatever the frame rate: each
+        frame's time goes into an accumulator and as many whole steps as it holds are run, at most
+        settings.max_catchup_steps per frame.  When the steps still can't catch up, drawing is skipped for up
+        to settings.max_render_skip frames in a row; after that the frame is drawn and the backlog dropped.
         """
+        profiler = self.profiler
+        settings = self.settings
+        step_time = 1 / settings.sim_rate
+        accumulator = 0.0
+        skipped = 0
+        dt = 0.0
         while self.running:
+            profiler.start()
             self._check_events()
-            if self.game_active:
-                self.ship.update()
-                self.alien_fleet.update_fleet()
-                self._check_collisions()
-            self._update_screen()
-            self.clock.tick(self.settings.FPS)
-
-    def _check_collisions(self):
+            if self.profile_watcher:
+                self.profile_watcher.poll()
+            profiler.mark(FrameProfiler.EVENTS)
+
+            steps = 0
+            while accumulator >= step_time and steps < settings.max_catchup_steps:
+                if self.states.playing:
+                    self._step()
+                accumulator -= step_time
+                steps += 1
+            profiler.mark(FrameProfiler.COLLISIONS)
+            self.audio.update()
+            self.particles.update(min(dt, 0.25))
+            self.starfield.update(min(dt, 0.25))
+
+            behind = accumulator >= step_time
+            if behind and skipped < settings.max_render_skip:
+                skipped += 1
+                self.frames_skipped += 1
+            else:
+                if behind:
+                    accumulator %= step_time
+                skipped = 0
+                self._update_screen()
+            profiler.mark(FrameProfiler.SCREEN)
+            if self.startup:
+                self._finish_startup()
+            if self.governor:
+                self.governor.record(profiler.current_ms())
+
+            dt = self.clock.tick(settings.FPS) / 1000
+            # A long stall (the window being dragged, say) shouldn't turn into a burst of catch-up steps.
+            accumulator += min(dt, 0.25)
+            self.states.update(dt)
+            profiler.mark(FrameProfiler.TICK)
+            profiler.end_frame()
+
+    def _finish_startup(self):
         '''
-        Checks the ship, aliens and the bottom of the screen, as well as the collisions of projectiles.
+        Records the first frame in the startup timings, and prints them if settings.startup_report is set.
         '''
-        if self.ship.check_collisions(self.alien_fleet.fleet):
-            self._check_game_status()
+        self.startup.mark('first_frame')
+        if self.settings.startup_report:
+            print(self.startup.report())
+            print(f'  asset cache: {self.assets.stats()}')
+        self.startup = None
 
-        if self.alien_fleet.check_fleet_right():
-            self._check_game_status()
+    @property
+    def game_active(self):
+        return self.sim.game_active
 
-        collisions = self.alien_fleet.check_collisions(self.ship.arsenal.arsenal)
+    def _step(self):
+        '''
+        Advances the simulation by one step and reacts to what happened.
+        '''
+        if self.recorder:
+            self.recorder.record(self.inputs)
+        result = self.sim.step(self.inputs)
+        self.inputs.fire = False
+
+        if result.fired:
+            self.audio.play('laser')
 
-        if collisions:
-            self.impact_sound.play()
-            self.impact_sound.fadeout(500)
-            self.game_stats.update(collisions)
+        if result.collisions:
+            self.audio.play('impact')
+            self.particles.burst(result.kill_positions)
             self.HUD.update_scores()
-        
-        if self.alien_fleet.check_destroyed_status():
-            self._reset_level()
-            self.settings.increase_difficulty()
 
-            self.game_stats.update_level()
+        if result.level_cleared:
             self.HUD.update_level()
-
-
-        
-    def _check_game_status(self):
-        """
-        Checks the status of the game.  If the player has ships left when level restarts, resets the level.
-        If the player has no ships left, stops the game.
-        """
-        if self.game_stats.ships_left > 0:
-            self.game_stats.ships_left -= 1
-            self._reset_level()
-            sleep(0.5)
-        else:
-            self.game_active = False
-        print(self.game_stats.ships_left)
-        
-        
-    
-    def _reset_level(self):
-
-        """
-        Destroys remaining bullets on screen, returns the ship to its starting position, and re-generates the fleet.
-        """
-
-        self.ship.arsenal.arsenal.empty()
-        self.alien_fleet.fleet.empty()
-        self.alien_fleet.create_fleet()
+            self.states.level_cleared()
+
+        if result.life_lost:
+            self.states.life_lost()
+        if result.game_over:
+            self.game_stats.record_game()
+            self.states.game_over()
+        # Reacting to the step counts as part of its collision checks, not the next step's ship update.
+        self.profiler.mark(FrameProfiler.COLLISIONS)
     
     def restart_game (self):
         """
         When the play button is pressed, this resets the stats, score, centers the ship,
         and hides the mouse.
         """
-
-        self.settings.initialize_dynamic_settings()
-
-        self.game_stats.reset_stats()
+        self.sim.restart()
+        self.states.start_game()
+        if self.recorder:
+            self.recorder.mark_restart()
         self.HUD.update_scores()
-        self._reset_level()
-        self.ship._center_ship()
-        self.game_active = True
         pygame.mouse.set_visible(False)
 
 
     def _update_screen(self):
         '''
          displays everything on the screen and updates anything on the screen to its new position.
+         Only the areas that changed are redrawn, see Renderer.  Below a render scale of 1 the world is
+         drawn through the RenderScaler instead.
         '''
-        self.screen.blit(self.bg, (0,0))
+        in_menu = self.states.state == GameStateMachine.MENU
+        if self.scaler.surface is not None:
+            self._update_screen_scaled(in_menu)
+            return
+
+        rects = (self.ship.get_rects() + self.alien_fleet.get_rects() + self.particles.get_rects()
+                 + self.HUD.get_rects() + self.profiler_overlay.get_rects())
+        if in_menu:
+            rects += self.play_button.get_rects()
+        self.renderer.begin_frame(rects, self.starfield.take_rects())
+
         self.ship.draw()
 
-        if not self.game_active:
+        if in_menu:
             self.play_button.draw()
             pygame.mouse.set_visible(True)
 
         self.alien_fleet.draw()
+        self.particles.draw()
+        self.HUD.draw()
+        self.profiler_overlay.draw()
+        self.renderer.present()
+
+    def _update_screen_scaled(self, in_menu):
+        '''
+        Draws the world into the RenderScaler's internal surface, upscales it to the window, and draws the
+        HUD, play button and profiler overlay on top at the window's resolution.
+        '''
+        self.scaler.begin()
+        self.starfield.draw(self.scaler.surface, self.scaler.scale)
+        self.ship.draw_scaled(self.scaler)
+        self.alien_fleet.draw_scaled(self.scaler)
+        self.particles.draw(self.scaler.surface, self.scaler.scale)
+        self.scaler.finish()
+
+        if in_menu:
+            self.play_button.draw()
+            pygame.mouse.set_visible(True)
         self.HUD.draw()
-        pygame.display.flip()
+        self.profiler_overlay.draw()
+        self.renderer.request_full_redraw()
+        self.renderer.present()
 
 
     def _check_events(self):
@@ -171,21 +297,24 @@ class AlienInvasion:
         '''
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                self.running = False
-                self.game_stats.save_scores()
-                pygame.quit()
-                sys.exit()
+                self._quit()
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_F3, pygame.K_F4):
+                self._check_profiler_keys(event)
             elif event.type == pygame.KEYDOWN and self.game_active == True:
                 self._check_keydown_event(event)
             elif event.type == pygame.KEYUP:
                 self._check_keyup_event(event)
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 self._check_button_clicked()
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                self.renderer.request_full_redraw()
 
     def _check_button_clicked(self):
         """
         Checks if the play button is clicked and starts the game if it is.
         """
+        if self.states.state != GameStateMachine.MENU:
+            return
         mouse_pos = pygame.mouse.get_pos()
         if self.play_button.check_clicked(mouse_pos):
             self.restart_game()
@@ -199,42 +328,80 @@ class AlienInvasion:
         Keys:
             K_Up: fires an event that makes the ship move up.
             K_Down: Ditto, but down.
-            K_Space: Plays a sound when pressed and makes the ship fire a bullet.
+            K_Space: Plays a sound when pressed and makes the ship fire a bullet.  Ignored during the pauses
+                and in the menu, so a shot can't be held back to go off the moment a pause ends.
             K_q: exits out of the game.
         '''
         if event.key == pygame.K_UP:
-            self.ship.moving_up = True
+            self.inputs.up = True
         elif event.key == pygame.K_DOWN:
-            self.ship.moving_down = True
+            self.inputs.down = True
         
         elif event.key == pygame.K_SPACE:
-            if self.ship.fire():
-                self.laser_sound.play()
-                self.laser_sound.fadeout(300)
+            self.inputs.fire = self.states.playing
                 
         elif event.key == pygame.K_q:
-            self.running = False
-            self.game_stats.save_scores()
-            pygame.quit()
-            sys.exit()
+            self._quit()
+
+    def _quit(self):
+        '''
+        Records the game in progress, makes sure the scores and any recording are on disk, and exits.
+        '''
+        self.running = False
+        if self.game_active:
+            self.game_stats.record_game()
+        self.game_stats.save_scores()
+        if self.recorder:
+            self.recorder.close()
+        pygame.quit()
+        sys.exit()
+
+    def _check_profiler_keys(self, event):
+        '''
+        Handles the profiler keys, which work in and out of a game.
+
+        Keys:
+            K_F3: shows or hides the profiler overlay.
+            K_F4: writes the profiler's frame timings to a CSV file.
+        '''
+        if event.key == pygame.K_F3:
+            self.profiler_overlay.toggle()
+        elif event.key == pygame.K_F4:
+            path = Path.cwd() / f'profile_{time.strftime("%Y%m%d_%H%M%S")}.csv'
+            self.profiler.dump_csv(path)
+            print(f'Wrote frame profile to {path}')
 
     def _check_keyup_event(self, event):
         '''
         Checks if the key is not being pressed. if it isn't pressed, keep the ship completely still.
         '''
-        if event.key == pygame.K_RIGHT:
-            self.ship.moving_right = False
-        elif event.key == pygame.K_LEFT:
-            self.ship.moving_left = False
-        elif event.key == pygame.K_UP:
-            self.ship.moving_up = False
+        if event.key == pygame.K_UP:
+            self.inputs.up = False
         elif event.key == pygame.K_DOWN:
-            self.ship.moving_down = False
+            self.inputs.down = False
 
 
                     
 
 
 if __name__ == '__main__':
-    ai = AlienInvasion()
+    parser = argparse.ArgumentParser(description='Play Alien Invasion.')
+    parser.add_argument('--record', metavar='PATH', help='record the session for replay.py')
+    parser.add_argument('--startup-report', action='store_true', help='print how long each phase of startup took')
+    parser.add_argument('--render-scale', type=float, help='draw the world at this fraction of the window size')
+    parser.add_argument('--auto-scale', action='store_true', help='lower or raise the render scale to hold the frame rate')
+    parser.add_argument('--profile', metavar='PATH', help='load settings from a TOML or JSON profile, reloading it when it changes unless recording')
+    args = parser.parse_args()
+
+    settings = Settings()
+    settings.initialize_dynamic_settings()
+    if args.profile:
+        settings.load_profile(args.profile)
+    if args.startup_report:
+        settings.startup_report = True
+    if args.render_scale:
+        settings.render_scale = args.render_scale
+    if args.auto_scale:
+        settings.render_scale_governor = True
+    ai = AlienInvasion(settings, record_path=args.record, profile_path=args.profile)
     ai.run_game()
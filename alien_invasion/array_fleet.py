@@ -0,0 +1,277 @@
+import numpy as np
+import pygame
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from alien_fleet import AlienFleet
+
+
+def round_half_away(values):
+    """
+    Rounds like pygame.Rect does when it is given a float, half away from zero.
+    """
+    return np.trunc(values + np.copysign(0.5, values)).astype(np.int64)
+
+
+class FleetSlot:
+    """
+    A lightweight stand-in for an Alien sprite in an ArrayFleet.  FleetSlots are handed out
+    when the fleet is iterated and as the keys of the collision dict, so code written for
+    sprite groups (GameStats.update, spritecollideany) keeps working.
+
+    Attributes:
+        index (int): The alien's position in the fleet arrays.
+        rect (pygame.Rect): The alien's screen rect at the time the slot was made.
+        home (pygame.Rect): The alien's place in the formation.
+    """
+    __slots__ = ('index', 'rect', 'home')
+
+    def __init__(self, index: int, rect: pygame.Rect, home: pygame.Rect):
+        self.index = index
+        self.rect = rect
+        self.home = home
+
+
+class ArrayFleet:
+    """
+    Stores a fleet of aliens as contiguous NumPy arrays instead of one sprite per alien.
+    The ArrayFleet class is responsible for:
+    -  Keeping the formation position, size, and alive flag of every alien in struct-of-arrays form.
+    -  Checking bullet hits against every alien at once.
+    -  Drawing the fleet with one batched blit call.
+
+    It behaves enough like a pygame.sprite.Group (len, truth value, iteration, empty) that
+    AlienFleet can swap it in for the fleet group.  Positions are stored in formation space; the
+    fleet's pixel offset is added whenever screen positions are needed.
+
+    When settings.collision_precision is 'mask', the pairs whose rects overlap are also checked
+    against the shared alien mask.
+
+    Attributes:
+        x (np.ndarray): The horizontal position of each alien in the formation.
+        y (np.ndarray): The vertical position of each alien in the formation.
+        w (np.ndarray): The width of each alien.
+        h (np.ndarray): The height of each alien.
+        alive (np.ndarray): Whether each alien is still in the fleet.
+        count (int): How many slots of the arrays are in use, alive or not.
+
+    Methods:
+        __init__(self, fleet, capacity): Initializes the arrays.
+        add(self, x, y): Adds a single alien to the fleet.
+        add_many(self, xs, ys): Adds many aliens to the fleet at once.
+        empty(self): Removes every alien.
+        groupcollide(self, other_group, dokill): Removes aliens hit by sprites in other_group.
+        spritecollideany(self, sprite): Returns a FleetSlot for an alien that sprite hits, or None.
+        rects(self): Returns a Rect for every alive alien.
+        draw(self): Renders the fleet.
+    """
+    def __init__(self, fleet: 'AlienFleet', capacity: int = 64):
+        """
+        Initializes the arrays.
+
+        Args:
+            fleet (AlienFleet): The fleet that owns these arrays.
+            capacity (int): How many aliens to allocate room for up front.
+        """
+        self.fleet = fleet
+        self.settings = fleet.settings
+        self.screen = fleet.game.screen
+        self.image = fleet.game.assets.get_image(
+            self.settings.alien_file, (self.settings.alien_w, self.settings.alien_h))
+        self.mask = fleet.game.assets.get_mask(
+            self.settings.alien_file, (self.settings.alien_w, self.settings.alien_h))
+        self.precise = self.settings.collision_precision == 'mask'
+
+        self.count = 0
+        self._alive_count = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """
+        Allocates (or grows) the arrays, keeping the aliens already stored.
+        """
+        old_count = self.count
+        arrays = {
+            'x': np.zeros(capacity, dtype=np.float64),
+            'y': np.zeros(capacity, dtype=np.float64),
+            'w': np.zeros(capacity, dtype=np.int64),
+            'h': np.zeros(capacity, dtype=np.int64),
+            'alive': np.zeros(capacity, dtype=bool),
+        }
+        for name, array in arrays.items():
+            if old_count:
+                array[:old_count] = getattr(self, name)[:old_count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self._alive_count
+
+    def __bool__(self):
+        return self._alive_count > 0
+
+    def __iter__(self):
+        home_left, home_top = self._home_positions()
+        offset_x, offset_y = self.fleet.pixel_offset()
+        for index in np.flatnonzero(self.alive[:self.count]):
+            yield self._slot(int(index), int(home_left[index]), int(home_top[index]), offset_x, offset_y)
+
+    def _slot(self, index, home_left, home_top, offset_x, offset_y):
+        home = pygame.Rect(home_left, home_top, int(self.w[index]), int(self.h[index]))
+        return FleetSlot(index, home.move(offset_x, offset_y), home)
+
+    def sprites(self):
+        return list(self)
+
+    def add(self, x: float, y: float):
+        """
+        Adds a single alien to the fleet.
+        """
+        self.add_many([x], [y])
+
+    def add_many(self, xs, ys):
+        """
+        Adds many aliens to the fleet at once.
+
+        Args:
+            xs (sequence): The horizontal positions of the new aliens.
+            ys (sequence): The vertical positions of the new aliens.
+        """
+        amount = len(xs)
+        if self.count + amount > self.capacity:
+            self._allocate(max(self.capacity * 2, self.count + amount))
+
+        new = slice(self.count, self.count + amount)
+        self.x[new] = xs
+        self.y[new] = ys
+        self.w[new] = self.settings.alien_w
+        self.h[new] = self.settings.alien_h
+        self.alive[new] = True
+        self.count += amount
+        self._alive_count += amount
+
+    def empty(self):
+        """
+        Removes every alien.
+        """
+        self.alive[:self.count] = False
+        self.count = 0
+        self._alive_count = 0
+
+    def _home_positions(self):
+        """
+        Returns the integer left and top of every slot in the formation, rounded the same way pygame.Rect rounds.
+        """
+        return round_half_away(self.x[:self.count]), round_half_away(self.y[:self.count])
+
+    def _rect_positions(self):
+        """
+        Returns the integer left and top of every slot on the screen.
+        """
+        home_left, home_top = self._home_positions()
+        offset_x, offset_y = self.fleet.pixel_offset()
+        return home_left + offset_x, home_top + offset_y
+
+    def groupcollide(self, other_group, dokill: bool = True):
+        """
+        Removes aliens hit by sprites in other_group, and kills those sprites if dokill is set.
+
+        Returns:
+            dict: Each hit alien's FleetSlot mapped to the list of sprites that hit it,
+            the same shape pygame.sprite.groupcollide returns.
+        """
+        others = other_group.sprites()
+        if not others or not self._alive_count:
+            return {}
+
+        other_rects = np.array([sprite.rect for sprite in others], dtype=np.int64).reshape(-1, 4)
+        other_left = other_rects[:, 0]
+        other_top = other_rects[:, 1]
+        other_right = other_left + other_rects[:, 2]
+        other_bottom = other_top + other_rects[:, 3]
+
+        # Move the other sprites into formation space instead of moving every alien onto the screen.
+        offset_x, offset_y = self.fleet.pixel_offset()
+        other_left = other_left - offset_x
+        other_right = other_right - offset_x
+        other_top = other_top - offset_y
+        other_bottom = other_bottom - offset_y
+
+        indices = np.flatnonzero(self.alive[:self.count])
+        left = round_half_away(self.x[indices])[:, None]
+        top = round_half_away(self.y[indices])[:, None]
+        w = self.w[indices][:, None]
+        h = self.h[indices][:, None]
+
+        # Same strict overlap test as Rect.colliderect, for every alien/sprite pair at once.
+        overlap = ((left < other_right) & (other_left < left + w)
+                   & (top < other_bottom) & (other_top < top + h)
+                   & (w > 0) & (h > 0)
+                   & (other_rects[:, 2] > 0) & (other_rects[:, 3] > 0))
+        hit_rows = np.flatnonzero(overlap.any(axis=1))
+        if not len(hit_rows):
+            return {}
+
+        # A sprite is used up by the first alien it hits, like it is with groupcollide.
+        collisions = {}
+        used = np.zeros(len(others), dtype=bool)
+        for row in hit_rows:
+            cols = np.flatnonzero(overlap[row] & ~used)
+            if self.precise:
+                # Masks are only compared for sprites whose rects overlap this alien and are still unused.
+                cols = [col for col in cols.tolist() if self.mask.overlap(
+                    others[col].mask, (int(other_left[col] - left[row, 0]), int(other_top[col] - top[row, 0])))]
+            if not len(cols):
+                continue
+            if dokill:
+                used[cols] = True
+            index = int(indices[row])
+            slot = self._slot(index, int(left[row, 0]), int(top[row, 0]), offset_x, offset_y)
+            collisions[slot] = [others[col] for col in cols]
+            self.alive[index] = False
+
+        self._alive_count -= len(collisions)
+        if dokill:
+            for hit_sprites in collisions.values():
+                for sprite in hit_sprites:
+                    sprite.kill()
+        return collisions
+
+    def spritecollideany(self, sprite):
+        """
+        Returns a FleetSlot for an alien that sprite hits, or None.
+        """
+        offset_x, offset_y = self.fleet.pixel_offset()
+        rect = sprite.rect.move(-offset_x, -offset_y)
+        if not self._alive_count or rect.width <= 0 or rect.height <= 0:
+            return None
+        left, top = self._home_positions()
+        w = self.w[:self.count]
+        h = self.h[:self.count]
+        overlap = ((left < rect.right) & (rect.left < left + w)
+                   & (top < rect.bottom) & (rect.top < top + h)
+                   & (w > 0) & (h > 0) & self.alive[:self.count])
+        for index in np.flatnonzero(overlap).tolist():
+            if self.precise and self.mask.overlap(
+                    sprite.mask, (rect.x - int(left[index]), rect.y - int(top[index]))) is None:
+                continue
+            return self._slot(index, int(left[index]), int(top[index]), offset_x, offset_y)
+        return None
+
+    def rects(self):
+        """
+        Returns a Rect for every alive alien.
+        """
+        alive = np.flatnonzero(self.alive[:self.count])
+        left, top = self._rect_positions()
+        return [pygame.Rect(x, y, w, h) for x, y, w, h in zip(
+            left[alive].tolist(), top[alive].tolist(), self.w[alive].tolist(), self.h[alive].tolist())]
+
+    def draw(self):
+        """
+        Renders the fleet with a single batched blit.
+        """
+        left, top = self._rect_positions()
+        alive = np.flatnonzero(self.alive[:self.count])
+        image = self.image
+        self.screen.blits([(image, (x, y)) for x, y in zip(left[alive].tolist(), top[alive].tolist())], False)
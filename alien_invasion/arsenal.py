@@ -17,15 +17,37 @@ class Arsenal:
     - Drawing the active bullets on the screen.
     - Creating and adding new bullets to the arsenal when the ship fires,
     doesn't fire anymore when the max count has been reached until the bullets are removed.
+    - Keeping a fixed pool of Bullet objects, sized from settings.bullet_amount, and reusing them.
+    A bullet is free to be fired again as soon as it leaves the arsenal group, whether it went
+    off-screen, hit an alien, or the level was reset.
 
     Attributes:
         arsenal (pygame.sprite.Group): A Pygame sprite group that holds all the active Bullet objects
             fired by the ship.
+        pool (list): Every Bullet the arsenal owns, fired or not.
+        allocations (int): How many Bullet objects have been made. Stays at the pool size while
+            firing, so steady-state firing can be checked to allocate nothing.
     """
     def __init__ (self, game: 'AlienInvasion'):
         self.game = game
         self.settings = game.settings
         self.arsenal = pygame.sprite.Group()
+        self.pool = []
+        self.allocations = 0
+        self._retired = []
+        self._grow_pool(self.settings.bullet_amount)
+
+    def _grow_pool(self, capacity):
+        while len(self.pool) < capacity:
+            self.pool.append(Bullet(self.game))
+            self.allocations += 1
+
+    def _acquire_bullet(self):
+        for bullet in self.pool:
+            if not bullet.alive():
+                return bullet
+        self._grow_pool(len(self.pool) + 1)
+        return self.pool[-1]
 
     def update_arsenal(self):
 
@@ -33,16 +55,42 @@ class Arsenal:
         self._remove_bullets_offscreen()
 
     def _remove_bullets_offscreen(self):
-        for bullet in self.arsenal.copy():
+        retired = self._retired
+        for bullet in self.arsenal:
             if bullet.rect.right <= 0 or bullet.rect.left >= self.settings.screen_w:
-                self.arsenal.remove(bullet)
+                retired.append(bullet)
+        for bullet in retired:
+            self.arsenal.remove(bullet)
+        retired.clear()
     def draw(self):
         for bullet in self.arsenal:
             bullet.draw_bullet()
+
+    def get_rects(self):
+        return [bullet.rect for bullet in self.arsenal]
     
+    def get_state(self):
+        """
+        Returns the position of every bullet in flight.
+        """
+        return [(bullet.x, bullet.rect.y) for bullet in self.arsenal]
+
+    def set_state(self, state):
+        """
+        Puts bullets back in flight from get_state's result.
+        """
+        self.arsenal.empty()
+        for x, y in state:
+            bullet = self._acquire_bullet()
+            bullet.x = x
+            bullet.rect.x = x
+            bullet.rect.y = y
+            self.arsenal.add(bullet)
+
     def fire_bullet(self):
         if len(self.arsenal) < self.settings.bullet_amount:
-            new_bullet = Bullet(self.game)
-            self.arsenal.add(new_bullet)
+            bullet = self._acquire_bullet()
+            bullet.reset()
+            self.arsenal.add(bullet)
             return True
         return False
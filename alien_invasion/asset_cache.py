@@ -0,0 +1,247 @@
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import struct
+import pygame
+from collections import OrderedDict
+from pathlib import Path
+
+_RAW_HEADER = struct.Struct('<II')
+
+
+class AssetCache:
+    """
+    Hands out shared, pre-scaled image surfaces.  The AssetCache class is responsible for:
+    -  Decoding each image file once per (path, size, convert mode) instead of once per sprite.
+    -  Converting surfaces to the display's pixel format so they blit quickly.
+    -  Evicting the least recently used surfaces once the cache is full.
+    -  Counting cache hits and misses so the savings can be checked.
+    -  Optionally keeping a disk cache of scaled pixel data, so later launches skip decoding and scaling.
+
+    The disk cache stores each scaled image as raw RGBA (or RGBX for opaque images) bytes behind a small
+    size header, in a file named after the source file's SHA-256, the target size and the pixel layout.
+    Editing a source image changes its hash, so stale entries are simply never used again.  Cached files
+    are memory-mapped and handed to pygame.image.frombuffer, so loading one is a single copy into the
+    display format.  Source hashes are remembered in an index by file size and mtime, so unchanged files
+    aren't re-hashed on every launch.
+
+    The disk cache is only ever a shortcut: a cached file that is truncated or can't be read is deleted
+    and the image decoded from its source, and if the cache can't be written to (a read-only install, say)
+    it is turned off for the rest of the run.
+
+    Surfaces returned by the cache are shared between every sprite that asks for them,
+    so callers must never draw onto them.
+
+    Collision masks are made from the cached surfaces on first use and kept for as long as the cache,
+    one per (path, size), so every sprite with the same image shares a mask.
+
+    Attributes:
+        max_size (int): The most surfaces the cache keeps before evicting the oldest one.
+        hits (int): How many lookups were answered from the cache.
+        misses (int): How many lookups weren't in memory.
+        disk_dir (Path): Where the disk cache lives, or None if it is off.
+        disk_hits (int): How many misses were answered from the disk cache.
+
+    Methods:
+        __init__(self, max_size, disk_dir): Initializes the cache.
+        get_image(self, path, size, convert): Returns the shared surface for the given key.
+        get_mask(self, path, size): Returns the shared collision mask for an image.
+        clear(self): Drops every cached surface.
+        stats(self): Returns the hit/miss counters as a dict.
+    """
+    CONVERT_ALPHA = 'alpha'
+    CONVERT_OPAQUE = 'opaque'
+
+    def __init__(self, max_size: int = 32, disk_dir=None):
+        """
+        Initializes the cache.
+
+        Args:
+            max_size (int): The most surfaces the cache keeps before evicting the oldest one.
+            disk_dir (str or Path): Where to keep the disk cache, or None to not use one.  Set to None if the cache
+                turns out not to be writable.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_hits = 0
+        self._surfaces = OrderedDict()
+        self._masks = {}
+        self._digests = None
+
+    def get_image(self, path, size=None, convert=CONVERT_ALPHA):
+        """
+        Returns the shared surface for the given key, loading and scaling it on a miss.
+
+        Args:
+            path (Path): The image file to load.
+            size (tuple): The (width, height) to scale the image to, or None to keep its size.
+            convert (str): 'alpha' to keep transparency, 'opaque' for backgrounds, or None to skip conversion.
+        """
+        key = (str(path), tuple(size) if size else None, convert)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self._load(path, size, convert)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def get_mask(self, path, size=None):
+        """
+        Returns the shared collision mask for the image at path scaled to size, made from its alpha
+        channel the first time it is asked for.
+        """
+        key = (str(path), tuple(size) if size else None)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = pygame.mask.from_surface(self.get_image(path, size))
+            self._masks[key] = mask
+        return mask
+
+    def _load(self, path, size, convert):
+        """
+        Decodes, scales and converts a single image, going through the disk cache if there is one.
+        """
+        surface = None
+        if self.disk_dir:
+            layout = 'RGBX' if convert == self.CONVERT_OPAQUE else 'RGBA'
+            raw_path = self._raw_path(path, size, layout)
+            surface = self._read_raw(raw_path, layout)
+            if surface is not None:
+                self.disk_hits += 1
+        if surface is None:
+            surface = pygame.image.load(path)
+            if size:
+                surface = pygame.transform.scale(surface, size)
+            if self.disk_dir:
+                self._write_raw(raw_path, surface, layout)
+
+        # Conversion needs a display mode; headless runs keep the decoded format.
+        if pygame.display.get_surface() is None:
+            return surface
+        if convert == self.CONVERT_ALPHA:
+            return surface.convert_alpha()
+        if convert == self.CONVERT_OPAQUE:
+            return surface.convert()
+        return surface
+
+    def _raw_path(self, path, size, layout):
+        """
+        Returns the disk cache file for an image at a size and pixel layout.
+        """
+        size_name = f'{size[0]}x{size[1]}' if size else 'native'
+        return self.disk_dir / f'{self._digest(path)}_{size_name}_{layout}.raw'
+
+    def _digest(self, path):
+        """
+        Returns the SHA-256 of a source file, re-hashing it only if its size or mtime changed.
+        """
+        index_path = self.disk_dir / 'index.json'
+        if self._digests is None:
+            try:
+                self._digests = json.loads(index_path.read_text())
+            except (OSError, ValueError):
+                self._digests = {}
+
+        stat = os.stat(path)
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        entry = self._digests.get(str(path))
+        if entry and entry[:2] == stamp:
+            return entry[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+        self._digests[str(path)] = stamp + [digest.hexdigest()]
+        # Without the index the file is just hashed again next launch, so failing to write it is fine.
+        with contextlib.suppress(OSError):
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._replace_file(index_path, json.dumps(self._digests, indent=4).encode())
+        return digest.hexdigest()
+
+    def _read_raw(self, raw_path, layout):
+        """
+        Memory-maps a cached image and wraps it in a surface, or returns None if it isn't cached.
+        A cached file that can't be used is deleted, so it is written again.
+        """
+        buffer = None
+        try:
+            with open(raw_path, 'rb') as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            width, height = _RAW_HEADER.unpack_from(buffer)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, struct.error):
+            # Empty, truncated or unreadable.  The map is closed first, as Windows won't delete a mapped file.
+            if buffer is not None:
+                buffer.close()
+            self._drop_raw(raw_path)
+            return None
+        if len(buffer) != _RAW_HEADER.size + width * height * 4:
+            buffer.close()
+            self._drop_raw(raw_path)
+            return None
+        # The surface keeps a reference to the mapped pixels, so the map stays open as long as it does.
+        return pygame.image.frombuffer(memoryview(buffer)[_RAW_HEADER.size:], (width, height), layout)
+
+    def _write_raw(self, raw_path, surface, layout):
+        """
+        Stores an image's scaled pixels in the disk cache, turning the disk cache off if it can't be written.
+        """
+        pixels = pygame.image.tobytes(surface, layout)
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._replace_file(raw_path, _RAW_HEADER.pack(*surface.get_size()) + pixels)
+        except OSError as e:
+            print(f'Not caching images in {self.disk_dir}: {e}')
+            self.disk_dir = None
+
+    @staticmethod
+    def _drop_raw(raw_path):
+        """
+        Deletes a cached file that can't be used, if it can be deleted.
+        """
+        with contextlib.suppress(OSError):
+            raw_path.unlink()
+
+    @staticmethod
+    def _replace_file(path, data: bytes):
+        """
+        Writes a file through a temporary one, so other processes never read half of it.
+        """
+        temp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        try:
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                temp_path.unlink()
+            raise
+
+    def clear(self):
+        """
+        Drops every cached surface and mask.
+        """
+        self._surfaces.clear()
+        self._masks.clear()
+
+    def stats(self):
+        """
+        Returns the hit/miss counters as a dict.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'size': len(self._surfaces),
+        }
@@ -0,0 +1,203 @@
+import threading
+import pygame
+from settings import Settings
+
+
+class SoundCategory:
+    """
+    A kind of sound and the channels reserved for it.
+
+    Attributes:
+        name (str): The name sounds are played by.
+        path (Path): The sound file.
+        sound (pygame.mixer.Sound): The decoded sample, or None until it has been loaded.
+        volume (float): The sample's volume, from 0 to 1.
+        channels (list): The mixer channels reserved for this category.
+        priority (int): Categories with a higher priority may take channels from lower ones.
+        fadeout_ms (int): How long a voice plays before it has faded out. 0 plays the whole sample.
+    """
+    __slots__ = ('name', 'path', 'sound', 'volume', 'channels', 'priority', 'fadeout_ms')
+
+    def __init__(self, name: str, path, volume: float, channels: list, priority: int, fadeout_ms: int):
+        self.name = name
+        self.path = path
+        self.sound = None
+        self.volume = volume
+        self.channels = channels
+        self.priority = priority
+        self.fadeout_ms = fadeout_ms
+
+
+class AudioManager:
+    """
+    Plays the game's sounds through a fixed set of mixer channels.  The AudioManager class is responsible for:
+    -  Decoding each sound file once and reusing the sample for every category that plays it.  Samples
+       can be decoded on a background thread so they don't hold up the first frame; sounds asked for
+       before their sample is ready are skipped.
+    -  Reserving a pool of channels for each category, so rapid fire can never use up the impact voices.
+    -  Collecting the sounds asked for during a frame and starting each category at most once per frame,
+       so twenty hits in one frame start one impact voice.
+    -  Choosing a channel for each voice: an idle one in the category's pool, then an idle one from a
+       lower-priority pool, and otherwise stealing the oldest voice from those pools.
+
+    Attributes:
+        categories (dict): Each category name mapped to its SoundCategory.
+        voices_started (int): How many voices have been started.
+        voices_stolen (int): How many of those cut off a voice that was still playing.
+        deduplicated (int): How many requests were folded into a voice already asked for that frame.
+
+    Methods:
+        __init__(self): Initializes the manager.
+        register(self, name, path, channels, priority, volume, fadeout_ms): Adds a category.
+        load(self): Decodes every registered sample.
+        load_in_background(self): Decodes every registered sample on a background thread.
+        play(self, name): Asks for a sound to be played this frame.
+        update(self): Starts the voices asked for this frame.
+    """
+    def __init__(self):
+        """
+        Initializes the manager.
+        """
+        self.categories = {}
+        self.voices_started = 0
+        self.voices_stolen = 0
+        self.deduplicated = 0
+        self._samples = {}
+        self._pending = []
+        self._started = {}
+        self._voice = 0
+        self._next_channel = 0
+        self._loader = None
+
+    def _load(self, path):
+        """
+        Returns the decoded sample for path, decoding the file the first time it is asked for.
+        """
+        key = str(path)
+        if key not in self._samples:
+            self._samples[key] = pygame.mixer.Sound(path)
+        return self._samples[key]
+
+    def register(self, name: str, path, channels: int = 1, priority: int = 0,
+                 volume: float = 1.0, fadeout_ms: int = 0):
+        """
+        Adds a category with its own reserved channels.  Its sample is decoded by load() or load_in_background().
+
+        Args:
+            name (str): The name the sound is played by.
+            path (str or Path): The sound file.
+            channels (int): How many voices of this sound can play at once.
+            priority (int): Categories with a higher priority may take channels from lower ones.
+            volume (float): The sample's volume, from 0 to 1.
+            fadeout_ms (int): How long a voice plays before it has faded out. 0 plays the whole sample.
+        """
+        first = self._next_channel
+        self._next_channel += channels
+        if pygame.mixer.get_num_channels() < self._next_channel:
+            pygame.mixer.set_num_channels(self._next_channel)
+        pygame.mixer.set_reserved(self._next_channel)
+        pool = [pygame.mixer.Channel(index) for index in range(first, self._next_channel)]
+        self.categories[name] = SoundCategory(name, path, volume, pool, priority, fadeout_ms)
+
+    def load(self):
+        """
+        Decodes every registered sample that hasn't been decoded yet.
+        """
+        for category in list(self.categories.values()):
+            if category.sound is None:
+                sound = self._load(category.path)
+                sound.set_volume(category.volume)
+                category.sound = sound
+
+    def load_in_background(self):
+        """
+        Decodes every registered sample on a background thread.
+        """
+        self._loader = threading.Thread(target=self.load, name='audio-loader', daemon=True)
+        self._loader.start()
+
+    def play(self, name: str):
+        """
+        Asks for a sound to be played this frame.  Nothing is started until update().
+        """
+        if name in self._pending:
+            self.deduplicated += 1
+        else:
+            self._pending.append(name)
+
+    def update(self):
+        """
+        Starts the voices asked for this frame, highest priority first.
+        """
+        if not self._pending:
+            return
+        categories = [self.categories[name] for name in self._pending]
+        self._pending.clear()
+        categories.sort(key=lambda category: category.priority, reverse=True)
+        for category in categories:
+            if category.sound is None:
+                continue
+            channel = self._pick_channel(category)
+            if channel.get_busy():
+                self.voices_stolen += 1
+                channel.stop()
+            channel.play(category.sound)
+            if category.fadeout_ms:
+                channel.fadeout(category.fadeout_ms)
+            self._voice += 1
+            self._started[channel] = self._voice
+            self.voices_started += 1
+
+    def _pick_channel(self, category: SoundCategory):
+        """
+        Returns the channel to play a voice of category on.
+        """
+        pools = [category.channels] + [other.channels for other in self.categories.values()
+                                       if other.priority < category.priority]
+        for pool in pools:
+            for channel in pool:
+                if not channel.get_busy():
+                    return channel
+        return min((channel for pool in pools for channel in pool), key=lambda channel: self._started.get(channel, 0))
+
+
+class NullAudio:
+    """
+    An AudioManager that plays nothing, for headless runs and machines without an audio device.
+    It keeps the same counters, so code that reads them works either way.
+    """
+    def __init__(self):
+        self.categories = {}
+        self.voices_started = 0
+        self.voices_stolen = 0
+        self.deduplicated = 0
+
+    def register(self, name: str, path, channels: int = 1, priority: int = 0,
+                 volume: float = 1.0, fadeout_ms: int = 0):
+        self.categories[name] = None
+
+    def load(self):
+        pass
+
+    def load_in_background(self):
+        pass
+
+    def play(self, name: str):
+        pass
+
+    def update(self):
+        pass
+
+
+def make_audio(settings: Settings):
+    """
+    Returns an AudioManager, or a NullAudio if settings.audio_backend is 'null' or the mixer can't start.
+    """
+    if settings.audio_backend == 'null':
+        return NullAudio()
+    try:
+        pygame.mixer.init()
+    except pygame.error as e:
+        print(f'Audio disabled: {e}')
+        return NullAudio()
+    return AudioManager()
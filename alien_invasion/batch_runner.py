@@ -0,0 +1,195 @@
+import argparse
+import itertools
+import json
+import os
+import statistics
+import time
+import multiprocessing
+from settings import Settings
+from simulation import Simulation
+from headless import make_policy
+
+
+class SessionSpec:
+    """
+    Describes one headless game for the batch runner.
+
+    Attributes:
+        index (int): The session's number within the batch.
+        overrides (dict): Settings values to play with, e.g. {'fleet_speed': 5}.
+        policy (str): The policy name passed to headless.make_policy.
+        seed (int): The policy's seed.
+        max_ticks (int): The most steps the game may last.
+    """
+    def __init__(self, index: int, overrides: dict, policy: str, seed: int, max_ticks: int):
+        self.index = index
+        self.overrides = overrides
+        self.policy = policy
+        self.seed = seed
+        self.max_ticks = max_ticks
+
+
+def run_session(spec: SessionSpec):
+    """
+    Plays one headless game to the end (or to max_ticks) and returns its results as a dict.
+    Runs inside a worker process.
+    """
+    settings = Settings()
+    settings.apply_profile(spec.overrides)
+    settings.initialize_dynamic_settings()
+
+    sim = Simulation(settings)
+    policy = make_policy(spec.policy, spec.seed)
+    clock = time.perf_counter_ns
+    costs = []
+
+    sim.restart()
+    start = clock()
+    while sim.game_active and sim.frame < spec.max_ticks:
+        step_start = clock()
+        sim.step(policy(sim))
+        costs.append(clock() - step_start)
+    wall = (clock() - start) / 1e9
+
+    costs.sort()
+    return {
+        'index': spec.index,
+        'overrides': spec.overrides,
+        'policy': spec.policy,
+        'seed': spec.seed,
+        'score': sim.game_stats.score,
+        'level': sim.game_stats.level,
+        'ticks': sim.frame,
+        'survival_s': sim.frame / settings.sim_rate,
+        'game_over': not sim.game_active,
+        'frame_cost_mean_us': statistics.fmean(costs) / 1000 if costs else 0.0,
+        'frame_cost_p95_us': costs[int(len(costs) * 0.95)] / 1000 if costs else 0.0,
+        'wall_s': wall,
+    }
+
+
+def build_specs(sweeps: dict, sessions_per_config: int, policy: str, base_seed: int, max_ticks: int):
+    """
+    Builds a SessionSpec for every combination of swept values, sessions_per_config times each.
+
+    Args:
+        sweeps (dict): Each setting name mapped to the list of values to try.
+    """
+    names = sorted(sweeps)
+    specs = []
+    for values in itertools.product(*(sweeps[name] for name in names)):
+        overrides = dict(zip(names, values))
+        for _ in range(sessions_per_config):
+            index = len(specs)
+            specs.append(SessionSpec(index, overrides, policy, base_seed + index, max_ticks))
+    return specs
+
+
+def aggregate(results):
+    """
+    Groups session results by their settings overrides and summarizes each group.
+    """
+    groups = {}
+    for result in results:
+        key = json.dumps(result['overrides'], sort_keys=True)
+        groups.setdefault(key, []).append(result)
+
+    summary = []
+    for key, group in sorted(groups.items()):
+        scores = [r['score'] for r in group]
+        summary.append({
+            'overrides': json.loads(key),
+            'sessions': len(group),
+            'score_mean': statistics.fmean(scores),
+            'score_median': statistics.median(scores),
+            'score_max': max(scores),
+            'level_mean': statistics.fmean(r['level'] for r in group),
+            'survival_s_mean': statistics.fmean(r['survival_s'] for r in group),
+            'game_over_rate': sum(r['game_over'] for r in group) / len(group),
+            'frame_cost_mean_us': statistics.fmean(r['frame_cost_mean_us'] for r in group),
+        })
+    return summary
+
+
+def check_specs(specs):
+    """
+    Applies every spec's overrides to a throwaway Settings, so a bad setting name or value stops the
+    batch before any session is played, instead of failing in a worker part way through it.
+
+    Raises:
+        ValueError: If an override names a setting that doesn't exist.
+        TypeError: If an override's value isn't the setting's type.
+    """
+    checked = set()
+    for spec in specs:
+        key = json.dumps(spec.overrides, sort_keys=True, default=str)
+        if key not in checked:
+            Settings().apply_profile(spec.overrides)
+            checked.add(key)
+
+
+def run_batch(specs, output_path, processes: int = None):
+    """
+    Runs every session across a process pool, writing each result to output_path (one JSON object
+    per line) as soon as it finishes.  Every spec is checked with check_specs first.
+
+    Returns:
+        list: Every session's result.
+    """
+    check_specs(specs)
+    processes = processes or os.cpu_count()
+    results = []
+    chunksize = max(1, len(specs) // (processes * 8))
+    # Workers are spawned rather than forked, as they are on Windows, so they never inherit a locked mutex
+    # from a thread the parent started (pygame's, for one).
+    context = multiprocessing.get_context('spawn')
+    with open(output_path, 'w') as file, context.Pool(processes) as pool:
+        for result in pool.imap_unordered(run_session, specs, chunksize):
+            file.write(json.dumps(result) + '\n')
+            file.flush()
+            results.append(result)
+    return results
+
+
+def _parse_sweep(text: str):
+    """
+    Parses 'name=v1,v2,...' into (name, [values]), reading each value as JSON when it can.
+    """
+    name, _, values = text.partition('=')
+    parsed = []
+    for value in values.split(','):
+        try:
+            parsed.append(json.loads(value))
+        except json.JSONDecodeError:
+            parsed.append(value)
+    return name, parsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play many headless games across a process pool.')
+    parser.add_argument('--sweep', action='append', default=[],
+                        help="a setting and the values to try, e.g. fleet_speed=3,4,5 (repeatable)")
+    parser.add_argument('--sessions', type=int, default=10, help='sessions per combination of swept values')
+    parser.add_argument('--policy', default='random', help="'sweep', 'random', or 'module:Class'")
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first session')
+    parser.add_argument('--max-ticks', type=int, default=36000, help='the most steps a game may last')
+    parser.add_argument('--processes', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--output', default='batch_results.jsonl', help='where to stream session results')
+    args = parser.parse_args()
+
+    sweeps = dict(_parse_sweep(text) for text in args.sweep)
+    specs = build_specs(sweeps, args.sessions, args.policy, args.seed, args.max_ticks)
+
+    start = time.perf_counter()
+    results = run_batch(specs, args.output, args.processes)
+    elapsed = time.perf_counter() - start
+
+    summary = aggregate(results)
+    summary_path = os.path.splitext(args.output)[0] + '_summary.json'
+    with open(summary_path, 'w') as file:
+        json.dump(summary, file, indent=4)
+
+    print(f'{len(results)} sessions in {elapsed:.1f}s, results in {args.output}, summary in {summary_path}')
+    for group in summary:
+        print(f"  {group['overrides']}: score {group['score_mean']:,.0f} avg, "
+              f"level {group['level_mean']:.1f}, survived {group['survival_s_mean']:.0f}s")
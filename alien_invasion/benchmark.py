@@ -0,0 +1,263 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from settings import Settings
+from alien_invasion import AlienInvasion
+
+
+PHASES = ('update_fleet', 'check_collisions', 'update_arsenal', 'update_scores', 'update_particles',
+          'update_starfield', 'reset_level', 'update_screen')
+
+
+class Scenario:
+    """
+    A scripted workload for the benchmark.
+
+    Attributes:
+        name (str): The name results are reported under.
+        fleet_size (int): How many aliens to place, or None for the normal fleet grid.
+        fleet_mode (str): 'sprite' or 'array', see Settings.fleet_mode.
+        fleet_layer (bool): Draw the fleet as one pre-rendered layer, see Settings.fleet_layer.
+        bullet_amount (int): How many bullets the arsenal may have in flight. The arsenal is refilled every frame.
+        collision_precision (str): 'rect' or 'mask', see Settings.collision_precision.
+        starfield_layers (tuple): The starfield's layers, or None for the default ones. See Settings.starfield_layers.
+        reset_every_frame (bool): Rebuild the level every frame, like a storm of lost lives.
+        hud_every_frame (bool): Re-render the HUD scores every frame, like a hit landing every frame.
+        frames (int): How many frames to time.
+    """
+    def __init__(self, name, fleet_size=None, fleet_mode='sprite', fleet_layer=False, bullet_amount=5,
+                 collision_precision='rect', starfield_layers=None, reset_every_frame=False, hud_every_frame=False,
+                 frames=300):
+        self.name = name
+        self.fleet_size = fleet_size
+        self.fleet_mode = fleet_mode
+        self.fleet_layer = fleet_layer
+        self.bullet_amount = bullet_amount
+        self.collision_precision = collision_precision
+        self.starfield_layers = starfield_layers
+        self.reset_every_frame = reset_every_frame
+        self.hud_every_frame = hud_every_frame
+        self.frames = frames
+
+
+SCENARIOS = [
+    Scenario('fleet-default'),
+    Scenario('fleet-default-array', fleet_mode='array'),
+    Scenario('fleet-1k', fleet_size=1_000),
+    Scenario('fleet-1k-array', fleet_size=1_000, fleet_mode='array'),
+    Scenario('fleet-10k', fleet_size=10_000, frames=30),
+    Scenario('fleet-10k-array', fleet_size=10_000, fleet_mode='array'),
+    Scenario('fleet-10k-array-layer', fleet_size=10_000, fleet_mode='array', fleet_layer=True),
+    Scenario('fleet-50k-array', fleet_size=50_000, fleet_mode='array', frames=100),
+    Scenario('arsenal-saturated', bullet_amount=200),
+    Scenario('arsenal-saturated-mask', bullet_amount=200, collision_precision='mask'),
+    Scenario('fleet-1k-saturated', fleet_size=1_000, bullet_amount=200),
+    Scenario('fleet-1k-saturated-mask', fleet_size=1_000, bullet_amount=200, collision_precision='mask'),
+    Scenario('fleet-1k-array-saturated', fleet_size=1_000, fleet_mode='array', bullet_amount=200),
+    Scenario('fleet-1k-array-saturated-mask', fleet_size=1_000, fleet_mode='array', bullet_amount=200,
+             collision_precision='mask'),
+    Scenario('level-reset-storm', reset_every_frame=True),
+    Scenario('starfield-off', starfield_layers=()),
+    Scenario('starfield-50k', starfield_layers=((30_000, 10, 110), (15_000, 25, 170), (5_000, 60, 240))),
+    Scenario('hud-every-hit', hud_every_frame=True),
+]
+
+
+def _build_game(scenario: Scenario):
+    """
+    Builds a game for the scenario, with its fleet placed and play started.
+    """
+    settings = Settings()
+    settings.initialize_dynamic_settings()
+    settings.fleet_mode = scenario.fleet_mode
+    settings.fleet_layer = scenario.fleet_layer
+    settings.bullet_amount = scenario.bullet_amount
+    settings.collision_precision = scenario.collision_precision
+    if scenario.starfield_layers is not None:
+        settings.starfield_layers = scenario.starfield_layers
+    settings.audio_backend = 'null'
+
+    game = AlienInvasion(settings)
+    game.sim.game_active = True
+    if scenario.fleet_size is not None:
+        _place_fleet(game, scenario.fleet_size)
+    return game
+
+
+def _place_fleet(game: AlienInvasion, fleet_size: int):
+    """
+    Replaces the fleet with fleet_size aliens packed into the left two thirds of the screen.
+    """
+    settings = game.settings
+    fleet = game.alien_fleet
+    fleet.empty()
+    columns = max(1, int(settings.screen_w / 1.5) // 4)
+    rows = max(1, (settings.screen_h - 2 * settings.alien_h) // 4)
+    homes = []
+    for index in range(fleet_size):
+        col, row = divmod(index, rows)
+        homes.append(((col % columns) * 4, settings.alien_h + (row % rows) * 4))
+    fleet._add_aliens(homes)
+    game.sim.broadphase.invalidate()
+
+
+def _fill_arsenal(game: AlienInvasion):
+    """
+    Fires until the arsenal is full, spreading the bullets across the screen.
+    """
+    arsenal = game.ship.arsenal
+    fired = 0
+    while arsenal.fire_bullet():
+        fired += 1
+    if not fired:
+        return
+    start_x = game.ship.rect.left
+    for index, bullet in enumerate(arsenal.arsenal):
+        if bullet.rect.left == start_x:
+            bullet.x = (index * 97) % game.settings.screen_w
+            bullet.rect.x = bullet.x
+
+
+def run_scenario(scenario: Scenario):
+    """
+    Runs a scenario and returns its timings, in milliseconds, for every phase it ran.
+    """
+    game = _build_game(scenario)
+    samples = {phase: [] for phase in PHASES}
+    clock = time.perf_counter_ns
+
+    for _ in range(scenario.frames):
+        _fill_arsenal(game)
+
+        start = clock()
+        game.alien_fleet.update_fleet()
+        samples['update_fleet'].append(clock() - start)
+
+        start = clock()
+        collisions = game.alien_fleet.check_collisions(game.ship.arsenal.arsenal)
+        samples['check_collisions'].append(clock() - start)
+
+        start = clock()
+        game.ship.arsenal.update_arsenal()
+        samples['update_arsenal'].append(clock() - start)
+
+        if collisions or scenario.hud_every_frame:
+            if collisions:
+                game.game_stats.update(collisions)
+            start = clock()
+            game.HUD.update_scores()
+            samples['update_scores'].append(clock() - start)
+
+        start = clock()
+        if collisions:
+            game.particles.burst(game.alien_fleet.screen_centers(collisions))
+        game.particles.update(1 / game.settings.FPS)
+        samples['update_particles'].append(clock() - start)
+
+        start = clock()
+        game.starfield.update(1 / game.settings.FPS)
+        samples['update_starfield'].append(clock() - start)
+
+        if scenario.reset_every_frame:
+            start = clock()
+            game.sim.reset_level()
+            samples['reset_level'].append(clock() - start)
+
+        start = clock()
+        game._update_screen()
+        samples['update_screen'].append(clock() - start)
+
+    return {phase: summarize(times) for phase, times in samples.items() if times}
+
+
+def summarize(times_ns):
+    """
+    Returns the mean, p95 and p99 of a list of nanosecond timings, in milliseconds.
+    """
+    times = sorted(t / 1e6 for t in times_ns)
+    if len(times) > 1:
+        cuts = statistics.quantiles(times, n=100, method='inclusive')
+        p95, p99 = cuts[94], cuts[98]
+    else:
+        p95 = p99 = times[0]
+    return {
+        'samples': len(times),
+        'mean_ms': statistics.fmean(times),
+        'p95_ms': p95,
+        'p99_ms': p99,
+    }
+
+
+def compare(results, baseline, threshold: float):
+    """
+    Returns a line for every phase whose mean or p95 is more than threshold slower than the baseline.
+    """
+    regressions = []
+    for name, phases in results['scenarios'].items():
+        for phase, stats in phases.items():
+            old = baseline.get('scenarios', {}).get(name, {}).get(phase)
+            if old is None:
+                continue
+            for key in ('mean_ms', 'p95_ms'):
+                if old[key] > 0 and stats[key] > old[key] * (1 + threshold):
+                    regressions.append(
+                        f'{name}/{phase} {key}: {old[key]:.3f} -> {stats[key]:.3f} ms '
+                        f'(+{(stats[key] / old[key] - 1) * 100:.0f}%)')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Alien Invasion frame phases.')
+    parser.add_argument('--scenario', action='append', help='only run the named scenario (repeatable)')
+    parser.add_argument('--frames', type=int, help='override how many frames each scenario times')
+    parser.add_argument('--output', default='benchmark_results.json', help='where to write the results')
+    parser.add_argument('--compare', help='baseline results to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='how much slower than the baseline counts as a regression (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'scenarios': {},
+    }
+    for scenario in scenarios:
+        if args.frames:
+            scenario.frames = args.frames
+        phases = run_scenario(scenario)
+        results['scenarios'][scenario.name] = phases
+        print(scenario.name)
+        for phase, stats in phases.items():
+            print(f'  {phase:<17} mean {stats["mean_ms"]:8.3f} ms   '
+                  f'p95 {stats["p95_ms"]:8.3f} ms   p99 {stats["p99_ms"]:8.3f} ms')
+
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=4)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
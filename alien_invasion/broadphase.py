@@ -0,0 +1,225 @@
+import pygame
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from settings import Settings
+
+
+class SpatialGrid:
+    """
+    A uniform grid that buckets sprites by the cells their rects cover, so a rect only has to be
+    tested against the sprites that share a cell with it.
+
+    Attributes:
+        cell_size (int): The width and height of one grid cell in pixels.
+        rect_attr (str): The sprite attribute holding the rect to bucket by, 'rect' unless the
+            sprites live in a formation and are bucketed by their 'home' rect.
+        cells (dict): Each (column, row) cell mapped to the sprites that overlap it.
+        order (dict): Each sprite mapped to its position in the group it was built from.
+
+    Methods:
+        __init__(self, cell_size, rect_attr): Initializes an empty grid.
+        rebuild(self, sprites): Buckets every sprite into the grid, replacing what was there.
+        remove(self, sprite): Takes a single sprite out of the grid.
+        query(self, rect): Returns the sprites that share at least one cell with rect.
+    """
+    def __init__(self, cell_size: int, rect_attr: str = 'rect'):
+        """
+        Initializes an empty grid.
+        """
+        self.cell_size = cell_size
+        self.rect_attr = rect_attr
+        self.cells = defaultdict(list)
+        self.order = {}
+
+    def _cells_for(self, rect: pygame.Rect):
+        """
+        Yields every (column, row) cell that rect covers.
+        """
+        size = self.cell_size
+        for col in range(rect.left // size, (rect.right - 1) // size + 1):
+            for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield col, row
+
+    def rebuild(self, sprites):
+        """
+        Buckets every sprite into the grid, replacing what was there.
+        """
+        self.cells = defaultdict(list)
+        self.order = {}
+        for index, sprite in enumerate(sprites):
+            self.order[sprite] = index
+            for cell in self._cells_for(getattr(sprite, self.rect_attr)):
+                self.cells[cell].append(sprite)
+
+    def remove(self, sprite):
+        """
+        Takes a single sprite out of the grid.
+        """
+        if self.order.pop(sprite, None) is None:
+            return
+        for cell in self._cells_for(getattr(sprite, self.rect_attr)):
+            bucket = self.cells.get(cell)
+            if bucket and sprite in bucket:
+                bucket.remove(sprite)
+
+    def query(self, rect: pygame.Rect):
+        """
+        Returns the sprites that share at least one cell with rect.
+        """
+        found = set()
+        cells = self.cells
+        for cell in self._cells_for(rect):
+            bucket = cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return found
+
+
+def masks_overlap(sprite_a, rect_a: pygame.Rect, sprite_b, rect_b: pygame.Rect):
+    """
+    Returns true if the opaque pixels of sprite_a's and sprite_b's masks touch, with the sprites at rect_a and rect_b.
+    """
+    return sprite_a.mask.overlap(sprite_b.mask, (rect_b.x - rect_a.x, rect_b.y - rect_a.y)) is not None
+
+
+class Broadphase:
+    """
+    Runs the game's collision checks through a uniform-grid broadphase.  The Broadphase class is
+    responsible for:
+    -  Building a SpatialGrid over a sprite group once per tick and reusing it for every query.
+    -  Answering groupcollide and spritecollideany with the same results as pygame.sprite.
+    -  Falling back to the brute-force pygame.sprite functions when settings.collision_mode
+       is 'brute', so both paths can be compared.
+    -  Checking the sprites' masks when settings.collision_precision is 'mask'.  The rect test runs
+       first, so masks are only compared for pairs whose rects overlap.
+
+    Groups that do their own vectorized collision checks (such as ArrayFleet) are handed the
+    query directly instead of being bucketed.
+
+    Groups registered as a formation (see AlienFleet) are bucketed by their sprites' home rects,
+    which only change when the formation is rebuilt, and queries are moved into formation space
+    by the formation's pixel offset.  Their grid survives the formation moving.
+
+    Methods:
+        __init__(self, settings): Initializes the broadphase.
+        register_formation(self, group, formation): Marks group as a rigid formation moved by formation.
+        invalidate(self): Forgets every grid, for when the sprites in them have moved.
+        groupcollide(self, groupa, groupb, dokilla, dokillb): Finds every sprite in groupa hit by groupb.
+        spritecollideany(self, sprite, group): Returns a sprite in group that sprite hits, or None.
+    """
+    def __init__(self, settings: 'Settings'):
+        """
+        Initializes the broadphase.
+        """
+        self.settings = settings
+        self.precise = settings.collision_precision == 'mask'
+        self._grids = {}
+        self._formations = {}
+
+    def register_formation(self, group, formation):
+        """
+        Marks group as a rigid formation.  formation must provide pixel_offset() and sync_rects().
+        """
+        self._formations[id(group)] = formation
+
+    def invalidate(self):
+        """
+        Forgets every grid, for when the sprites in them have moved.
+        """
+        self._grids.clear()
+
+    def _grid_for(self, group):
+        """
+        Returns the grid for group, building it if it isn't cached for this tick.
+        """
+        grid = self._grids.get(id(group))
+        if grid is None:
+            rect_attr = 'home' if id(group) in self._formations else 'rect'
+            grid = SpatialGrid(self.settings.collision_cell_size, rect_attr)
+            grid.rebuild(group)
+            self._grids[id(group)] = grid
+        return grid
+
+    def _offset(self, group):
+        """
+        Returns how far group's sprites are moved from the rects its grid was built on.
+        """
+        formation = self._formations.get(id(group))
+        if formation is None:
+            return 0, 0
+        return formation.pixel_offset()
+
+    def _sync(self, group):
+        """
+        Brings a formation's screen rects up to date before pygame.sprite reads them.
+        """
+        formation = self._formations.get(id(group))
+        if formation is not None:
+            formation.sync_rects()
+
+    def groupcollide(self, groupa, groupb, dokilla: bool, dokillb: bool):
+        """
+        Finds every sprite in groupa hit by a sprite in groupb.
+
+        Returns:
+            dict: Each hit sprite from groupa mapped to the list of groupb sprites that hit it.
+        """
+        if self.settings.collision_mode == 'brute':
+            self._sync(groupa)
+            collided = pygame.sprite.collide_mask if self.precise else None
+            return pygame.sprite.groupcollide(groupa, groupb, dokilla, dokillb, collided)
+        if not groupb:
+            return {}
+
+        grid = self._grid_for(groupa)
+        offset_x, offset_y = self._offset(groupa)
+        rect_attr = grid.rect_attr
+        precise = self.precise
+        candidates = {}
+        for sprite_b in groupb:
+            rect_b = sprite_b.rect.move(-offset_x, -offset_y)
+            for sprite_a in grid.query(rect_b):
+                rect_a = getattr(sprite_a, rect_attr)
+                if rect_a.colliderect(rect_b) and (not precise or masks_overlap(sprite_a, rect_a, sprite_b, rect_b)):
+                    candidates.setdefault(sprite_a, []).append(sprite_b)
+
+        # Walk the hits in groupa's order so a sprite_b used up by one sprite_a can't hit another,
+        # the same as pygame.sprite.groupcollide.
+        crashed = {}
+        used = set()
+        for sprite_a in sorted(candidates, key=grid.order.__getitem__):
+            hits = [sprite_b for sprite_b in candidates[sprite_a] if sprite_b not in used]
+            if not hits:
+                continue
+            crashed[sprite_a] = hits
+            if dokillb:
+                used.update(hits)
+                for sprite_b in hits:
+                    sprite_b.kill()
+            if dokilla:
+                grid.remove(sprite_a)
+                sprite_a.kill()
+        return crashed
+
+    def spritecollideany(self, sprite, group):
+        """
+        Returns a sprite in group that sprite hits, or None.
+        """
+        if hasattr(group, 'spritecollideany'):
+            return group.spritecollideany(sprite)
+        if self.settings.collision_mode == 'brute':
+            self._sync(group)
+            collided = pygame.sprite.collide_mask if self.precise else None
+            return pygame.sprite.spritecollideany(sprite, group, collided)
+
+        grid = self._grid_for(group)
+        offset_x, offset_y = self._offset(group)
+        rect = sprite.rect.move(-offset_x, -offset_y)
+        hits = [other for other in grid.query(rect) if rect.colliderect(getattr(other, grid.rect_attr))]
+        if self.precise:
+            hits = [other for other in hits if masks_overlap(other, getattr(other, grid.rect_attr), sprite, rect)]
+        if not hits:
+            return None
+        return min(hits, key=grid.order.__getitem__)
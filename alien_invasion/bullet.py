@@ -10,10 +10,13 @@ class Bullet(Sprite):
     Represents a bullet fired by the player's ship.
 
     Inherits from pygame.sprite.Sprite, allowing it to be easily managed in sprite groups.
+    Bullets are made once by the Arsenal's pool and reused; reset() places a bullet back
+    at the ship each time it is fired.
 
     Attributes:
         
         x (float): The bullet's horizontal position.
+        mask (pygame.mask.Mask): The bullet image's shared collision mask.
     """
     def __init__(self, game: 'AlienInvasion'):
         super().__init__()
@@ -21,11 +24,18 @@ class Bullet(Sprite):
         self.screen = game.screen
         self.settings = game.settings
 
-        self.image = pygame.image.load(self.settings.bullet_file)
-        self.image = pygame.transform.scale(self.image, (self.settings.bullet_w, self.settings.bullet_h))
+        self.image = game.assets.get_image(
+            self.settings.bullet_file, (self.settings.bullet_w, self.settings.bullet_h))
+        self.mask = game.assets.get_mask(self.settings.bullet_file, (self.settings.bullet_w, self.settings.bullet_h))
 
         self.rect = self.image.get_rect()
-        self.rect.midleft = game.ship.rect.midleft
+        self.x = float(self.rect.x)
+
+    def reset(self):
+        """
+        Moves the bullet back to the front of the ship so it can be fired again.
+        """
+        self.rect.midleft = self.game.ship.rect.midleft
         self.x = float(self.rect.x)
         
     def update(self):
@@ -25,6 +25,7 @@ class Button:
         _prep_msg(self, msg): Prepares the button's text image.
         draw(self): Renders the button and the text.
         check_clicked(self, mouse_pos): Checks if the button has been clicked. Returns true if so.
+        get_rects(self): Returns the rects of the button and its text, for the renderer's dirty rects.
     """
     def __init__(self, game: 'AlienInvasion', msg):
         """
@@ -58,6 +59,12 @@ class Button:
         self.screen.fill(self.settings.button_color, self.rect)
         self.screen.blit(self.msg_image, self.msg_image_rect)
 
+    def get_rects(self):
+        """
+        Returns the rects of the button and its text, for the renderer's dirty rects.
+        """
+        return [self.rect, self.msg_image_rect]
+
     def check_clicked(self, mouse_pos):
         """
         Checks if the button has been clicked. Returns true if so.
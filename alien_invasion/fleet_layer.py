@@ -0,0 +1,88 @@
+import pygame
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from alien_fleet import AlienFleet
+
+
+class FleetLayer:
+    """
+    Draws the whole formation as one pre-rendered surface.  The FleetLayer class is responsible for:
+    -  Compositing every living alien onto an offscreen surface the size of the formation.
+    -  Blitting that surface once per frame at the formation's offset.
+    -  Clearing only the cell of an alien that dies, instead of re-compositing the formation.
+
+    Formations are laid out on a grid, so aliens don't share pixels and clearing one alien's cell
+    never erases part of another.
+
+    Attributes:
+        surface (pygame.Surface): The composited formation, or None until it is built.
+        origin (tuple): The formation-space position of the surface's top left corner.
+        rebuilds (int): How many times the formation has been composited from scratch.
+
+    Methods:
+        __init__(self, fleet): Initializes the layer.
+        invalidate(self): Makes the next draw re-composite the formation.
+        remove(self, home): Clears a dead alien's cell.
+        get_rect(self): Returns where the layer will be drawn on the screen.
+        draw(self): Renders the formation.
+    """
+    def __init__(self, fleet: 'AlienFleet'):
+        """
+        Initializes the layer.
+        """
+        self.fleet = fleet
+        self.settings = fleet.settings
+        self.screen = fleet.game.screen
+        self.image = fleet.game.assets.get_image(
+            self.settings.alien_file, (self.settings.alien_w, self.settings.alien_h))
+        self.surface = None
+        self.origin = (0, 0)
+        self.rebuilds = 0
+
+    def invalidate(self):
+        """
+        Makes the next draw re-composite the formation.
+        """
+        self.surface = None
+
+    def _build(self):
+        """
+        Composites every living alien onto a surface the size of the formation.
+        """
+        homes = [alien.home for alien in self.fleet.fleet]
+        if not homes:
+            self.surface = pygame.Surface((0, 0), pygame.SRCALPHA)
+            self.origin = (0, 0)
+            return
+        bounds = homes[0].unionall(homes[1:])
+        self.origin = bounds.topleft
+        self.surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        image = self.image
+        origin_x, origin_y = self.origin
+        self.surface.blits(
+            [(image, (home.x - origin_x, home.y - origin_y), None, pygame.BLEND_RGBA_MAX) for home in homes], False)
+        self.rebuilds += 1
+
+    def remove(self, home: pygame.Rect):
+        """
+        Clears a dead alien's cell.
+        """
+        if self.surface is not None:
+            self.surface.fill((0, 0, 0, 0), home.move(-self.origin[0], -self.origin[1]))
+
+    def get_rect(self):
+        """
+        Returns where the layer will be drawn on the screen.
+        """
+        if self.surface is None:
+            self._build()
+        offset_x, offset_y = self.fleet.pixel_offset()
+        return self.surface.get_rect(topleft=(self.origin[0] + offset_x, self.origin[1] + offset_y))
+
+    def draw(self):
+        """
+        Renders the formation with a single blit.
+        """
+        rect = self.get_rect()
+        self.screen.blit(self.surface, rect)
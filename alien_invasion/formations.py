@@ -0,0 +1,154 @@
+import functools
+import json
+import math
+from pathlib import Path
+from settings import Settings
+
+
+class Formation:
+    """
+    A fleet formation loaded from a JSON file in settings.formations_dir.  The Formation class is responsible for:
+    -  Choosing which cells of the fleet grid hold an alien, from a repeating tile and an outline.
+    -  Bending the columns into a wave, if the formation has one.
+    -  Working out the aliens' places once per screen and alien size and keeping them for every later level.
+
+    A formation file looks like:
+        {"tile": ["..", ".#"], "outline": "diamond", "wave": [0.5, 4]}
+    tile is repeated across the grid, one string per grid row and one character per column, '#' marking an
+    alien.  outline is 'rectangle' (the default) or 'diamond', which keeps only the cells inside the diamond
+    touching the middle of each side of the grid.  wave moves each column up or down by the first number
+    times alien_h, on a sine wave that repeats every second number of columns.
+
+    Attributes:
+        name (str): The formation's name, its file name without the extension.
+        tile (tuple): The repeating tile's rows.
+        outline (str): 'rectangle' or 'diamond'.
+        wave (tuple): The wave's amplitude in alien heights, and its period in columns.
+
+    Methods:
+        __init__(self, name, tile, outline, wave): Initializes the formation.
+        from_file(cls, path): Loads a formation from a JSON file.
+        layout(self, screen_w, screen_h, alien_w, alien_h): Returns every alien's place in the formation.
+    """
+    OUTLINES = ('rectangle', 'diamond')
+
+    __slots__ = ('name', 'tile', 'outline', 'wave', '_layouts')
+
+    def __init__(self, name: str, tile, outline: str = 'rectangle', wave=(0, 1)):
+        """
+        Initializes the formation.
+
+        Raises:
+            ValueError: If the tile, outline or wave isn't valid.
+        """
+        tile = tuple(tile)
+        if not tile or not tile[0] or any(len(row) != len(tile[0]) or set(row) - {'.', '#'} for row in tile):
+            raise ValueError(f"Formation {name!r}: tile must be rows of '.' and '#', all the same length")
+        if outline not in self.OUTLINES:
+            raise ValueError(f'Formation {name!r}: outline must be one of {", ".join(self.OUTLINES)}')
+        amplitude, period = wave
+        if period <= 0:
+            raise ValueError(f"Formation {name!r}: the wave's period must be above 0")
+        self.name = name
+        self.tile = tile
+        self.outline = outline
+        self.wave = (amplitude, period)
+        self._layouts = {}
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Loads a formation from a JSON file, named after the file.
+        """
+        path = Path(path)
+        values = json.loads(path.read_text())
+        return cls(path.stem, values['tile'], values.get('outline', 'rectangle'), tuple(values.get('wave', (0, 1))))
+
+    def _holds_alien(self, col: int, row: int, cols: int, rows: int):
+        """
+        Returns true if the grid cell at col, row holds an alien.
+        """
+        if self.tile[row % len(self.tile)][col % len(self.tile[0])] != '#':
+            return False
+        if self.outline == 'diamond':
+            return abs(col - (cols - 1) / 2) / (cols / 2) + abs(row - (rows - 1) / 2) / (rows / 2) <= 1
+        return True
+
+    def layout(self, screen_w: int, screen_h: int, alien_w: int, alien_h: int):
+        """
+        Returns the x and y of every alien's place in the formation, column by column.  Each screen and
+        alien size is only worked out once.
+
+        Returns:
+            tuple: An (x, y) pair for every alien.
+        """
+        key = (screen_w, screen_h, alien_w, alien_h)
+        if key not in self._layouts:
+            cols, rows = grid_size(alien_w, screen_w, alien_h, screen_h)
+            x_offset, y_offset = grid_offsets(screen_h, alien_h, cols)
+            amplitude, period = self.wave
+            homes = []
+            for col in range(cols):
+                wave_y = round(amplitude * alien_h * math.sin(2 * math.pi * col / period)) if amplitude else 0
+                for row in range(rows):
+                    if self._holds_alien(col, row, cols, rows):
+                        homes.append((alien_w * col + x_offset, alien_h * row + y_offset + wave_y))
+            self._layouts[key] = tuple(homes)
+        return self._layouts[key]
+
+
+def grid_size(alien_w: int, screen_w: int, alien_h: int, screen_h: int):
+    """
+    Returns how many columns and rows the fleet grid has.  Both are odd, so a checker formation has an
+    empty column and row all round it.
+    """
+    rows = ((screen_w / 1.5) // alien_w)
+    cols = ((screen_h / 2) // alien_h)
+
+    if rows % 2 == 0:
+        rows -= 1
+    else:
+        rows -= 2
+    if cols % 2 == 0:
+        cols -= 1
+    else:
+        cols -= 2
+
+    return int(cols), int(rows)
+
+
+def grid_offsets(screen_h: int, alien_h: int, cols: int):
+    """
+    Returns the x and y offsets of the fleet grid.
+    """
+    half_screen = screen_h // 2
+    fleet_vertical_space = cols * alien_h
+    x_offset = 0
+    y_offset = int((half_screen - fleet_vertical_space) // 2)
+    return x_offset, y_offset
+
+
+@functools.lru_cache(maxsize=None)
+def load_formations(directory: Path):
+    """
+    Loads every formation file in directory, once per process, so their layouts are shared by every fleet.
+
+    Returns:
+        dict: Each formation's name mapped to its Formation.
+    """
+    return {path.stem: Formation.from_file(path) for path in sorted(Path(directory).glob('*.json'))}
+
+
+def level_formations(settings: Settings):
+    """
+    Returns the Formations named in settings.formations, in order.  Level n uses the
+    (n - 1) % len(...)th one, so the list repeats once every formation has been played.
+
+    Raises:
+        ValueError: If a formation named in the settings has no file.
+    """
+    library = load_formations(Path(settings.formations_dir))
+    missing = [name for name in settings.formations if name not in library]
+    if missing:
+        raise ValueError(f'No formation file for {", ".join(missing)} in {settings.formations_dir}')
+    return [library[name] for name in settings.formations]
@@ -0,0 +1,132 @@
+import heapq
+
+
+class Scheduler:
+    """
+    Runs callbacks after a delay measured in frame time, so waiting never blocks the frame loop.
+
+    Attributes:
+        time (float): How many seconds of frame time have passed.
+
+    Methods:
+        __init__(self): Initializes the scheduler.
+        after(self, delay, callback): Runs callback once delay seconds of frame time have passed.
+        cancel(self, timer): Stops a timer from running.
+        advance(self, dt): Moves frame time forward and runs every timer that is due.
+    """
+    def __init__(self):
+        """
+        Initializes the scheduler.
+        """
+        self.time = 0.0
+        self._timers = []
+        self._cancelled = set()
+        self._next_id = 0
+
+    def after(self, delay: float, callback):
+        """
+        Runs callback once delay seconds of frame time have passed.
+
+        Returns:
+            int: The timer's id, for cancel().
+        """
+        self._next_id += 1
+        heapq.heappush(self._timers, (self.time + delay, self._next_id, callback))
+        return self._next_id
+
+    def cancel(self, timer: int):
+        """
+        Stops a timer from running.
+        """
+        self._cancelled.add(timer)
+
+    def advance(self, dt: float):
+        """
+        Moves frame time forward by dt seconds and runs every timer that is due, earliest first.
+        """
+        self.time += dt
+        timers = self._timers
+        while timers and timers[0][0] <= self.time:
+            _, timer, callback = heapq.heappop(timers)
+            if timer in self._cancelled:
+                self._cancelled.discard(timer)
+                continue
+            callback()
+
+
+class GameStateMachine:
+    """
+    Tracks what the game is doing between frames.  The GameStateMachine class is responsible for:
+    -  Holding the current state: the menu, playing, the pause after a life is lost, the pause between
+       levels, and game over.
+    -  Timing the pauses on frame time through a Scheduler, so events, audio and drawing carry on while
+       the game waits.
+
+    Only the PLAYING state steps the simulation.  Pauses of 0 seconds are skipped straight away.
+
+    Attributes:
+        state (str): One of MENU, PLAYING, LIFE_LOST, LEVEL_TRANSITION or GAME_OVER.
+        scheduler (Scheduler): Runs the timers that end pauses.
+
+    Methods:
+        __init__(self, settings): Initializes the state machine in the menu.
+        playing(self): Returns true if the simulation should be stepped.
+        start_game(self): Goes to PLAYING.
+        life_lost(self): Pauses in LIFE_LOST, then goes back to PLAYING.
+        level_cleared(self): Pauses in LEVEL_TRANSITION, then goes back to PLAYING.
+        game_over(self): Pauses in GAME_OVER, then goes to the MENU.
+        update(self, dt): Advances the state machine's timers by a frame.
+    """
+    MENU = 'menu'
+    PLAYING = 'playing'
+    LIFE_LOST = 'life_lost'
+    LEVEL_TRANSITION = 'level_transition'
+    GAME_OVER = 'game_over'
+
+    def __init__(self, settings):
+        """
+        Initializes the state machine in the menu.
+        """
+        self.settings = settings
+        self.state = self.MENU
+        self.scheduler = Scheduler()
+        self._timer = None
+
+    @property
+    def playing(self):
+        return self.state == self.PLAYING
+
+    def _enter(self, state: str, duration: float = None, then: str = None):
+        """
+        Switches to state, and after duration seconds to then.  Any pause already running is dropped.
+        """
+        if self._timer is not None:
+            self.scheduler.cancel(self._timer)
+            self._timer = None
+        self.state = state
+        if then is not None and duration <= 0:
+            self.state = then
+        elif then is not None:
+            self._timer = self.scheduler.after(duration, lambda: self._end_pause(then))
+
+    def _end_pause(self, state: str):
+        self._timer = None
+        self.state = state
+
+    def start_game(self):
+        self._enter(self.PLAYING)
+
+    def life_lost(self):
+        self._enter(self.LIFE_LOST, self.settings.life_lost_pause, self.PLAYING)
+
+    def level_cleared(self):
+        self._enter(self.LEVEL_TRANSITION, self.settings.level_transition_pause, self.PLAYING)
+
+    def game_over(self):
+        self._enter(self.GAME_OVER, self.settings.game_over_pause, self.MENU)
+
+    def update(self, dt: float):
+        """
+        Advances the state machine's timers by a frame of dt seconds.
+        """
+        self.scheduler.advance(dt)
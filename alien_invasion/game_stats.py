@@ -1,4 +1,4 @@
-import json
+from score_store import ScoreStore
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -12,60 +12,57 @@ class GameStats():
     This class is responsible for 
     - Storing and updating information such as the 
     current score, the high score, the number of ships remaining, and the current game level. 
-    - Handling saving and loading the high score from a file to persist across game sessions.
+    - Recording finished games in a ScoreStore, which keeps the high score and leaderboard across game sessions.
 
     Attributes:
         max_score (int): The highest score achieved in the current game session.
-        hi_score (int): The overall high score, loaded from and saved to a file.
+        hi_score (int): The overall high score, loaded from the score store.
+        store (ScoreStore): The journal and leaderboard of finished games.
         ships_left (int): The number of player ships remaining.
         score (int): The current score of the game.
         level (int): The current level of the game.
     Methods:
-        __init__(self, game: 'AlienInvasion'): Initializes the game stats.
-        init_saved_scores(self): Initializes the high score by grabbing the score from a saved JSON file.
-        save_scores(self): Writes the new high score to the JSON file. Handles errors with the file being missing.
+        __init__(self, game: 'AlienInvasion', store: ScoreStore): Initializes the game stats.
+        init_saved_scores(self, store): Takes the high score from the score store.
+        record_game(self): Records the game that just finished in the score store.
+        save_scores(self): Makes sure every recorded game is on disk, before the game closes.
         reset_stats(self): Resets the level, lives, and score when a new game starts.
         update(self, collisions): Updates game statistics based on game events.
         update_level(self): Increases the current game level.
     """
-    def __init__(self, game: 'AlienInvasion'):
+    def __init__(self, game: 'AlienInvasion', store: ScoreStore):
         """
         Initializes the game stats.
         """
         self.game = game
         self.settings = game.settings
         self.max_score = 0
-        self.init_saved_scores()
+        self.init_saved_scores(store)
         self.reset_stats()
 
-    def init_saved_scores(self):
-        """
-        Initializes the high score by grabbing the score from a saved JSON file.
-        """
-        self.path = self.settings.scores_file
-        if self.path.exists() and self.path.stat.__sizeof__() > 20:
-            contents = self.path.read_text()
-            scores = json.loads(contents)
-            self.hi_score = scores.get('hi_score', 0)
-            if not contents:
-                print('file empty')
-            
-        else:
-            self.hi_score = 0
-            self.save_scores()
-    
+    def init_saved_scores(self, store: ScoreStore):
+        """
+        Takes the high score from the score store that finished games are recorded in.
+        """
+        self.store = store
+        self.hi_score = self.store.hi_score
+
+    def record_game(self):
+        """
+        Records the game that just finished in the score store.  Returns straight away; the store
+        writes it to disk in the background.
+        """
+        self.store.record_game(self.settings.player_name, self.score, self.level)
+
     def save_scores(self):
         """
-        Writes the new high score to the JSON file. Handles errors with the file being missing.
+        Makes sure every recorded game is on disk, before the game closes.  If the store couldn't write
+        them, says so rather than stopping the game from closing.
         """
-        scores = {
-            'hi_score': self.hi_score
-        }
-        contents = json.dumps(scores, indent=4)
         try:
-            self.path.write_text(contents)
-        except FileNotFoundError as e:
-            print(f'File Not Found: {e}')
+            self.store.close()
+        except OSError as e:
+            print(f'Some finished games were not saved: {e}')
 
 
 
@@ -0,0 +1,57 @@
+import pygame
+
+
+class GlyphAtlas:
+    """
+    Pre-renders a small set of characters into one surface so numbers can be drawn by copying
+    glyphs instead of calling font.render every time they change.
+
+    Glyphs are copied with BLEND_RGBA_MAX, which gives an exact copy onto a cleared (fully transparent)
+    surface, so text assembled from the atlas looks the same as text rendered in one go.
+
+    Attributes:
+        surface (pygame.Surface): Every glyph side by side.
+        glyphs (dict): Each character mapped to its area of the atlas surface.
+        height (int): The height of the tallest glyph.
+
+    Methods:
+        __init__(self, font, color, chars): Renders the atlas.
+        size(self, text): Returns the width and height text takes up.
+        draw(self, target, pos, text): Copies the glyphs for text onto target.
+    """
+    def __init__(self, font: pygame.font.Font, color, chars: str = '0123456789, -'):
+        """
+        Renders the atlas.
+
+        Args:
+            font (pygame.font.Font): The font to render the glyphs with.
+            color (tuple): The text color.
+            chars (str): The characters the atlas can draw.
+        """
+        images = [font.render(char, True, color, None) for char in chars]
+        width = sum(image.get_width() for image in images)
+        self.height = max(image.get_height() for image in images)
+
+        self.surface = pygame.Surface((width, self.height), pygame.SRCALPHA)
+        self.glyphs = {}
+        x = 0
+        for char, image in zip(chars, images):
+            self.surface.blit(image, (x, 0))
+            self.glyphs[char] = pygame.Rect(x, 0, image.get_width(), image.get_height())
+            x += image.get_width()
+
+    def size(self, text: str):
+        """
+        Returns the width and height text takes up.
+        """
+        return sum(self.glyphs[char].width for char in text), self.height
+
+    def draw(self, target: pygame.Surface, pos, text: str):
+        """
+        Copies the glyphs for text onto target, starting at pos.
+        """
+        x, y = pos
+        for char in text:
+            area = self.glyphs[char]
+            target.blit(self.surface, (x, y), area, pygame.BLEND_RGBA_MAX)
+            x += area.width
@@ -0,0 +1,132 @@
+import argparse
+import importlib
+import inspect
+import random
+import time
+from simulation import Simulation, FrameInput
+
+
+class SweepPolicy:
+    """
+    A simple scripted player: sweeps the ship up and down the screen and fires whenever it can.
+
+    Attributes:
+        period (int): How many steps the ship moves in one direction before turning around.
+    """
+    def __init__(self, period: int = 120):
+        self.period = period
+        self.inputs = FrameInput()
+
+    def __call__(self, sim: Simulation):
+        going_up = (sim.frame // self.period) % 2 == 0
+        self.inputs.up = going_up
+        self.inputs.down = not going_up
+        self.inputs.fire = True
+        return self.inputs
+
+
+class RandomPolicy:
+    """
+    A random player: holds a random direction for a random number of steps and fires at random.
+
+    Attributes:
+        fire_chance (float): The chance of firing on any step.
+    """
+    def __init__(self, seed: int = None, fire_chance: float = 0.3):
+        self.random = random.Random(seed)
+        self.fire_chance = fire_chance
+        self.inputs = FrameInput()
+        self._hold = 0
+
+    def __call__(self, sim: Simulation):
+        if self._hold <= 0:
+            self._hold = self.random.randint(5, 60)
+            move = self.random.randrange(3)
+            self.inputs.up = move == 1
+            self.inputs.down = move == 2
+        self._hold -= 1
+        self.inputs.fire = self.random.random() < self.fire_chance
+        return self.inputs
+
+
+POLICIES = {
+    'sweep': SweepPolicy,
+    'random': RandomPolicy,
+}
+
+
+def make_policy(name: str, seed: int = None):
+    """
+    Builds a policy by name, either one of POLICIES or 'module:Class' for a policy defined elsewhere.
+    Policies that take a seed are given one.
+    """
+    if ':' in name:
+        module_name, class_name = name.split(':', 1)
+        policy_class = getattr(importlib.import_module(module_name), class_name)
+    else:
+        policy_class = POLICIES[name]
+    if 'seed' in inspect.signature(policy_class).parameters:
+        return policy_class(seed=seed)
+    return policy_class()
+
+
+class HeadlessDriver:
+    """
+    Steps a Simulation with no window, audio or frame clock, as fast as the CPU allows.
+
+    Attributes:
+        sim (Simulation): The game being driven.
+        policy (callable): Called with the simulation each step, returns the FrameInput to use.
+        games (int): How many games have been started.
+        ticks (int): How many steps have been simulated in total.
+
+    Methods:
+        __init__(self, sim, policy): Initializes the driver.
+        run(self, ticks, restart): Steps the simulation ticks times.
+    """
+    def __init__(self, sim: Simulation = None, policy=None):
+        """
+        Initializes the driver.
+
+        Args:
+            sim (Simulation): The game to drive. A default Simulation is made if None.
+            policy (callable): The player. SweepPolicy is used if None.
+        """
+        self.sim = sim or Simulation()
+        self.policy = policy or SweepPolicy()
+        self.games = 0
+        self.ticks = 0
+
+    def run(self, ticks: int, restart: bool = True):
+        """
+        Steps the simulation ticks times, starting a new game whenever one ends if restart is set.
+
+        Returns:
+            float: How many seconds the run took.
+        """
+        sim = self.sim
+        policy = self.policy
+        start = time.perf_counter()
+        for _ in range(ticks):
+            if not sim.game_active:
+                if not restart and self.games:
+                    break
+                sim.restart()
+                self.games += 1
+            sim.step(policy(sim))
+            self.ticks += 1
+        return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run Alien Invasion without a window.')
+    parser.add_argument('--ticks', type=int, default=10000, help='how many steps to simulate')
+    parser.add_argument('--policy', default='sweep', help="'sweep', 'random', or 'module:Class'")
+    parser.add_argument('--seed', type=int, help='seed for the policy')
+    args = parser.parse_args()
+
+    driver = HeadlessDriver(policy=make_policy(args.policy, args.seed))
+    elapsed = driver.run(args.ticks)
+    stats = driver.sim.game_stats
+    print(f'{driver.ticks} ticks in {elapsed:.2f}s ({driver.ticks / elapsed:,.0f} ticks/s), '
+          f'{driver.games} games, last score {stats.score}, level {stats.level}')
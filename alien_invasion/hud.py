@@ -1,4 +1,5 @@
 import pygame
+from glyph_atlas import GlyphAtlas
 
 class HUD:
     """
@@ -9,15 +10,24 @@ class HUD:
         - The current level in the game
         - The number of remaining lives
 
+    Everything is composed into one cached surface that is only rebuilt when the score, max score,
+    hi score, level or lives change, so drawing the HUD is a single blit.  The labels are rendered
+    once and the numbers are copied glyph by glyph from a GlyphAtlas instead of calling font.render.
+
     Attributes:
         padding (int): The spacing in pixels between HUD elements and screen edges.
+        atlas (GlyphAtlas): The pre-rendered digits the numbers are built from.
+        surface (pygame.Surface): The composed HUD.
+        redraws (int): How many times the composed HUD has been rebuilt.
 
     Methods:
         __init__(self, game): Initializes the HUD.
         setup_life_image(self): Renders the life image.
         update_scores(self): Updates the the current score, max score, and high score on the counter.
-        _draw_lives(self): Renders the remaining lives on the screen.
+        update_level(self): Updates the level on the counter.
+        _draw_lives(self): Renders the remaining lives onto the composed HUD.
         draw(self): Renders the score and level text on the screen.
+        get_rects(self): Returns the rects of the text and lives, for the renderer's dirty rects.
     """
     def __init__(self, game):
         """
@@ -30,66 +40,127 @@ class HUD:
         self.game_stats = game.game_stats
         self.font = pygame.font.Font(self.settings.font_file, self.settings.HUD_font_size)
         self.padding = 20
+        self.atlas = GlyphAtlas(self.font, self.settings.text_color)
+        self.labels = {
+            name: self.font.render(text, True, self.settings.text_color, None)
+            for name, text in (('score', 'Score: '), ('max_score', 'Max Score: '),
+                               ('hi_score', 'Hi Score: '), ('level', 'Level: '))
+        }
+        self.redraws = 0
+        self._state = None
         self.update_scores()
         self.setup_life_image()
         self.update_level()
 
+        height = max(self.level_rect.bottom, self.score_rect.bottom) + self.padding
+        self.surface = pygame.Surface((self.boundaries.width, height), pygame.SRCALPHA)
+
     def setup_life_image(self):
-        self.life_image = pygame.image.load(self.settings.ship_file)
-        self.life_image = pygame.transform.scale(self.life_image, (
+        self.life_image = self.game.assets.get_image(self.settings.ship_file, (
             self.settings.ship_w, self.settings.ship_h
             ))
         self.life_rect = self.life_image.get_rect()
 
-    
+    def _text_rect(self, name, number_str):
+        """
+        Returns a rect the size of a label followed by its number.
+        """
+        label = self.labels[name]
+        number_w, number_h = self.atlas.size(number_str)
+        return pygame.Rect(0, 0, label.get_width() + number_w, max(label.get_height(), number_h))
+
     def update_scores(self):
         self._update_max_score()
         self._update_score()
         self._update_hi_score()
-    
+        self._state = None
+
     def _update_score(self):
-        score_str = f'Score: {self.game_stats.score: ,.0f}'
-        self.score_image = self.font.render(score_str, True, self.settings.text_color, None)
-        self.score_rect = self.score_image.get_rect()
+        self.score_str = f'{self.game_stats.score: ,.0f}'
+        self.score_rect = self._text_rect('score', self.score_str)
         self.score_rect.right = self.boundaries.right - self.padding
         self.score_rect.top = self.max_score_rect.bottom + self.padding
 
     def _update_max_score(self):
-        max_score_str = f'Max Score: {self.game_stats.max_score: ,.0f}'
-        self.max_score_image = self.font.render(max_score_str, True, self.settings.text_color, None)
-        self.max_score_rect = self.max_score_image.get_rect()
+        self.max_score_str = f'{self.game_stats.max_score: ,.0f}'
+        self.max_score_rect = self._text_rect('max_score', self.max_score_str)
         self.max_score_rect.right = self.boundaries.right - self.padding
         self.max_score_rect.top = self.padding
 
     def _update_hi_score(self):
-        hi_score_str = f'Hi Score: {self.game_stats.hi_score: ,.0f}'
-        self.hi_score_image = self.font.render(hi_score_str, True, self.settings.text_color, None)
-        self.hi_score_rect = self.hi_score_image.get_rect()
+        self.hi_score_str = f'{self.game_stats.hi_score: ,.0f}'
+        self.hi_score_rect = self._text_rect('hi_score', self.hi_score_str)
         self.hi_score_rect.right = self.boundaries.right - self.padding
         self.hi_score_rect.midtop = (self.boundaries.centerx,self.padding)
     def update_level(self):
-        level_str = f'Level: {self.game_stats.level: ,.0f}'
-        self.level_image = self.font.render(level_str, True, self.settings.text_color, None)
-        self.level_rect = self.score_image.get_rect()
+        self.level_str = f'{self.game_stats.level: ,.0f}'
+        self.level_rect = self._text_rect('level', self.level_str)
         self.level_rect.left = self.padding
         self.level_rect.top = self.life_rect.bottom + self.padding
+        self._state = None
+
+    def _current_state(self):
+        stats = self.game_stats
+        return (stats.score, stats.max_score, stats.hi_score, stats.level, stats.ships_left)
+
+    def _sync(self):
+        """
+        Rebuilds the composed HUD if anything it shows has changed since it was last built.
+        """
+        state = self._current_state()
+        if state == self._state:
+            return
+        if self._state is None or state[:3] != self._state[:3]:
+            self._update_max_score()
+            self._update_score()
+            self._update_hi_score()
+        if self._state is None or state[3] != self._state[3]:
+            self.update_level()
+        self._state = state
+        self._compose()
+
+    def _draw_text(self, name, number_str, rect):
+        label = self.labels[name]
+        self.surface.blit(label, rect.topleft, None, pygame.BLEND_RGBA_MAX)
+        self.atlas.draw(self.surface, (rect.left + label.get_width(), rect.top), number_str)
+
+    def _compose(self):
+        """
+        Draws every HUD element onto the cached surface.
+        """
+        self.surface.fill((0, 0, 0, 0))
+        self._draw_text('hi_score', self.hi_score_str, self.hi_score_rect)
+        self._draw_text('max_score', self.max_score_str, self.max_score_rect)
+        self._draw_text('score', self.score_str, self.score_rect)
+        self._draw_text('level', self.level_str, self.level_rect)
+        self._draw_lives()
+        self.redraws += 1
 
     def _draw_lives(self):
         """
-        Renders the remaining lives on the screen.
+        Renders the remaining lives onto the composed HUD.
         """
         current_x = self.padding
         current_y = self.padding
         for _ in range(self.game_stats.ships_left):
-            self.screen.blit(self.life_image, (current_x, current_y))
+            self.surface.blit(self.life_image, (current_x, current_y), None, pygame.BLEND_RGBA_MAX)
             current_x += self.life_rect.width + self.padding
 
     def draw(self):
         """
         Renders the score and level text on the screen.
         """
-        self.screen.blit(self.hi_score_image, self.hi_score_rect)
-        self.screen.blit(self.max_score_image, self.max_score_rect)
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
-        self._draw_lives()
+        self._sync()
+        self.screen.blit(self.surface, (0, 0))
+
+    def get_rects(self):
+        """
+        Returns the rects of the text and lives, for the renderer's dirty rects.
+        """
+        self._sync()
+        rects = [self.hi_score_rect, self.max_score_rect, self.score_rect, self.level_rect]
+        current_x = self.padding
+        for _ in range(self.game_stats.ships_left):
+            rects.append(self.life_rect.move(current_x, self.padding))
+            current_x += self.life_rect.width + self.padding
+        return rects
@@ -0,0 +1,192 @@
+import math
+import numpy as np
+import pygame
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from alien_invasion import AlienInvasion
+
+
+class ParticleSystem:
+    """
+    Throws out a burst of glowing debris wherever an alien is destroyed.  The ParticleSystem class is responsible for:
+    -  Keeping every particle's position, velocity, lifetime, color and burst in preallocated NumPy arrays.
+    -  Moving, slowing and ageing every particle at once, and dropping the ones that have burnt out.
+    -  Drawing the particles straight into the screen's pixels through pygame.surfarray, each one added to
+       what is under it and fading as it ages.
+    -  Holding to settings.particle_budget: a big multi-kill spawns fewer particles per explosion, and if the
+       budget is still full the particles closest to burning out make way for the new ones.
+
+    No Python object is ever made per particle, so a frame with a hundred kills costs about the same as
+    a frame with one.  Live particles are kept packed at the front of the arrays, in the order their bursts
+    were spawned, so each burst's dirty rect is found with one reduceat.
+
+    Attributes:
+        capacity (int): The most particles that can be alive at once.
+        count (int): How many particles are alive.
+        spawned (int): How many particles have been spawned.
+        dropped (int): How many particles were cut short or never spawned because of the budget.
+
+    Methods:
+        __init__(self, game): Allocates the particle arrays.
+        burst(self, positions): Spawns an explosion at each position.
+        update(self, dt): Moves and ages every particle by dt seconds.
+        clear(self): Removes every particle.
+        get_rects(self): Returns a rect around each burst, for the renderer's dirty rects.
+        draw(self, surface, scale): Renders the particles.
+    """
+    COLORS = np.array([(255, 240, 180), (255, 180, 60), (255, 110, 30), (200, 200, 255)], dtype=np.float32)
+    # How quickly particles slow down, per second.
+    DRAG = 3.0
+
+    def __init__(self, game: 'AlienInvasion'):
+        """
+        Allocates the particle arrays.
+        """
+        self.settings = game.settings
+        self.screen = game.screen
+        self.capacity = self.settings.particle_budget
+        self.size = self.settings.particle_size
+        self.count = 0
+        self.spawned = 0
+        self.dropped = 0
+        self._next_burst = 0
+        # Seeded, so the same game always throws out the same debris.
+        self._rng = np.random.default_rng(0)
+
+        capacity = self.capacity
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.float32)
+        self.burst_id = np.zeros(capacity, dtype=np.int64)
+        self._arrays = (self.x, self.y, self.vx, self.vy, self.life, self.max_life, self.color, self.burst_id)
+
+    def _keep(self, indices):
+        """
+        Packs the particles at indices, which must be in order, to the front of the arrays.
+        """
+        kept = len(indices)
+        for array in self._arrays:
+            array[:kept] = array[indices]
+        self.count = kept
+
+    def burst(self, positions):
+        """
+        Spawns an explosion centred on each position.
+
+        Args:
+            positions (sequence): The screen x and y of each explosion.
+        """
+        explosions = len(positions)
+        if not explosions or not self.capacity:
+            return
+        per_burst = min(self.settings.particles_per_explosion, max(1, self.capacity // explosions))
+        if explosions * per_burst > self.capacity:
+            self.dropped += (explosions - self.capacity // per_burst) * per_burst
+            explosions = self.capacity // per_burst
+            positions = positions[:explosions]
+        amount = explosions * per_burst
+        self.dropped += (self.settings.particles_per_explosion - per_burst) * explosions
+
+        # Make room by cutting short the particles closest to burning out.
+        overflow = self.count + amount - self.capacity
+        if overflow >= self.count:
+            self.dropped += self.count
+            self.count = 0
+        elif overflow > 0:
+            survivors = np.argpartition(self.life[:self.count], overflow - 1)[overflow:]
+            self._keep(np.sort(survivors))
+            self.dropped += overflow
+
+        rng = self._rng
+        new = slice(self.count, self.count + amount)
+        centers = np.repeat(np.asarray(positions, dtype=np.float32), per_burst, axis=0)
+        angle = rng.uniform(0, 2 * math.pi, amount)
+        speed = rng.uniform(0.3, 1.0, amount) * self.settings.particle_speed
+        life = rng.uniform(0.5, 1.0, amount) * self.settings.particle_lifetime
+        self.x[new] = centers[:, 0] - self.size / 2
+        self.y[new] = centers[:, 1] - self.size / 2
+        self.vx[new] = np.cos(angle) * speed
+        self.vy[new] = np.sin(angle) * speed
+        self.life[new] = life
+        self.max_life[new] = life
+        self.color[new] = self.COLORS[rng.integers(len(self.COLORS), size=amount)]
+        self.burst_id[new] = np.repeat(np.arange(self._next_burst, self._next_burst + explosions), per_burst)
+        self._next_burst += explosions
+        self.count += amount
+        self.spawned += amount
+
+    def update(self, dt: float):
+        """
+        Moves, slows and ages every particle by dt seconds, and drops the ones that have burnt out.
+        """
+        if not self.count:
+            return
+        life = self.life[:self.count]
+        life -= dt
+        alive = life > 0
+        if not alive.all():
+            self._keep(np.flatnonzero(alive))
+        count = self.count
+        drag = math.exp(-self.DRAG * dt)
+        self.x[:count] += self.vx[:count] * dt
+        self.y[:count] += self.vy[:count] * dt
+        self.vx[:count] *= drag
+        self.vy[:count] *= drag
+
+    def clear(self):
+        """
+        Removes every particle.
+        """
+        self.count = 0
+
+    def get_rects(self):
+        """
+        Returns a rect around each burst's particles, for the renderer's dirty rects.
+        """
+        count = self.count
+        if not count:
+            return []
+        ids = self.burst_id[:count]
+        starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+        x = self.x[:count]
+        y = self.y[:count]
+        left = np.floor(np.minimum.reduceat(x, starts)).astype(np.int64).tolist()
+        top = np.floor(np.minimum.reduceat(y, starts)).astype(np.int64).tolist()
+        right = np.ceil(np.maximum.reduceat(x, starts)).astype(np.int64).tolist()
+        bottom = np.ceil(np.maximum.reduceat(y, starts)).astype(np.int64).tolist()
+        size = self.size + 1
+        return [pygame.Rect(l, t, r - l + size, b - t + size) for l, t, r, b in zip(left, top, right, bottom)]
+
+    def draw(self, surface: pygame.Surface = None, scale: float = 1.0):
+        """
+        Adds every particle's color, faded by its age, into surface's pixels.
+
+        Args:
+            surface (pygame.Surface): The surface to draw onto. The screen if None.
+            scale (float): How much smaller surface is than the screen, for the RenderScaler.
+        """
+        count = self.count
+        if not count:
+            return
+        surface = surface or self.screen
+        width, height = surface.get_size()
+        size = max(1, round(self.size * scale))
+        left = (self.x[:count] * scale).astype(np.int64)
+        top = (self.y[:count] * scale).astype(np.int64)
+        color = self.color[:count] * (self.life[:count] / self.max_life[:count])[:, None]
+
+        pixels = pygame.surfarray.pixels3d(surface)
+        for dx in range(size):
+            for dy in range(size):
+                x = left + dx
+                y = top + dy
+                inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+                x = x[inside]
+                y = y[inside]
+                pixels[x, y] = np.minimum(pixels[x, y] + color[inside], 255)
+        del pixels
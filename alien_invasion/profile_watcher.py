@@ -0,0 +1,70 @@
+import json
+import time
+from pathlib import Path
+from settings import Settings, tomllib
+
+
+class ProfileWatcher:
+    """
+    Reloads a settings profile whenever its file changes, so the game can be tuned while it runs.
+
+    The file's mtime is checked at most once every settings.profile_poll_interval seconds.  A changed
+    profile is read and every name and value in it checked before any setting changes, and it is applied
+    in one go between frames, so a frame never sees half a profile and a broken file or a value of the
+    wrong type leaves the settings alone.
+
+    Speeds, points, pauses and other values read while playing take effect straight away.  Sizes,
+    image files and the screen size are only read at startup, so changing them needs a restart.
+
+    Attributes:
+        path (Path): The profile being watched.
+        reloads (int): How many times the profile has been reloaded.
+
+    Methods:
+        __init__(self, settings, path): Starts watching a profile.
+        poll(self): Reloads the profile if it changed since it was last loaded.
+    """
+    def __init__(self, settings: Settings, path):
+        """
+        Starts watching a profile.  The profile itself should already be loaded.
+        """
+        self.settings = settings
+        self.path = Path(path)
+        self.reloads = 0
+        self._mtime = self._current_mtime()
+        self._last_check = time.monotonic()
+
+    def _current_mtime(self):
+        try:
+            return self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def poll(self):
+        """
+        Reloads the profile if it changed since it was last loaded.
+
+        Returns:
+            bool: True if the profile was reloaded.
+        """
+        now = time.monotonic()
+        if now - self._last_check < self.settings.profile_poll_interval:
+            return False
+        self._last_check = now
+
+        mtime = self._current_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        self._mtime = mtime
+
+        errors = (OSError, ValueError, TypeError, json.JSONDecodeError)
+        if tomllib is not None:
+            errors += (tomllib.TOMLDecodeError,)
+        try:
+            self.settings.load_profile(self.path)
+        except errors as e:
+            print(f'Not reloading {self.path}: {e}')
+            return False
+        self.reloads += 1
+        print(f'Reloaded {self.path}')
+        return True
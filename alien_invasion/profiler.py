@@ -0,0 +1,272 @@
+import csv
+import time
+from array import array
+import pygame
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from alien_invasion import AlienInvasion
+
+
+class FrameProfiler:
+    """
+    Times each phase of every frame into a fixed-size ring buffer.  The FrameProfiler class is responsible for:
+    -  Recording how long each phase of the frame took, with one perf_counter call per phase.
+    -  Keeping the most recent frames in a preallocated buffer so profiling never allocates.
+    -  Reporting per-phase percentiles and total frame times.
+    -  Writing the buffer out as CSV.
+
+    Attributes:
+        capacity (int): How many frames the ring buffer holds.
+        count (int): How many frames are currently in the buffer.
+        frames (int): How many frames have been recorded in total.
+
+    Methods:
+        __init__(self, capacity): Initializes the buffer.
+        start(self): Starts timing a frame.
+        mark(self, phase): Records the time since the last mark against phase.
+        end_frame(self): Finishes the current frame and moves to the next buffer row.
+        column(self, phase): Returns a phase's samples, oldest first, in milliseconds.
+        frame_times(self): Returns the total time of each frame, oldest first, in milliseconds.
+        current_ms(self): Returns the time marked so far in the frame being recorded, in milliseconds.
+        percentiles(self, phase, points): Returns the given percentiles of a phase, in milliseconds.
+        dump_csv(self, path): Writes the buffer to a CSV file.
+    """
+    EVENTS = 0
+    SHIP = 1
+    FLEET = 2
+    COLLISIONS = 3
+    SCREEN = 4
+    TICK = 5
+    PHASES = ('check_events', 'ship_update', 'update_fleet', 'check_collisions', 'update_screen', 'clock_tick')
+
+    def __init__(self, capacity: int = 600):
+        """
+        Initializes the buffer.
+
+        Args:
+            capacity (int): How many frames the ring buffer holds.
+        """
+        self.capacity = capacity
+        self.count = 0
+        self.frames = 0
+        self._width = len(self.PHASES)
+        # One spare row holds the frame being recorded, so it never overwrites a finished frame.
+        self._samples = array('d', bytes(8 * (capacity + 1) * self._width))
+        self._row = 0
+        self._last = 0.0
+
+    def start(self):
+        """
+        Starts timing a frame.
+        """
+        self._last = time.perf_counter()
+
+    def mark(self, phase: int):
+        """
+        Records the time since the last mark (or start) against phase.
+        """
+        now = time.perf_counter()
+        self._samples[self._row + phase] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        """
+        Finishes the current frame and clears the next buffer row for the next frame.
+        """
+        self.frames += 1
+        self.count = min(self.count + 1, self.capacity)
+        self._row = (self._row + self._width) % len(self._samples)
+        for offset in range(self._width):
+            self._samples[self._row + offset] = 0.0
+
+    def _rows(self):
+        """
+        Yields the start of each filled row, oldest first.
+        """
+        size = len(self._samples)
+        first = (self._row - self.count * self._width) % size
+        for index in range(self.count):
+            yield (first + index * self._width) % size
+
+    def column(self, phase: int):
+        """
+        Returns a phase's samples, oldest first, in milliseconds.
+        """
+        return [self._samples[row + phase] * 1000 for row in self._rows()]
+
+    def frame_times(self):
+        """
+        Returns the total time of each frame, oldest first, in milliseconds.
+        """
+        width = self._width
+        return [sum(self._samples[row:row + width]) * 1000 for row in self._rows()]
+
+    def current_ms(self):
+        """
+        Returns the time marked so far in the frame being recorded, in milliseconds.
+        """
+        return sum(self._samples[self._row:self._row + self._width]) * 1000
+
+    def percentiles(self, phase: int, points=(50, 95, 99)):
+        """
+        Returns the given percentiles of a phase, in milliseconds.
+        """
+        values = sorted(self.column(phase))
+        if not values:
+            return [0.0 for _ in points]
+        return [values[min(len(values) - 1, int(len(values) * point / 100))] for point in points]
+
+    def dump_csv(self, path):
+        """
+        Writes the buffer to a CSV file, one row per frame, oldest first.
+        """
+        columns = [self.column(phase) for phase in range(self._width)]
+        first_frame = self.frames - self.count
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['frame'] + [f'{name}_ms' for name in self.PHASES] + ['total_ms'])
+            for index in range(self.count):
+                values = [column[index] for column in columns]
+                writer.writerow([first_frame + index] + [f'{v:.4f}' for v in values] + [f'{sum(values):.4f}'])
+
+
+class StartupTimer:
+    """
+    Times each phase of startup, up to the first frame on screen, and reports the breakdown.
+
+    Attributes:
+        phases (list): (name, seconds) for each phase, in order.
+
+    Methods:
+        __init__(self): Starts timing.
+        mark(self, name): Records the time since the last mark against a phase.
+        total(self): Returns the time from the start to the last mark.
+        report(self): Returns the breakdown as text.
+    """
+    def __init__(self):
+        """
+        Starts timing.
+        """
+        self.phases = []
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, name: str):
+        """
+        Records the time since the last mark (or the start) against a phase.
+        """
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def total(self):
+        """
+        Returns the time from the start to the last mark, in seconds.
+        """
+        return self._last - self._start
+
+    def report(self):
+        """
+        Returns the breakdown as text, one line per phase.
+        """
+        total = self.total()
+        lines = [f'Startup: {total * 1000:.1f} ms']
+        for name, seconds in self.phases:
+            share = seconds / total * 100 if total else 0.0
+            lines.append(f'  {name:<16}{seconds * 1000:8.1f} ms {share:5.1f}%')
+        return '\n'.join(lines)
+
+
+class ProfilerOverlay:
+    """
+    Draws the profiler's rolling frame-time graph and per-phase percentiles next to the HUD.
+
+    The percentile text is only re-rendered every refresh_frames frames so the overlay itself
+    stays cheap.
+
+    Attributes:
+        visible (bool): Whether the overlay is drawn.
+        rect (pygame.Rect): Where the overlay is drawn on the screen.
+
+    Methods:
+        __init__(self, game, profiler): Initializes the overlay.
+        toggle(self): Shows or hides the overlay.
+        get_rects(self): Returns the overlay's rect while it is visible, for the renderer's dirty rects.
+        draw(self): Renders the overlay.
+    """
+    def __init__(self, game: 'AlienInvasion', profiler: FrameProfiler, refresh_frames: int = 30):
+        """
+        Initializes the overlay.
+        """
+        self.game = game
+        self.settings = game.settings
+        self.screen = game.screen
+        self.profiler = profiler
+        self.refresh_frames = refresh_frames
+        self.visible = self.settings.profiler_overlay
+
+        self.font = pygame.font.Font(self.settings.font_file, 12)
+        self.line_h = self.font.get_linesize()
+        self.graph_h = 60
+        width = 380
+        self.columns = (4, 200, 260, 320)
+        height = self.graph_h + self.line_h * (len(FrameProfiler.PHASES) + 1) + 8
+        padding = game.HUD.padding
+        self.rect = pygame.Rect(padding, game.HUD.level_rect.bottom + padding, width, height)
+
+        self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        self._text_images = []
+        self._last_refresh = -refresh_frames
+
+    def toggle(self):
+        """
+        Shows or hides the overlay.
+        """
+        self.visible = not self.visible
+        self.game.renderer.request_full_redraw()
+
+    def get_rects(self):
+        """
+        Returns the overlay's rect while it is visible, for the renderer's dirty rects.
+        """
+        return [self.rect] if self.visible else []
+
+    def _refresh_text(self):
+        """
+        Re-renders the per-phase percentile lines, one image per column.
+        """
+        color = self.settings.text_color
+        lines = [('phase', 'p50', 'p95', 'p99')]
+        for phase, name in enumerate(FrameProfiler.PHASES):
+            lines.append((name, *(f'{value:.2f}' for value in self.profiler.percentiles(phase))))
+        self._text_images = [[self.font.render(cell, True, color, None) for cell in line] for line in lines]
+
+    def draw(self):
+        """
+        Renders the overlay.
+        """
+        if not self.visible:
+            return
+        if self.profiler.frames - self._last_refresh >= self.refresh_frames:
+            self._refresh_text()
+            self._last_refresh = self.profiler.frames
+
+        surface = self.surface
+        surface.fill((0, 0, 0, 160))
+
+        # Frame-time graph, scaled so the frame budget sits halfway up.
+        budget = 1000 / self.settings.FPS
+        times = self.profiler.frame_times()[-self.rect.width:]
+        scale = self.graph_h / (budget * 2)
+        budget_y = self.graph_h - int(budget * scale)
+        pygame.draw.line(surface, (255, 200, 0), (0, budget_y), (self.rect.width, budget_y))
+        if len(times) > 1:
+            points = [(x, self.graph_h - min(self.graph_h, int(t * scale))) for x, t in enumerate(times)]
+            pygame.draw.lines(surface, (0, 255, 120), False, points)
+
+        y = self.graph_h + 4
+        for line in self._text_images:
+            for x, image in zip(self.columns, line):
+                surface.blit(image, (x, y))
+            y += self.line_h
+        self.screen.blit(surface, self.rect)
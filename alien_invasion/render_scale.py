@@ -0,0 +1,147 @@
+import pygame
+from asset_cache import AssetCache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from alien_invasion import AlienInvasion
+
+
+class RenderScaler:
+    """
+    Draws the game world into a smaller internal surface and upscales it to the window once per frame.
+    The RenderScaler class is responsible for:
+    -  Keeping an internal surface and background at the current render scale.
+    -  Handing out entity images pre-scaled to the current scale, cached in the game's AssetCache.
+    -  Blitting entities at their scaled positions, and upscaling the finished world to the window.
+
+    The HUD, play button and profiler overlay are drawn afterwards at the window's resolution, so text
+    stays sharp at any scale.  At a scale of 1 the game draws natively through the Renderer instead.
+
+    Attributes:
+        scale (float): The current render scale, one of settings.render_scale_levels.
+        surface (pygame.Surface): The internal surface the world is drawn into, or None at a scale of 1.
+
+    Methods:
+        __init__(self, game): Initializes the scaler at settings.render_scale.
+        set_scale(self, scale): Changes the render scale.
+        image(self, path, size): Returns an image pre-scaled to the current scale.
+        draw(self, path, size, rects): Blits an image at each rect, scaled.
+        begin(self): Clears the internal surface to the background.
+        finish(self): Upscales the internal surface to the window.
+    """
+    def __init__(self, game: 'AlienInvasion'):
+        """
+        Initializes the scaler at settings.render_scale.
+        """
+        self.game = game
+        self.settings = game.settings
+        self.window = game.screen
+        self.assets = game.assets
+        self.scale = 1.0
+        self.surface = None
+        self.background = None
+        self.set_scale(self.settings.render_scale)
+
+    def _scaled_size(self, size):
+        return max(1, round(size[0] * self.scale)), max(1, round(size[1] * self.scale))
+
+    def set_scale(self, scale: float):
+        """
+        Changes the render scale, rebuilding the internal surface and background for it.
+        """
+        if scale == self.scale and (scale >= 1 or self.surface is not None):
+            return
+        self.scale = scale
+        if scale >= 1:
+            self.surface = None
+            self.background = None
+        else:
+            size = self._scaled_size((self.settings.screen_w, self.settings.screen_h))
+            self.surface = pygame.Surface(size).convert() if pygame.display.get_surface() else pygame.Surface(size)
+            self.background = self.assets.get_image(self.settings.bg_file, size, AssetCache.CONVERT_OPAQUE)
+        self.game.renderer.request_full_redraw()
+
+    def image(self, path, size):
+        """
+        Returns the image at path pre-scaled to size at the current scale.  Each scale level's images are
+        made once and then come from the AssetCache.
+        """
+        return self.assets.get_image(path, self._scaled_size(size))
+
+    def draw(self, path, size, rects):
+        """
+        Blits the image at path, pre-scaled, at each rect's scaled position.
+        """
+        image = self.image(path, size)
+        scale = self.scale
+        self.surface.blits([(image, (int(rect.x * scale), int(rect.y * scale))) for rect in rects], False)
+
+    def begin(self):
+        """
+        Clears the internal surface to the background.
+        """
+        self.surface.blit(self.background, (0, 0))
+
+    def finish(self):
+        """
+        Upscales the internal surface to the window.
+        """
+        pygame.transform.scale(self.surface, self.window.get_size(), self.window)
+
+
+class ScaleGovernor:
+    """
+    Watches recent frame times and moves the render scale down a level when frames run over budget,
+    and back up when there is room to spare, to hold settings.FPS.
+
+    Decisions are made once per window of frames, on the window's 90th percentile frame time, and a
+    level change is followed by a cooldown window so the scale doesn't flicker between levels.
+
+    Attributes:
+        levels (tuple): The render scales to choose between, smallest first.
+        changes (int): How many times the scale has been changed.
+
+    Methods:
+        __init__(self, scaler, window): Initializes the governor.
+        record(self, frame_ms): Adds a frame's time, and changes the scale if a window is complete.
+    """
+    def __init__(self, scaler: RenderScaler, window: int = 60):
+        """
+        Initializes the governor.
+
+        Args:
+            scaler (RenderScaler): The scaler to adjust.
+            window (int): How many frames each decision looks at.
+        """
+        self.scaler = scaler
+        self.levels = tuple(sorted(scaler.settings.render_scale_levels))
+        self.window = window
+        self.budget_ms = 1000 / scaler.settings.FPS
+        self.changes = 0
+        self._times = []
+        self._cooldown = 0
+
+    def record(self, frame_ms: float):
+        """
+        Adds a frame's time (the time spent working, not waiting for the frame clock).
+        """
+        self._times.append(frame_ms)
+        if len(self._times) < self.window:
+            return
+        times = sorted(self._times)
+        self._times.clear()
+        if self._cooldown:
+            self._cooldown -= 1
+            return
+
+        p90 = times[int(len(times) * 0.9)]
+        level = min(range(len(self.levels)), key=lambda index: abs(self.levels[index] - self.scaler.scale))
+        if p90 > self.budget_ms * 0.9 and level > 0:
+            level -= 1
+        elif p90 < self.budget_ms * 0.5 and level < len(self.levels) - 1:
+            level += 1
+        else:
+            return
+        self.scaler.set_scale(self.levels[level])
+        self.changes += 1
+        self._cooldown = 1
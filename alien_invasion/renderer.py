@@ -0,0 +1,91 @@
+import pygame
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from alien_invasion import AlienInvasion
+
+
+class Renderer:
+    """
+    Pushes frames to the display, redrawing only the parts of the screen that changed.
+    The Renderer class is responsible for:
+    -  Restoring the background under the rects that were drawn last frame and will be drawn this frame.
+    -  Updating only those rects on the display instead of flipping the whole window.
+    -  Falling back to a full background blit and flip when most of the screen changed,
+       on the first frame, or when a full redraw was asked for.
+
+    With settings.render_mode set to 'full' every frame is a full redraw.
+
+    Attributes:
+        full_redraws (int): How many frames were pushed as a full redraw.
+        dirty_frames (int): How many frames were pushed as a list of dirty rects.
+
+    Methods:
+        __init__(self, game, background): Initializes the renderer.
+        request_full_redraw(self): Makes the next frame a full redraw.
+        begin_frame(self, rects, updated): Restores the background under last frame's and this frame's rects,
+            and where the background itself changed.
+        present(self): Pushes the frame to the display.
+    """
+    def __init__(self, game: 'AlienInvasion', background: pygame.Surface):
+        """
+        Initializes the renderer.
+
+        Args:
+            background (pygame.Surface): The screen-sized surface drawn behind everything.
+        """
+        self.game = game
+        self.settings = game.settings
+        self.screen = game.screen
+        self.boundaries = game.screen.get_rect()
+        self.background = background
+
+        self.full_redraws = 0
+        self.dirty_frames = 0
+        self._previous = []
+        self._dirty = []
+        self._full = True
+
+    def request_full_redraw(self):
+        """
+        Makes the next frame a full redraw.
+        """
+        self._full = True
+
+    def begin_frame(self, rects, updated=()):
+        """
+        Restores the background under the rects drawn last frame, the rects about to be drawn, and the
+        rects where the background itself changed.
+
+        Args:
+            rects (list): The rects of everything that will be drawn this frame.
+            updated (list): Rects where the background changed since the last frame drawn, such as the
+                starfield's.  Unlike rects, they aren't restored again next frame.
+        """
+        current = [rect.clip(self.boundaries) for rect in rects]
+        dirty = self._previous + current
+        self._previous = current
+        updated = [rect.clip(self.boundaries) for rect in updated]
+
+        max_area = self.boundaries.width * self.boundaries.height * self.settings.dirty_full_redraw_ratio
+        area = sum(rect.width * rect.height for rect in dirty) + sum(rect.width * rect.height for rect in updated)
+        if self._full or self.settings.render_mode == 'full' or area > max_area:
+            self._full = True
+            self.screen.blit(self.background, (0, 0))
+            return
+
+        self._dirty = [rect for rect in dirty + updated if rect.width and rect.height]
+        for rect in self._dirty:
+            self.screen.blit(self.background, rect, rect)
+
+    def present(self):
+        """
+        Pushes the frame to the display.
+        """
+        if self._full:
+            pygame.display.flip()
+            self.full_redraws += 1
+            self._full = False
+        else:
+            pygame.display.update(self._dirty)
+            self.dirty_frames += 1
@@ -0,0 +1,211 @@
+import argparse
+import json
+import struct
+import time
+import numpy as np
+from pathlib import Path
+from settings import Settings
+from simulation import Simulation, FrameInput
+
+MAGIC = b'AIREPLAY'
+VERSION = 1
+_HEADER = struct.Struct('<8sHI')
+
+UP = 1
+DOWN = 2
+FIRE = 4
+RESTART = 8
+
+
+def _settings_snapshot(settings: Settings):
+    """
+    Returns every setting a profile can set that can be written as JSON.  Paths are left out; they only
+    pick the assets and score file, which don't change how the game plays.  The dynamic settings are left
+    out too, as dynamic_overrides holds everything that changes them.
+    """
+    return {name: value for name, value in settings.as_dict().items()
+            if _replayable(name) and isinstance(value, (bool, int, float, str, list, tuple, dict))}
+
+
+def _replayable(name: str):
+    """
+    Returns true if a recording's header should set the setting name.  Older recordings also hold
+    the dynamic settings and the game's state; those are left to the game, as they are when recording.
+    """
+    return (name in Settings.__slots__ and not name.startswith('_')
+            and name not in Settings.DYNAMIC and name not in Settings.STATE)
+
+
+class Recorder:
+    """
+    Records a session as a compact binary stream.  The Recorder class is responsible for:
+    -  Writing a header holding the settings the session is played with.
+    -  Writing one byte per simulation step with the up, down and fire inputs packed into bits.
+    -  Marking the steps that follow a restart, so a replay starts its games at the same points.
+
+    The stream has no frame count; a replay's length comes from the file size, so a recording cut
+    short by a crash still plays back up to its last written step.
+
+    Attributes:
+        path (Path): Where the recording is written.
+        frames (int): How many steps have been recorded.
+
+    Methods:
+        __init__(self, path, settings): Opens the recording and writes the header.
+        mark_restart(self): Notes that the next step starts a new game.
+        record(self, inputs): Writes one step's inputs.
+        close(self): Flushes and closes the recording.
+    """
+    def __init__(self, path, settings: Settings):
+        """
+        Opens the recording and writes the header.
+
+        Args:
+            path (str or Path): Where to write the recording.
+            settings (Settings): The settings the session is played with, snapshotted now.
+        """
+        self.path = Path(path)
+        self.frames = 0
+        self._restart = 0
+        header = json.dumps({'settings': _settings_snapshot(settings)}).encode()
+        self.file = open(self.path, 'wb')
+        self.file.write(_HEADER.pack(MAGIC, VERSION, len(header)))
+        self.file.write(header)
+
+    def mark_restart(self):
+        """
+        Notes that the next recorded step starts a new game.
+        """
+        self._restart = RESTART
+
+    def record(self, inputs: FrameInput):
+        """
+        Writes one step's inputs as a single byte.
+        """
+        bits = self._restart | (UP if inputs.up else 0) | (DOWN if inputs.down else 0) | (FIRE if inputs.fire else 0)
+        self.file.write(bytes((bits,)))
+        self._restart = 0
+        self.frames += 1
+
+    def close(self):
+        """
+        Flushes and closes the recording.
+        """
+        if not self.file.closed:
+            self.file.close()
+
+
+class Replay:
+    """
+    Plays a recording back headless, as fast as the CPU allows.  The Replay class is responsible for:
+    -  Memory-mapping the recorded inputs, so even multi-hour recordings open instantly.
+    -  Rebuilding the recorded settings and stepping a Simulation with the recorded inputs.
+    -  Taking a snapshot every keyframe_interval steps, so seeking only replays from the nearest keyframe.
+
+    Attributes:
+        settings (Settings): The settings the recording was played with.
+        sim (Simulation): The game being replayed.
+        inputs (numpy.memmap): One byte of input bits per recorded step.
+        position (int): The next recorded step to play.
+        keyframes (dict): Step numbers mapped to the snapshot taken just before that step.
+
+    Methods:
+        __init__(self, path, keyframe_interval): Opens the recording.
+        __len__(self): Returns how many steps were recorded.
+        play(self, frames): Plays forward.
+        seek(self, frame): Puts the game at the given step.
+    """
+    def __init__(self, path, keyframe_interval: int = 600):
+        """
+        Opens the recording.
+
+        Args:
+            path (str or Path): The recording to play.
+            keyframe_interval (int): How many steps apart keyframes are taken.
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as file:
+            magic, version, header_size = _HEADER.unpack(file.read(_HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f'{self.path} is not a version {VERSION} Alien Invasion recording')
+            header = json.loads(file.read(header_size))
+        offset = _HEADER.size + header_size
+
+        if self.path.stat().st_size > offset:
+            self.inputs = np.memmap(self.path, dtype=np.uint8, mode='r', offset=offset)
+        else:
+            self.inputs = np.zeros(0, dtype=np.uint8)
+
+        self.settings = Settings()
+        # Settings added or removed since the recording was made are left at their defaults.
+        self.settings.apply_profile({name: value for name, value in header['settings'].items() if _replayable(name)})
+        self.settings.initialize_dynamic_settings()
+        self.sim = Simulation(self.settings)
+        self.keyframe_interval = keyframe_interval
+        self.position = 0
+        self.keyframes = {0: self.sim.snapshot()}
+        self._frame_input = FrameInput()
+
+    def __len__(self):
+        """
+        Returns how many steps were recorded.
+        """
+        return len(self.inputs)
+
+    def play(self, frames: int = None):
+        """
+        Plays forward frames steps, or to the end of the recording if frames is None.
+
+        Returns:
+            int: How many steps were played.
+        """
+        end = len(self.inputs) if frames is None else min(len(self.inputs), self.position + frames)
+        sim = self.sim
+        frame_input = self._frame_input
+        interval = self.keyframe_interval
+        keyframes = self.keyframes
+        # Converting to a list up front keeps the per-step work to plain int operations.
+        bits_run = self.inputs[self.position:end].tolist()
+        for position, bits in enumerate(bits_run, self.position):
+            if position % interval == 0 and position not in keyframes:
+                keyframes[position] = sim.snapshot()
+            if bits & RESTART:
+                sim.restart()
+            frame_input.up = (bits & UP) != 0
+            frame_input.down = (bits & DOWN) != 0
+            frame_input.fire = (bits & FIRE) != 0
+            sim.step(frame_input)
+        played = end - self.position
+        self.position = end
+        return played
+
+    def seek(self, frame: int):
+        """
+        Puts the game at the given step, restoring the nearest keyframe before it and playing on from there.
+        """
+        frame = max(0, min(frame, len(self.inputs)))
+        nearest = max(position for position in self.keyframes if position <= frame)
+        if frame < self.position or nearest > self.position:
+            self.sim.restore(self.keyframes[nearest])
+            self.position = nearest
+        self.play(frame - self.position)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play an Alien Invasion recording back headless.')
+    parser.add_argument('path', help='the recording to play')
+    parser.add_argument('--seek', type=int, help='stop at this step instead of the end')
+    parser.add_argument('--keyframe-interval', type=int, default=600, help='steps between keyframes')
+    args = parser.parse_args()
+
+    replay = Replay(args.path, args.keyframe_interval)
+    start = time.perf_counter()
+    if args.seek is None:
+        replay.play()
+    else:
+        replay.seek(args.seek)
+    elapsed = time.perf_counter() - start
+    stats = replay.sim.game_stats
+    print(f'{replay.position} of {len(replay)} steps in {elapsed:.2f}s '
+          f'({replay.position / max(elapsed, 1e-9):,.0f} steps/s), '
+          f'score {stats.score}, level {stats.level}, ships left {stats.ships_left}')
@@ -0,0 +1,323 @@
+import bisect
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+
+_RECORD = struct.Struct('<II')
+
+
+class GameRecord:
+    """
+    One finished game.
+
+    Attributes:
+        seq (int): The game's place in the order games were recorded, starting at 1.
+        player (str): Who played it.
+        score (int): The final score.
+        level (int): The level reached.
+        time (float): When the game ended, in seconds since the epoch.
+    """
+    __slots__ = ('seq', 'player', 'score', 'level', 'time')
+
+    def __init__(self, seq: int, player: str, score: int, level: int, time: float):
+        self.seq = seq
+        self.player = player
+        self.score = score
+        self.level = level
+        self.time = time
+
+    def to_dict(self):
+        return {'seq': self.seq, 'player': self.player, 'score': self.score, 'level': self.level, 'time': self.time}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['seq'], data['player'], data['score'], data['level'], data['time'])
+
+
+class ScoreStore:
+    """
+    Keeps every finished game safe on disk and answers leaderboard queries from memory.
+    The ScoreStore class is responsible for:
+    -  Appending each finished game to a journal, one length-prefixed, CRC-checked record per game.
+    -  Writing the journal from a background thread, so the frame loop never waits on the disk, and
+       fsyncing once per batch of waiting records instead of once per game.
+    -  Compacting the journal into the snapshot file every compact_every games.  The snapshot is written to
+       a temporary file, fsynced and renamed over the old one, so a crash leaves either the old or the new one.
+    -  Keeping a leaderboard index (the best capacity games, and each player's best) so top-K and per-player
+       queries never scan the history.
+
+    On load, the snapshot is read and then the journal's records after the snapshot's last_seq are replayed.
+    A record cut short or corrupted by a crash ends the journal; it and anything after it are dropped.
+    If the writer thread can't write, it keeps the error and stops writing; flush() and close() raise it.
+    A store made with no paths never touches the disk and only keeps the games recorded since, for headless games.
+
+    Attributes:
+        snapshot_path (Path): The compacted leaderboard, JSON.  Older files holding only a hi_score still load.
+            None for a store kept in memory.
+        journal_path (Path): The games recorded since the last compaction.  None for a store kept in memory.
+        capacity (int): How many of the best games the index keeps.
+        hi_score (int): The best score ever recorded.
+        games (int): How many games have been recorded in total.
+        compactions (int): How many times the journal has been compacted since the store was loaded.
+        error (OSError): What stopped the writer thread from writing, or None.
+
+    Methods:
+        __init__(self, snapshot_path, journal_path, capacity, compact_every): Loads the store.
+        from_settings(cls, settings): Loads the store from the settings' score files.
+        record_game(self, player, score, level): Records a finished game.
+        top(self, k): Returns the k best games.
+        best(self, player): Returns a player's best game.
+        flush(self): Waits until every recorded game is on disk.
+        close(self): Flushes and stops the writer thread.
+    """
+    def __init__(self, snapshot_path=None, journal_path=None, capacity: int = 100, compact_every: int = 1000):
+        """
+        Loads the store.
+
+        Args:
+            snapshot_path (str or Path): The snapshot file.  The store is kept in memory if None.
+            journal_path (str or Path): The journal file.  The store is kept in memory if None.
+            capacity (int): How many of the best games the index keeps.
+            compact_every (int): How many journaled games trigger a compaction.
+        """
+        on_disk = snapshot_path is not None and journal_path is not None
+        self.snapshot_path = Path(snapshot_path) if on_disk else None
+        self.journal_path = Path(journal_path) if on_disk else None
+        self.capacity = capacity
+        self.compact_every = compact_every
+
+        self.hi_score = 0
+        self.games = 0
+        self.compactions = 0
+        self.error = None
+        self._seq = 0
+        self._top = []
+        self._top_keys = []
+        self._best = {}
+        self._journaled = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+
+        if on_disk:
+            self._load_journal(self._load_snapshot())
+
+    @classmethod
+    def from_settings(cls, settings):
+        """
+        Loads the store from settings.scores_file and settings.scores_journal_file.
+        """
+        return cls(settings.scores_file, settings.scores_journal_file,
+                   settings.leaderboard_size, settings.scores_compact_every)
+
+    def _load_snapshot(self):
+        """
+        Reads the snapshot into the index and returns the seq of the last game it holds.
+        """
+        path = self.snapshot_path
+        if not path.exists() or path.stat().st_size == 0:
+            return 0
+        try:
+            data = json.loads(path.read_text())
+        except json.JSONDecodeError as e:
+            print(f'Ignoring unreadable scores file {path}: {e}')
+            return 0
+
+        self.hi_score = data.get('hi_score', 0)
+        self.games = data.get('games', 0)
+        self._seq = data.get('last_seq', 0)
+        for record in data.get('top', []):
+            self._index(GameRecord.from_dict(record))
+        for record in data.get('best', []):
+            self._index(GameRecord.from_dict(record))
+        return self._seq
+
+    def _load_journal(self, last_seq: int):
+        """
+        Replays the journal's records after last_seq, and cuts off a torn or corrupt tail.
+        """
+        path = self.journal_path
+        if not path.exists():
+            return
+        data = path.read_bytes()
+        offset = 0
+        while offset + _RECORD.size <= len(data):
+            length, checksum = _RECORD.unpack_from(data, offset)
+            start = offset + _RECORD.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            record = GameRecord.from_dict(json.loads(payload))
+            if record.seq > last_seq:
+                self._apply(record)
+            offset = start + length
+            self._journaled += 1
+
+        if offset < len(data):
+            print(f'Dropping {len(data) - offset} damaged bytes from the end of {path}')
+            with open(path, 'r+b') as file:
+                file.truncate(offset)
+
+    def _apply(self, record: GameRecord):
+        """
+        Counts a newly recorded game and adds it to the index.
+        """
+        self._seq = max(self._seq, record.seq)
+        self.games += 1
+        self.hi_score = max(self.hi_score, record.score)
+        self._index(record)
+
+    def _index(self, record: GameRecord):
+        """
+        Adds a game to the top list, if it makes it, and to its player's best.
+        """
+        key = (-record.score, record.seq)
+        position = bisect.bisect_left(self._top_keys, key)
+        new = position == len(self._top_keys) or self._top_keys[position] != key
+        if position < self.capacity and new:
+            self._top_keys.insert(position, key)
+            self._top.insert(position, record)
+            del self._top_keys[self.capacity:]
+            del self._top[self.capacity:]
+
+        best = self._best.get(record.player)
+        if best is None or record.score > best.score:
+            self._best[record.player] = record
+
+    def record_game(self, player: str, score: int, level: int):
+        """
+        Records a finished game.  The index is updated straight away; the journal is written by the
+        writer thread.
+
+        Returns:
+            GameRecord: The recorded game.
+        """
+        with self._lock:
+            record = GameRecord(self._seq + 1, player, score, level, time.time())
+            self._apply(record)
+        if self.journal_path is None:
+            return record
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_journal, name='score-store', daemon=True)
+            self._thread.start()
+        self._queue.put(record)
+        return record
+
+    def top(self, k: int = 10):
+        """
+        Returns the k best games, best first.  Only the best capacity games are kept.
+        """
+        with self._lock:
+            return self._top[:k]
+
+    def best(self, player: str):
+        """
+        Returns a player's best game, or None if they haven't played.
+        """
+        with self._lock:
+            return self._best.get(player)
+
+    def flush(self):
+        """
+        Waits until every recorded game is on disk.
+
+        Raises:
+            OSError: If the writer thread couldn't write them.
+        """
+        if self._thread is not None:
+            self._queue.join()
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        """
+        Flushes and stops the writer thread.
+
+        Raises:
+            OSError: If the writer thread couldn't write every recorded game.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self.error is not None:
+            raise self.error
+
+    def _write_journal(self):
+        """
+        The writer thread: appends waiting records to the journal, fsyncs once per batch, and compacts.
+        Once a write fails, the error is kept and the records after it are only marked done, so flush()
+        and close() never wait forever.
+        """
+        file = None
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            records = [record for record in batch if record is not None]
+            running = len(records) == len(batch)
+            try:
+                if records and self.error is None:
+                    if file is None:
+                        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                        file = open(self.journal_path, 'ab')
+                    self._append(file, records)
+            except OSError as e:
+                print(f'Could not write scores to {self.journal_path}: {e}')
+                self.error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        if file is not None:
+            file.close()
+
+    def _append(self, file, records):
+        """
+        Appends records to the journal, fsyncs it, and compacts it if enough games have been journaled.
+        """
+        for record in records:
+            payload = json.dumps(record.to_dict()).encode()
+            file.write(_RECORD.pack(len(payload), zlib.crc32(payload)) + payload)
+        file.flush()
+        os.fsync(file.fileno())
+        self._journaled += len(records)
+
+        if self._journaled >= self.compact_every:
+            self._compact(file)
+
+    def _compact(self, journal):
+        """
+        Writes the index to the snapshot atomically, then empties the journal.
+        """
+        with self._lock:
+            data = {
+                'hi_score': self.hi_score,
+                'games': self.games,
+                'last_seq': self._seq,
+                'top': [record.to_dict() for record in self._top],
+                'best': [record.to_dict() for record in self._best.values()],
+            }
+        temp_path = self.snapshot_path.with_name(self.snapshot_path.name + '.tmp')
+        with open(temp_path, 'w') as file:
+            json.dump(data, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        if hasattr(os, 'O_DIRECTORY'):
+            directory = os.open(self.snapshot_path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+
+        # Records still waiting in the queue are already in the snapshot; they are skipped on load by their seq.
+        journal.truncate(0)
+        self._journaled = 0
+        self.compactions += 1
@@ -1,9 +1,64 @@
+import json
 from pathlib import Path
 
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+# The asset paths are only built once, when the module is imported.
+_ASSETS = Path.cwd() / 'Assets'
+_IMAGES = _ASSETS / 'images'
+_SOUNDS = _ASSETS / 'sound'
+_FILES = _ASSETS / 'file'
+_BG_FILE = _IMAGES / 'Starbasesnow.png'
+_SHIP_FILE = _IMAGES / 'ship2.png'
+_BULLET_FILE = _IMAGES / 'laserBlast2.png'
+_ALIEN_FILE = _IMAGES / 'enemy_4.png'
+_LASER_SOUND = _SOUNDS / 'laser.mp3'
+_IMPACT_SOUND = _SOUNDS / 'impactSound.mp3'
+_SCORES_FILE = _FILES / 'scores.json'
+_SCORES_JOURNAL_FILE = _FILES / 'scores.journal'
+_ASSET_DISK_CACHE = _ASSETS / '.cache'
+_FORMATIONS_DIR = _ASSETS / 'formations'
+_FONT_FILE = _ASSETS / 'Fonts' / 'Silkscreen' / 'Silkscreen-Bold.ttf'
+
+
 class Settings:
     '''
     Allows the user to change certain things about the game if they wanted to.
+
+    Settings are slotted, so a misspelled setting is an error instead of a silently ignored new attribute.
+    They can be loaded from a TOML or JSON profile (load_profile), and the speeds for each level are
+    worked out once and kept in a table, so increase_difficulty is a lookup.
     '''
+    # The settings reset by initialize_dynamic_settings at the start of every game, and the type a profile
+    # has to give each one.
+    DYNAMIC = {'ship_speed': float, 'starting_ship_count': int, 'bullet_w': int, 'bullet_h': int,
+               'bullet_speed': float, 'bullet_amount': int, 'fleet_speed': float, 'fleet_drop_speed': float,
+               'alien_points': int}
+    # The settings the game itself changes while it is played, which a profile can't set.
+    STATE = ('fleet_direction', 'difficulty')
+
+    __slots__ = (
+        'name', 'screen_w', 'screen_h', 'FPS', 'sim_rate', 'max_catchup_steps', 'max_render_skip', 'bg_file',
+        'starfield_layers',
+        'difficulty_scale', 'life_lost_pause', 'level_transition_pause', 'game_over_pause',
+        'scores_file', 'scores_journal_file', 'leaderboard_size', 'scores_compact_every', 'player_name',
+        'asset_cache_size', 'asset_disk_cache', 'startup_report', 'render_mode', 'dirty_full_redraw_ratio',
+        'render_scale', 'render_scale_levels', 'render_scale_governor', 'profiler_capacity', 'profiler_overlay',
+        'profile_poll_interval',
+        'ship_file', 'ship_w', 'ship_h', 'bullet_file', 'laser_sound', 'impact_sound',
+        'audio_backend', 'laser_channels', 'impact_channels',
+        'alien_file', 'alien_w', 'alien_h', 'formations', 'formations_dir',
+        'fleet_direction', 'fleet_mode', 'fleet_layer',
+        'collision_mode', 'collision_cell_size', 'collision_precision',
+        'particle_budget', 'particles_per_explosion', 'particle_lifetime', 'particle_speed', 'particle_size',
+        'button_w', 'button_h', 'button_color', 'text_color', 'button_font_size', 'HUD_font_size', 'font_file',
+        'dynamic_overrides', 'difficulty',
+        '_level_speeds', '_level_speeds_key',
+    ) + tuple(DYNAMIC)
+
     def __init__(self):
         '''
         Some aspects of the game that can be changed easily. Includes basically everything that defines the
@@ -13,28 +68,69 @@ class Settings:
         self.screen_w = 1200
         self.screen_h = 800
         self.FPS = 60
-        self.bg_file = Path.cwd() / 'Assets' / 'images' / 'Starbasesnow.png'
+        self.sim_rate = 60
+        self.max_catchup_steps = 5
+        self.max_render_skip = 2
+        self.bg_file = _BG_FILE
+        # (stars, speed in pixels per second, brightness) for each starfield layer, furthest first.
+        self.starfield_layers = ((600, 10, 110), (250, 25, 170), (80, 60, 240))
         self.difficulty_scale = 1.1
-        self.scores_file = Path.cwd() / 'Assets' / 'file' / 'scores.json'
+        self.life_lost_pause = 0.5
+        self.level_transition_pause = 0.0
+        self.game_over_pause = 0.0
+        self.scores_file = _SCORES_FILE
+        self.scores_journal_file = _SCORES_JOURNAL_FILE
+        self.leaderboard_size = 100
+        self.scores_compact_every = 1000
+        self.player_name = 'Player'
+        self.asset_cache_size = 32
+        self.asset_disk_cache = _ASSET_DISK_CACHE
+        self.startup_report = False
+        self.render_mode = 'dirty'
+        self.dirty_full_redraw_ratio = 0.5
+        self.render_scale = 1.0
+        self.render_scale_levels = (0.5, 0.75, 1.0)
+        self.render_scale_governor = False
+        self.profiler_capacity = 600
+        self.profiler_overlay = False
+        self.profile_poll_interval = 1.0
 
-        self.ship_file = Path.cwd() / 'Assets' / 'images' / 'ship2.png'
+        self.ship_file = _SHIP_FILE
         self.ship_w = 120
         self.ship_h = 40
-        
 
-        self.bullet_file = Path.cwd() / 'Assets' / 'images' / 'laserBlast2.png'
-        self.laser_sound = Path.cwd() / 'Assets' / 'sound' / 'laser.mp3'
-        self.impact_sound = Path.cwd() / 'Assets' / 'sound' / 'impactSound.mp3'
-        
-        
-        
 
-        self.alien_file = Path.cwd() / 'Assets' / 'images' / 'enemy_4.png'
+        self.bullet_file = _BULLET_FILE
+        self.laser_sound = _LASER_SOUND
+        self.impact_sound = _IMPACT_SOUND
+        self.audio_backend = 'mixer'
+        self.laser_channels = 3
+        self.impact_channels = 2
+
+
+
+
+        self.alien_file = _ALIEN_FILE
         self.alien_w = 40
         self.alien_h = 40
-        
+        # Formation files in formations_dir, one per level, starting over after the last.
+        self.formations = ('checker', 'rows', 'diamond', 'waves')
+        self.formations_dir = _FORMATIONS_DIR
+
         self.fleet_direction = 1
-        
+        self.fleet_mode = 'sprite'
+        self.fleet_layer = False
+        self.collision_mode = 'grid'
+        self.collision_cell_size = 80
+        # 'rect' collides bounding boxes; 'mask' also needs opaque pixels to touch where the boxes overlap.
+        self.collision_precision = 'rect'
+        # Explosion debris. A budget of 0 turns explosions off.
+        self.particle_budget = 2000
+        self.particles_per_explosion = 24
+        self.particle_lifetime = 0.6
+        self.particle_speed = 160
+        self.particle_size = 3
+
 
         self.button_w = 200
         self.button_h = 50
@@ -43,8 +139,15 @@ class Settings:
         self.text_color = (255, 255, 255)
         self.button_font_size = 48
         self.HUD_font_size = 20
-        self.font_file = Path.cwd() / 'Assets' / 'Fonts' / 'Silkscreen' / 'Silkscreen-Bold.ttf'
-    
+        self.font_file = _FONT_FILE
+
+        # Values that replace the defaults below every time the dynamic settings are reset,
+        # e.g. {'fleet_speed': 5} for a balance run.
+        self.dynamic_overrides = {}
+        self.difficulty = 0
+        self._level_speeds = []
+        self._level_speeds_key = None
+
     def initialize_dynamic_settings(self):
         self.ship_speed = 5
         self.starting_ship_count = 3
@@ -58,8 +161,131 @@ class Settings:
         self.fleet_drop_speed = 15
         self.alien_points = 50
 
+        for name, value in self.dynamic_overrides.items():
+            setattr(self, name, value)
+
+        # The table only holds while the level 1 speeds and the scale between levels stay the same.
+        key = (self.ship_speed, self.bullet_speed, self.fleet_speed, self.difficulty_scale)
+        if self._level_speeds_key != key:
+            self._level_speeds_key = key
+            self._level_speeds = [key[:3]]
+        self.difficulty = 0
+
     def increase_difficulty(self):
-        self.ship_speed *= self.difficulty_scale
-        self.bullet_speed *= self.difficulty_scale
-        self.fleet_speed *= self.difficulty_scale
-        
\ No newline at end of file
+        self.set_difficulty(self.difficulty + 1)
+
+    def set_difficulty(self, difficulty: int):
+        '''
+        Sets the ship, bullet and fleet speeds for a difficulty (the level minus one).  Each level's speeds
+        are the previous level's times difficulty_scale, worked out once and kept in a table.
+        '''
+        speeds = self._level_speeds
+        scale = self.difficulty_scale
+        while len(speeds) <= difficulty:
+            ship_speed, bullet_speed, fleet_speed = speeds[-1]
+            speeds.append((ship_speed * scale, bullet_speed * scale, fleet_speed * scale))
+        self.difficulty = difficulty
+        self.ship_speed, self.bullet_speed, self.fleet_speed = speeds[difficulty]
+
+    def as_dict(self):
+        '''
+        Returns every public setting that has a value, by name.
+        '''
+        return {name: getattr(self, name) for name in self.__slots__
+                if not name.startswith('_') and hasattr(self, name)}
+
+    def load_profile(self, path):
+        '''
+        Loads a TOML or JSON profile of settings, by file extension, and applies it.
+
+        Raises:
+            ValueError: If the profile names a setting that doesn't exist, or can't be read.
+            TypeError: If the profile gives a setting a value of the wrong type.
+        '''
+        path = Path(path)
+        if path.suffix == '.toml':
+            if tomllib is None:
+                raise ValueError('TOML profiles need Python 3.11 or newer; use a .json profile instead')
+            with open(path, 'rb') as file:
+                values = tomllib.load(file)
+        else:
+            values = json.loads(path.read_text())
+        self.apply_profile(values)
+
+    def apply_profile(self, values: dict):
+        '''
+        Applies a dict of settings, after checking every name and value, so a bad profile changes nothing.
+        Dynamic settings become dynamic_overrides; they and difficulty_scale take effect straight away,
+        keeping the current level.
+
+        The settings are changed in place, one at a time, since the game's objects all hold this Settings.
+        Call it between frames on the thread that runs the game, as ProfileWatcher.poll is; anything reading
+        the settings while it runs could see a profile only partly applied.
+
+        Raises:
+            ValueError: If a setting doesn't exist, or is one of STATE.
+            TypeError: If a value isn't the setting's type.
+        '''
+        unknown = [name for name in values if name not in self.__slots__ or name.startswith('_')]
+        if unknown:
+            raise ValueError(f'Unknown settings: {", ".join(sorted(unknown))}')
+        state = [name for name in values if name in self.STATE]
+        if state:
+            raise ValueError(f'Settings the game sets as it is played: {", ".join(sorted(state))}')
+
+        changes = {}
+        dynamic = {}
+        for name, value in values.items():
+            if name in self.DYNAMIC:
+                dynamic[name] = _checked(name, value, self.DYNAMIC[name])
+            elif name == 'dynamic_overrides':
+                changes[name] = self._checked_overrides(value)
+            else:
+                changes[name] = _checked(name, value, type(getattr(self, name)))
+
+        for name, value in changes.items():
+            setattr(self, name, value)
+        if dynamic:
+            self.dynamic_overrides = {**self.dynamic_overrides, **dynamic}
+        rescale = dynamic or 'dynamic_overrides' in changes or 'difficulty_scale' in changes
+        if rescale and hasattr(self, 'ship_speed'):
+            difficulty = self.difficulty
+            self.initialize_dynamic_settings()
+            self.set_difficulty(difficulty)
+
+    def _checked_overrides(self, overrides):
+        '''
+        Returns a profile's dynamic_overrides once every name and value in it has been checked.
+        '''
+        if not isinstance(overrides, dict):
+            raise TypeError(f'dynamic_overrides must be a table of settings, not {type(overrides).__name__}')
+        unknown = [name for name in overrides if name not in self.DYNAMIC]
+        if unknown:
+            raise ValueError(f'Unknown dynamic settings: {", ".join(sorted(unknown))}')
+        return {name: _checked(name, value, self.DYNAMIC[name]) for name, value in overrides.items()}
+
+
+def _checked(name: str, value, expected: type):
+    '''
+    Returns a profile's value for a setting, converted to the setting's type where a profile can't say it
+    directly (paths and tuples).  An int is accepted for a float setting, but not the other way round.
+
+    Raises:
+        TypeError: If the value can't be the setting's type.
+    '''
+    if expected is float:
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif expected is int:
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    elif issubclass(expected, Path):
+        valid = isinstance(value, (str, Path))
+        value = Path(value) if valid else value
+    elif expected is tuple:
+        valid = isinstance(value, (list, tuple))
+        # Tables of tuples, like starfield_layers, come out of JSON as lists of lists.
+        value = tuple(tuple(item) if isinstance(item, list) else item for item in value) if valid else value
+    else:
+        valid = isinstance(value, expected)
+    if not valid:
+        raise TypeError(f'{name} must be {expected.__name__}, not {type(value).__name__} ({value!r})')
+    return value
@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING
 from arsenal import Arsenal
 if TYPE_CHECKING:
     from alien_invasion import AlienInvasion
+    from render_scale import RenderScaler
 
 
 
@@ -37,8 +38,8 @@ class ship:
         self.screen = game.screen
         self.boundaries = self.screen.get_rect()
 
-        self.image = pygame.image.load(self.settings.ship_file)
-        self.image = pygame.transform.scale(self.image, (self.settings.ship_w, self.settings.ship_h))
+        self.image = game.assets.get_image(self.settings.ship_file, (self.settings.ship_w, self.settings.ship_h))
+        self.mask = game.assets.get_mask(self.settings.ship_file, (self.settings.ship_w, self.settings.ship_h))
         
         self.rect = self.image.get_rect()
         self._center_ship()
@@ -82,6 +83,20 @@ class ship:
         self.arsenal.draw()
         self.screen.blit(self.image, self.rect)
 
+    def draw_scaled(self, scaler: 'RenderScaler'):
+        """
+        Draws the ship and the bullets through a RenderScaler, with their images pre-scaled to its render scale.
+        """
+        settings = self.settings
+        scaler.draw(settings.bullet_file, (settings.bullet_w, settings.bullet_h), self.arsenal.get_rects())
+        scaler.draw(settings.ship_file, (settings.ship_w, settings.ship_h), [self.rect])
+
+    def get_rects(self):
+        """
+        Returns the rects of the ship and its bullets, for the renderer's dirty rects.
+        """
+        return [self.rect] + self.arsenal.get_rects()
+
     def fire(self):
         """
         Tells the ship's arsenal to fire a bullet.
@@ -92,7 +107,7 @@ class ship:
         return self.arsenal.fire_bullet()
     
     def check_collisions(self, other_group):
-        if pygame.sprite.spritecollideany(self, other_group):
+        if self.game.broadphase.spritecollideany(self, other_group):
             self._center_ship()
             return True
         return False
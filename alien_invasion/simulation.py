@@ -0,0 +1,228 @@
+import pygame
+from settings import Settings
+from game_stats import GameStats
+from ship import ship
+from arsenal import Arsenal
+from alien_fleet import AlienFleet
+from asset_cache import AssetCache
+from broadphase import Broadphase
+from score_store import ScoreStore
+
+
+class FrameInput:
+    """
+    The player's input for a single simulation step.
+
+    Attributes:
+        up (bool): The ship is being moved up.
+        down (bool): The ship is being moved down.
+        fire (bool): The ship should fire a bullet this step.
+    """
+    __slots__ = ('up', 'down', 'fire')
+
+    def __init__(self, up: bool = False, down: bool = False, fire: bool = False):
+        self.up = up
+        self.down = down
+        self.fire = fire
+
+
+class StepResult:
+    """
+    What happened during a single simulation step, so a front end can play sounds and
+    refresh the HUD without looking inside the simulation.
+
+    Attributes:
+        fired (bool): A bullet was fired.
+        collisions (dict): The aliens hit this step, mapped to the bullets that hit them.
+        kill_positions (list): The screen centre of each alien hit this step.
+        life_lost (bool): The ship was hit or the fleet reached the right edge, and a life was used.
+        level_cleared (bool): The fleet was destroyed and the next level started.
+        game_over (bool): The player ran out of ships and the game stopped.
+    """
+    __slots__ = ('fired', 'collisions', 'kill_positions', 'life_lost', 'level_cleared', 'game_over')
+
+    def __init__(self):
+        self.fired = False
+        self.collisions = {}
+        self.kill_positions = []
+        self.life_lost = False
+        self.level_cleared = False
+        self.game_over = False
+
+
+class Simulation:
+    """
+    Runs the game rules one fixed step at a time, with no window, event queue, audio or frame clock.
+    The Simulation class is responsible for:
+    -  Owning the ship, its arsenal, the alien fleet, the broadphase and the game stats.
+    -  Advancing everything one step from a FrameInput.
+    -  Checking collisions, lives, and level progress, and reporting them in a StepResult.
+
+    AlienInvasion wraps a Simulation and only turns key presses into FrameInputs and StepResults
+    into sounds and HUD updates.  Headless drivers can step it as fast as the CPU allows.
+
+    Attributes:
+        settings (Settings): The settings the game is played with.
+        screen (pygame.Surface): The surface entities draw onto. Offscreen when running headless.
+        game_active (bool): Whether a game is being played.
+        frame (int): How many steps have been simulated since the last restart.
+        profiler (FrameProfiler): Times the ship, fleet and collision phases of each step when set. None by default.
+
+    Methods:
+        __init__(self, settings, screen, assets, store): Initializes the simulation.
+        restart(self): Starts a new game.
+        step(self, inputs): Advances the game by one step.
+        reset_level(self): Clears the bullets and re-generates the fleet.
+        snapshot(self): Returns everything needed to put the game back to this step.
+        restore(self, state): Puts the game back to a snapshot.
+    """
+    def __init__(self, settings: Settings = None, screen: pygame.Surface = None, assets: AssetCache = None,
+                 store: ScoreStore = None):
+        """
+        Initializes the simulation.
+
+        Args:
+            settings (Settings): The settings to play with. A default Settings is made if None.
+            screen (pygame.Surface): The surface to draw onto. An offscreen surface is made if None.
+            assets (AssetCache): The image cache to share. A new cache is made if None.
+            store (ScoreStore): Where finished games are recorded. A store kept in memory is made if None, so
+                headless games never read or write the player's score files.
+        """
+        if settings is None:
+            settings = Settings()
+            settings.initialize_dynamic_settings()
+        self.settings = settings
+        if screen is None:
+            screen = pygame.Surface((settings.screen_w, settings.screen_h))
+        self.screen = screen
+        self.assets = assets or AssetCache(settings.asset_cache_size, settings.asset_disk_cache)
+
+        self.broadphase = Broadphase(settings)
+        self.game_stats = GameStats(self, store or ScoreStore())
+        self.ship = ship(self, Arsenal(self))
+        self.alien_fleet = AlienFleet(self)
+        self.alien_fleet.create_fleet()
+
+        self.game_active = False
+        self.frame = 0
+        self.profiler = None
+
+    def restart(self):
+        """
+        Starts a new game, resetting the settings, the fleet's direction, the stats, the fleet and the ship.
+        """
+        self.settings.initialize_dynamic_settings()
+        self.settings.fleet_direction = 1
+        self.game_stats.reset_stats()
+        self.reset_level()
+        self.ship._center_ship()
+        self.game_active = True
+        self.frame = 0
+
+    def step(self, inputs: FrameInput):
+        """
+        Advances the game by one step.
+
+        Args:
+            inputs (FrameInput): The player's input for this step.
+
+        Returns:
+            StepResult: What happened during the step.
+        """
+        result = StepResult()
+        if not self.game_active:
+            return result
+
+        self.ship.moving_up = inputs.up
+        self.ship.moving_down = inputs.down
+        if inputs.fire:
+            result.fired = self.ship.fire()
+
+        profiler = self.profiler
+        self.ship.update()
+        if profiler:
+            profiler.mark(profiler.SHIP)
+        self.alien_fleet.update_fleet()
+        if profiler:
+            profiler.mark(profiler.FLEET)
+        self._check_collisions(result)
+        if profiler:
+            profiler.mark(profiler.COLLISIONS)
+        self.frame += 1
+        return result
+
+    def _check_collisions(self, result: StepResult):
+        '''
+        Checks the ship, aliens and the bottom of the screen, as well as the collisions of projectiles.
+        '''
+        if self.ship.check_collisions(self.alien_fleet.fleet):
+            self._check_game_status(result)
+
+        if self.alien_fleet.check_fleet_right():
+            self._check_game_status(result)
+
+        collisions = self.alien_fleet.check_collisions(self.ship.arsenal.arsenal)
+
+        if collisions:
+            self.game_stats.update(collisions)
+            result.collisions = collisions
+            result.kill_positions = self.alien_fleet.screen_centers(collisions)
+
+        if self.alien_fleet.check_destroyed_status():
+            self.settings.increase_difficulty()
+            self.game_stats.update_level()
+            self.reset_level()
+            result.level_cleared = True
+
+    def _check_game_status(self, result: StepResult):
+        """
+        Checks the status of the game.  If the player has ships left when level restarts, resets the level.
+        If the player has no ships left, stops the game.
+        """
+        if self.game_stats.ships_left > 0:
+            self.game_stats.ships_left -= 1
+            self.reset_level()
+            result.life_lost = True
+        else:
+            self.game_active = False
+            result.game_over = True
+
+    def snapshot(self):
+        """
+        Returns everything needed to put the game back to this step, as plain values.
+        """
+        settings = self.settings
+        stats = self.game_stats
+        return {
+            'frame': self.frame,
+            'game_active': self.game_active,
+            'speeds': (settings.ship_speed, settings.bullet_speed, settings.fleet_speed, settings.fleet_direction),
+            'stats': (stats.score, stats.max_score, stats.hi_score, stats.level, stats.ships_left),
+            'ship_y': self.ship.y,
+            'bullets': self.ship.arsenal.get_state(),
+            'fleet': self.alien_fleet.get_state(),
+        }
+
+    def restore(self, state: dict):
+        """
+        Puts the game back to a snapshot taken by snapshot().
+        """
+        settings = self.settings
+        stats = self.game_stats
+        self.frame = state['frame']
+        self.game_active = state['game_active']
+        settings.ship_speed, settings.bullet_speed, settings.fleet_speed, settings.fleet_direction = state['speeds']
+        stats.score, stats.max_score, stats.hi_score, stats.level, stats.ships_left = state['stats']
+        settings.difficulty = stats.level - 1
+        self.ship.y = state['ship_y']
+        self.ship.rect.y = self.ship.y
+        self.ship.arsenal.set_state(state['bullets'])
+        self.alien_fleet.set_state(state['fleet'])
+
+    def reset_level(self):
+        """
+        Destroys remaining bullets on screen and re-generates the fleet.
+        """
+        self.ship.arsenal.arsenal.empty()
+        self.alien_fleet.empty()
+        self.alien_fleet.create_fleet()
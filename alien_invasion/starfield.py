@@ -0,0 +1,196 @@
+import numpy as np
+import pygame
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from alien_invasion import AlienInvasion
+
+
+class Starfield:
+    """
+    Scrolls layers of stars across the background, against the fleet's drift.  The Starfield class is responsible for:
+    -  Keeping every star's pixel and color in NumPy arrays, grouped by layer, each layer slower and dimmer than
+       the one in front of it.
+    -  Keeping a copy of the static background with the stars at their current pixels, which the Renderer
+       restores dirty rects from.
+    -  Writing the pixels the moving stars left and reached straight into that copy through pygame.surfarray.
+    -  Reporting those pixels as runs of small tiles, for the Renderer to restore from the copy when the
+       frame is drawn.
+
+    A layer's stars all move together, so a layer only costs anything on the frames its whole-pixel offset
+    changes, and then it is a handful of integer array operations on that layer's stars; there is no
+    per-star Python work and the background copy is never re-blitted as a whole.  Each layer also keeps a
+    screen-sized map of its stars' colors, and of which pixels it has a star on, so a changed pixel's new
+    color is found by looking it up in every layer, nearest layer on top, without touching the stars of
+    layers that didn't move.  The screen itself is only changed by the Renderer, before anything else is
+    drawn, so the ship, fleet and HUD are always drawn over the stars, and frames that aren't drawn cost
+    nothing on the screen.
+
+    Attributes:
+        surface (pygame.Surface): The background with the stars drawn in, for the Renderer.
+        count (int): How many stars there are.
+
+    Methods:
+        __init__(self, game, background): Scatters the stars over a copy of background.
+        update(self, dt): Scrolls every layer by dt seconds.
+        take_rects(self): Returns the tiles of the background changed since the last call.
+        draw(self, surface, scale): Draws every star onto a scaled surface.
+    """
+    # The size of the square tiles the changed pixels are reported in.
+    TILE = 8
+
+    def __init__(self, game: 'AlienInvasion', background: pygame.Surface):
+        """
+        Scatters the stars over a copy of background, which is left untouched.
+        """
+        self.settings = game.settings
+        self.width, self.height = background.get_size()
+
+        layers = self.settings.starfield_layers
+        self.count = sum(count for count, _, _ in layers)
+        if not self.count:
+            self.surface = background
+            return
+        self.surface = background.copy()
+        # Pixels are kept flat, as y * width + x, which NumPy indexes much faster than (x, y) pairs.
+        self._base = pygame.surfarray.array2d(background).T.ravel()
+
+        # Seeded, so the stars are in the same places every time the game starts.
+        rng = np.random.default_rng(0)
+        xs, ys, colors, self._layers = [], [], [], []
+        start = 0
+        for count, speed, brightness in layers:
+            if not count:
+                continue
+            ys.append(np.sort(rng.integers(0, self.height, count)))
+            xs.append(rng.integers(0, self.width, count))
+            colors.append((brightness * rng.uniform(0.8, 1.0, (count, 3))).astype(np.uint8))
+            self._layers.append((slice(start, start + count), float(speed)))
+            start += count
+        self.x = np.concatenate(xs)
+        self.y = np.concatenate(ys)
+        self.color = np.concatenate(colors)
+        self._offsets = [0.0] * len(self._layers)
+        # Which tiles have changed since take_rects was last called.  A star's row and tile row never change,
+        # so they are worked out once.
+        self._tile_cols = (self.width + self.TILE - 1) // self.TILE
+        self._tiles = np.zeros(self._tile_cols * ((self.height + self.TILE - 1) // self.TILE), dtype=bool)
+        self._rows = self.y * self.width
+        self._tile_rows = self.y // self.TILE * self._tile_cols
+
+        # A star's mapped color can be anything, 0 included, so which pixels hold a star is kept separately.
+        self._mapped = pygame.surfarray.map_array(self.surface, self.color[None])[0].astype(self._base.dtype)
+        self._layer_pixels, self._layer_stars = [], []
+        for stars, _ in self._layers:
+            pixels = self._rows[stars] + self.x[stars]
+            layer_pixels = np.zeros_like(self._base)
+            layer_pixels[pixels] = self._mapped[stars]
+            layer_stars = np.zeros(self._base.shape, dtype=bool)
+            layer_stars[pixels] = True
+            self._layer_pixels.append(layer_pixels)
+            self._layer_stars.append(layer_stars)
+        self._write(self.surface, self._rows + self.x, self._mapped)
+
+    def update(self, dt: float):
+        """
+        Scrolls every layer left by its speed times dt, writing the pixels the layers that moved a whole
+        pixel left and reached into the background copy.  The screen is left to the Renderer.
+        """
+        if not self.count:
+            return
+        moved, tiles = [], []
+        for index, (stars, speed) in enumerate(self._layers):
+            offset = self._offsets[index] + speed * dt
+            shift = int(offset)
+            self._offsets[index] = offset - shift
+            if not shift:
+                continue
+            old_x = self.x[stars].copy()
+            new_x = (old_x - shift) % self.width
+            self.x[stars] = new_x
+            rows = self._rows[stars]
+            tile_rows = self._tile_rows[stars]
+            old = rows + old_x
+            new = rows + new_x
+            layer_stars = self._layer_stars[index]
+            layer_stars[old] = False
+            layer_stars[new] = True
+            self._layer_pixels[index][new] = self._mapped[stars]
+            moved.append((index, old, new))
+            tiles += [tile_rows + old_x // self.TILE, tile_rows + new_x // self.TILE]
+        if not moved:
+            return
+
+        # Only the layers in front of a moved star can cover it; a pixel a star left can show any layer.
+        changed, colors = [], []
+        for index, old, new in moved:
+            changed += [old, new]
+            colors += [self._colors(old), self._colors(new, index)]
+        changed = np.concatenate(changed)
+        colors = np.concatenate(colors)
+        self._write(self.surface, changed, colors)
+        self._tiles[np.concatenate(tiles)] = True
+
+    def _colors(self, pixels, bottom: int = None):
+        """
+        Returns the color each of pixels, given as y * width + x, should be: the nearest layer's star on it,
+        or the background.  If bottom is given, that layer is known to have a star on every one of them, so
+        only the layers in front of it are looked at.
+        """
+        if bottom is None:
+            colors = self._base.take(pixels)
+            start = 0
+        else:
+            colors = self._layer_pixels[bottom].take(pixels)
+            start = bottom + 1
+        for layer_pixels, layer_stars in zip(self._layer_pixels[start:], self._layer_stars[start:]):
+            colors = np.where(layer_stars.take(pixels), layer_pixels.take(pixels), colors)
+        return colors
+
+    def _write(self, surface: pygame.Surface, changed, colors):
+        """
+        Writes colors into surface's pixels at changed, given as y * width + x.
+        """
+        pixels = pygame.surfarray.pixels2d(surface)
+        if pixels.T.flags.c_contiguous:
+            # The rows have no padding, so the flat index is the index into the surface's memory too.
+            pixels.T.reshape(-1)[changed] = colors
+        else:
+            pixels[changed % self.width, changed // self.width] = colors
+        del pixels
+
+    def take_rects(self):
+        """
+        Returns a rect for each run of side-by-side tiles the stars changed in the background copy since the
+        last call, for the Renderer to restore on the screen.  When they cover more than
+        settings.dirty_full_redraw_ratio of the screen, the Renderer is going to redraw all of it anyway, so
+        the whole screen is returned as one rect instead.
+        """
+        if not self.count:
+            return []
+        tiles = np.flatnonzero(self._tiles)
+        if not len(tiles):
+            return []
+        self._tiles[tiles] = False
+        tile = self.TILE
+        if len(tiles) * tile * tile > self.width * self.height * self.settings.dirty_full_redraw_ratio:
+            return [pygame.Rect(0, 0, self.width, self.height)]
+
+        row, col = np.divmod(tiles, self._tile_cols)
+        starts = np.flatnonzero(np.concatenate(([True], (np.diff(tiles) != 1) | (col[1:] == 0))))
+        lengths = np.diff(np.append(starts, len(tiles)))
+        return [pygame.Rect(c * tile, r * tile, length * tile, tile)
+                for r, c, length in zip(row[starts].tolist(), col[starts].tolist(), lengths.tolist())]
+
+    def draw(self, surface: pygame.Surface, scale: float):
+        """
+        Draws every star onto surface, a copy of the background scaled by scale, for the RenderScaler.
+        """
+        if not self.count:
+            return
+        width, height = surface.get_size()
+        mapped = pygame.surfarray.map_array(surface, self.color[None])[0]
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[np.minimum((self.x * scale).astype(np.int64), width - 1),
+               np.minimum((self.y * scale).astype(np.int64), height - 1)] = mapped
+        del pixels
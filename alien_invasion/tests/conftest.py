@@ -0,0 +1,88 @@
+import os
+import sys
+from pathlib import Path
+
+# The game's modules import each other by name and find the Assets folder from the working directory,
+# so the tests run from the game's folder.  pygame gets no window or sound card.
+GAME_DIR = Path(__file__).resolve().parent.parent
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.chdir(GAME_DIR)
+sys.path.insert(0, str(GAME_DIR))
+
+import pygame
+import pytest
+from headless import RandomPolicy
+from settings import Settings
+from simulation import Simulation
+
+pygame.init()
+
+
+@pytest.fixture
+def make_settings(tmp_path):
+    """
+    Returns a function that makes fresh default settings with the given values changed.  Scores and the
+    asset disk cache are kept out of the game's Assets folder.
+    """
+    def make(**values):
+        settings = Settings()
+        settings.initialize_dynamic_settings()
+        settings.scores_file = tmp_path / 'scores.json'
+        settings.scores_journal_file = tmp_path / 'scores.journal'
+        settings.asset_disk_cache = tmp_path / 'cache'
+        for name, value in values.items():
+            setattr(settings, name, value)
+        return settings
+    return make
+
+
+@pytest.fixture
+def settings(make_settings):
+    """
+    Fresh default settings, see make_settings.
+    """
+    return make_settings()
+
+
+def sorted_state(sim):
+    """
+    Returns a snapshot of the game with the bullets and aliens sorted, since the fleet modes keep them
+    in different orders.
+    """
+    state = sim.snapshot()
+    state['bullets'] = sorted(state['bullets'])
+    state['fleet']['homes'] = sorted(state['fleet']['homes'])
+    return state
+
+
+@pytest.fixture
+def game_state():
+    """
+    Returns sorted_state, for comparing games played in different modes.
+    """
+    return sorted_state
+
+
+@pytest.fixture
+def play():
+    """
+    Returns a function that plays seeded random games for steps steps, restarting whenever one ends, and
+    returns the game state (see sorted_state) after every step.  Given a Recorder, it records them too.
+    """
+    def play(settings, steps=3000, seed=7, recorder=None):
+        sim = Simulation(settings)
+        policy = RandomPolicy(seed)
+        states = []
+        for _ in range(steps):
+            if not sim.game_active:
+                sim.restart()
+                if recorder:
+                    recorder.mark_restart()
+            inputs = policy(sim)
+            if recorder:
+                recorder.record(inputs)
+            sim.step(inputs)
+            states.append(sorted_state(sim))
+        return states
+    return play
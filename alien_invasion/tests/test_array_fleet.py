@@ -0,0 +1,5 @@
+def test_array_fleet_matches_sprite_fleet(make_settings, play):
+    sprite = play(make_settings(fleet_mode='sprite'))
+    array = play(make_settings(fleet_mode='array'))
+    assert sprite == array
+    assert max(state['stats'][0] for state in sprite) > 0
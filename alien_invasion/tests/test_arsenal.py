@@ -0,0 +1,26 @@
+from bullet import Bullet
+from headless import SweepPolicy
+from simulation import Simulation
+
+
+def test_firing_allocates_no_bullets_past_the_pool(settings, monkeypatch):
+    made = []
+    init = Bullet.__init__
+
+    def counting_init(self, *args, **kwargs):
+        made.append(self)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(Bullet, '__init__', counting_init)
+    sim = Simulation(settings)
+    arsenal = sim.ship.arsenal
+    policy = SweepPolicy()
+    fired = 0
+    for _ in range(5000):
+        if not sim.game_active:
+            sim.restart()
+        fired += sim.step(policy(sim)).fired
+
+    assert fired > 20 * settings.bullet_amount
+    assert arsenal.allocations == len(arsenal.pool) == settings.bullet_amount
+    assert len(made) == settings.bullet_amount
@@ -0,0 +1,59 @@
+import mmap
+import pygame
+from asset_cache import AssetCache
+
+SIZE = (40, 40)
+
+
+def load(settings, disk_dir):
+    cache = AssetCache(disk_dir=disk_dir)
+    return cache, cache.get_image(settings.alien_file, SIZE)
+
+
+def same_pixels(a, b):
+    return pygame.image.tobytes(a, 'RGBA') == pygame.image.tobytes(b, 'RGBA')
+
+
+def test_disk_cache_is_used_on_the_next_launch(settings, tmp_path):
+    _, decoded = load(settings, tmp_path / 'cache')
+    cache, cached = load(settings, tmp_path / 'cache')
+    assert cache.disk_hits == 1
+    assert same_pixels(cached, decoded)
+
+
+def test_broken_cache_files_are_decoded_again(settings, tmp_path):
+    _, decoded = load(settings, tmp_path / 'cache')
+    raw_files = list((tmp_path / 'cache').glob('*.raw'))
+    assert raw_files
+    for contents in (b'', b'\x01\x02\x03', b'\x28\x00\x00\x00\x28\x00\x00\x00' + b'\x00' * 10):
+        raw_files[0].write_bytes(contents)
+        cache, surface = load(settings, tmp_path / 'cache')
+        assert cache.disk_hits == 0
+        assert same_pixels(surface, decoded)
+        # The broken file was replaced, so the launch after uses it again.
+        assert load(settings, tmp_path / 'cache')[0].disk_hits == 1
+
+
+def test_broken_cache_files_are_unmapped_before_they_are_deleted(settings, tmp_path, monkeypatch):
+    load(settings, tmp_path / 'cache')
+    raw_file = next((tmp_path / 'cache').glob('*.raw'))
+    raw_file.write_bytes(b'\x01\x02\x03')
+    maps = []
+    real_mmap = mmap.mmap
+
+    def recording_mmap(*args, **kwargs):
+        maps.append(real_mmap(*args, **kwargs))
+        return maps[-1]
+
+    monkeypatch.setattr(mmap, 'mmap', recording_mmap)
+    load(settings, tmp_path / 'cache')
+    assert maps and maps[0].closed
+
+
+def test_unwritable_cache_is_turned_off(settings, tmp_path):
+    blocker = tmp_path / 'not_a_folder'
+    blocker.write_bytes(b'')
+    cache, surface = load(settings, blocker / 'cache')
+    assert cache.disk_dir is None
+    assert surface.get_size() == SIZE
+    assert cache.get_image(settings.ship_file, (settings.ship_w, settings.ship_h))
@@ -0,0 +1,23 @@
+import pytest
+from batch_runner import SessionSpec, build_specs, run_batch
+
+
+@pytest.mark.parametrize('overrides, error', [
+    ({'bullet_amount': 2.5}, TypeError),
+    ({'no_such_setting': 1}, ValueError),
+])
+def test_bad_overrides_stop_the_batch_before_it_starts(tmp_path, overrides, error):
+    specs = build_specs({'fleet_speed': [2, 3]}, 2, 'sweep', 0, 100)
+    specs.append(SessionSpec(len(specs), overrides, 'sweep', 0, 100))
+    output = tmp_path / 'results.jsonl'
+    with pytest.raises(error):
+        run_batch(specs, output, processes=1)
+    assert not output.exists()
+
+
+def test_batch_writes_a_result_per_session(tmp_path):
+    specs = build_specs({'fleet_speed': [2, 3]}, 2, 'sweep', 0, 100)
+    output = tmp_path / 'results.jsonl'
+    results = run_batch(specs, output, processes=2)
+    assert sorted(result['index'] for result in results) == list(range(len(specs)))
+    assert len(output.read_text().splitlines()) == len(specs)
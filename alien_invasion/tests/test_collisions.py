@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.mark.parametrize('fleet_mode', ['sprite', 'array'])
+def test_grid_matches_brute_force(make_settings, play, fleet_mode):
+    grid = play(make_settings(collision_mode='grid', fleet_mode=fleet_mode))
+    brute = play(make_settings(collision_mode='brute', fleet_mode=fleet_mode))
+    assert grid == brute
+    # The games have to hit some aliens for the comparison to mean anything.
+    assert max(state['stats'][0] for state in grid) > 0
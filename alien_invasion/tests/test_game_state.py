@@ -0,0 +1,19 @@
+import pygame
+from alien_invasion import AlienInvasion
+
+SPACE = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+
+
+def test_space_during_a_pause_does_not_fire_after_it(settings):
+    game = AlienInvasion(settings)
+    game.restart_game()
+    game.states.life_lost()
+    game._check_keydown_event(SPACE)
+    game.states.update(settings.life_lost_pause + 0.1)
+    assert game.states.playing
+    game._step()
+    assert not game.ship.arsenal.arsenal
+
+    game._check_keydown_event(SPACE)
+    game._step()
+    assert len(game.ship.arsenal.arsenal) == 1
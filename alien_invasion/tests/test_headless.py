@@ -0,0 +1,24 @@
+import pytest
+from headless import make_policy
+
+
+class SeededPolicy:
+    def __init__(self, seed=None):
+        self.seed = seed
+
+
+class BrokenPolicy:
+    def __init__(self, seed=None):
+        # Only the seeded constructor fails, so retrying without the seed would hide it.
+        if seed is not None:
+            raise TypeError('broken on purpose')
+
+
+def test_policies_that_take_a_seed_get_it():
+    assert make_policy('test_headless:SeededPolicy', 9).seed == 9
+    assert make_policy('sweep', 9)
+
+
+def test_errors_inside_a_policy_are_not_hidden():
+    with pytest.raises(TypeError, match='on purpose'):
+        make_policy('test_headless:BrokenPolicy', 9)
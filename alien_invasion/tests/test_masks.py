@@ -0,0 +1,37 @@
+import pytest
+from headless import RandomPolicy
+from simulation import Simulation
+
+
+@pytest.mark.parametrize('fleet_mode', ['sprite', 'array'])
+def test_mask_collisions_match_across_broadphases(make_settings, play, fleet_mode):
+    grid = play(make_settings(collision_mode='grid', fleet_mode=fleet_mode, collision_precision='mask'))
+    brute = play(make_settings(collision_mode='brute', fleet_mode=fleet_mode, collision_precision='mask'))
+    assert grid == brute
+
+
+def test_mask_collisions_match_across_fleet_modes(make_settings, play):
+    sprite = play(make_settings(fleet_mode='sprite', collision_precision='mask'))
+    array = play(make_settings(fleet_mode='array', collision_precision='mask'))
+    assert sprite == array
+
+
+@pytest.mark.parametrize('fleet_mode', ['sprite', 'array'])
+def test_mask_hits_are_rect_hits(make_settings, fleet_mode):
+    # The mask game is put back in the rect game's state before every step, so only that step's
+    # collisions can differ.
+    rect_sim = Simulation(make_settings(fleet_mode=fleet_mode, collision_precision='rect'))
+    mask_sim = Simulation(make_settings(fleet_mode=fleet_mode, collision_precision='mask'))
+    policy = RandomPolicy(3)
+    rect_kills = mask_kills = 0
+    for _ in range(3000):
+        if not rect_sim.game_active:
+            rect_sim.restart()
+        mask_sim.restore(rect_sim.snapshot())
+        inputs = policy(rect_sim)
+        rect_hits = rect_sim.step(inputs).kill_positions
+        mask_hits = mask_sim.step(inputs).kill_positions
+        assert set(mask_hits) <= set(rect_hits)
+        rect_kills += len(rect_hits)
+        mask_kills += len(mask_hits)
+    assert 0 < mask_kills < rect_kills
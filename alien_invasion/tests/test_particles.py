@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+from particles import ParticleSystem
+
+
+class Game:
+    def __init__(self, settings):
+        self.settings = settings
+        self.screen = None
+
+
+@pytest.mark.parametrize('bursts', [[1, 2], [2, 2], [1, 1, 1], [2, 1, 2], [5]])
+def test_bursts_fill_the_pool_to_capacity(make_settings, bursts):
+    particles = ParticleSystem(Game(make_settings(particle_budget=48, particles_per_explosion=24)))
+    for explosions in bursts:
+        count = particles.count
+        spawned = particles.spawned
+        oldest = particles.life[:count].copy()
+        particles.burst([(100, 100)] * explosions)
+        assert 0 < particles.count <= particles.capacity
+        # The particles kept are the ones furthest from burning out.
+        kept = particles.count - (particles.spawned - spawned)
+        assert np.array_equal(np.sort(particles.life[:kept]), np.sort(oldest)[count - kept:])
+        particles.update(0.01)
+    assert particles.spawned + particles.dropped >= sum(bursts) * 24
@@ -0,0 +1,48 @@
+import hashlib
+import pygame
+import pytest
+from alien_invasion import AlienInvasion
+
+FRAMES = 400
+
+
+def play_frames(settings, frames=FRAMES):
+    """
+    Plays a scripted game frame by frame, with explosions and the starfield moving, and returns the game
+    and a hash of the screen after every frame.
+    """
+    game = AlienInvasion(settings)
+    space = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+    dt = 1 / settings.FPS
+    hashes = []
+    for frame in range(frames):
+        if frame == 30:
+            game.restart_game()
+        if game.game_active:
+            if frame % 7 == 0:
+                game._check_keydown_event(space)
+            game.inputs.up = (frame // 120) % 2 == 0
+            game.inputs.down = not game.inputs.up
+            game._step()
+        game.particles.update(dt)
+        game.starfield.update(dt)
+        game._update_screen()
+        hashes.append(hashlib.md5(pygame.image.tobytes(game.screen, 'RGB')).hexdigest())
+    return game, hashes
+
+
+@pytest.mark.parametrize('fleet_mode', ['sprite', 'array'])
+def test_dirty_rects_match_full_redraws(make_settings, fleet_mode):
+    full_game, full = play_frames(make_settings(render_mode='full', fleet_mode=fleet_mode))
+    dirty_game, dirty = play_frames(make_settings(render_mode='dirty', fleet_mode=fleet_mode))
+    assert dirty == full
+    assert full_game.particles.spawned
+    assert dirty_game.renderer.dirty_frames
+
+
+@pytest.mark.parametrize('fleet_mode', ['sprite', 'array'])
+def test_fleet_layer_matches_drawing_every_alien(make_settings, fleet_mode):
+    _, aliens = play_frames(make_settings(render_mode='dirty', fleet_mode=fleet_mode))
+    layer_game, layer = play_frames(make_settings(render_mode='dirty', fleet_mode=fleet_mode, fleet_layer=True))
+    assert layer == aliens
+    assert layer_game.alien_fleet.layer
@@ -0,0 +1,37 @@
+import pytest
+from replay import RESTART, Recorder, Replay
+
+STEPS = 3000
+
+
+@pytest.fixture
+def recording(make_settings, tmp_path, play):
+    """
+    Records seeded random games and returns the recording's path and the game state after every step.
+    One life and a fast-dropping fleet make for short games, so the recording holds several.
+    """
+    settings = make_settings(dynamic_overrides={'starting_ship_count': 0, 'fleet_drop_speed': 60})
+    path = tmp_path / 'session.air'
+    recorder = Recorder(path, settings)
+    states = play(settings, STEPS, seed=11, recorder=recorder)
+    recorder.close()
+    return path, states
+
+
+def test_replay_reproduces_the_recorded_games(recording, game_state):
+    path, states = recording
+    replay = Replay(path, keyframe_interval=500)
+    assert len(replay) == STEPS
+    # Starting a game over in the middle of a replay has to give the same game too.
+    assert (replay.inputs & RESTART).astype(bool).sum() >= 3
+    replay.play()
+    assert game_state(replay.sim) == states[-1]
+
+
+def test_seeking_matches_playing_through(recording, game_state):
+    path, states = recording
+    replay = Replay(path, keyframe_interval=500)
+    # Backwards and forwards, so both restoring a keyframe and playing on from the current step are used.
+    for frame in (STEPS, 123, STEPS // 2, 1001):
+        replay.seek(frame)
+        assert game_state(replay.sim) == states[frame - 1]
@@ -0,0 +1,106 @@
+import types
+import pytest
+from headless import SweepPolicy
+from score_store import ScoreStore
+from simulation import Simulation
+
+GAMES = [('ann', 300), ('bob', 500), ('ann', 500), ('cat', 100), ('bob', 200), ('ann', 900), ('cat', 500)]
+
+
+def open_store(tmp_path, compact_every=1000):
+    return ScoreStore(tmp_path / 'scores.json', tmp_path / 'scores.journal', 5, compact_every)
+
+
+def record(store, games):
+    for player, score in games:
+        store.record_game(player, score, 1)
+
+
+def leaderboard(store):
+    return [(record.seq, record.player, record.score) for record in store.top()]
+
+
+def test_reloading_keeps_the_leaderboard_order(tmp_path):
+    store = open_store(tmp_path)
+    record(store, GAMES)
+    store.close()
+    before = leaderboard(store)
+    # Best score first, and the earlier of two equal scores first.
+    assert before == [(6, 'ann', 900), (2, 'bob', 500), (3, 'ann', 500), (7, 'cat', 500), (1, 'ann', 300)]
+
+    reloaded = open_store(tmp_path)
+    assert leaderboard(reloaded) == before
+    assert (reloaded.games, reloaded.hi_score) == (len(GAMES), 900)
+    assert reloaded.best('bob').seq == 2
+
+
+def test_a_torn_journal_tail_is_dropped(tmp_path):
+    store = open_store(tmp_path)
+    record(store, GAMES[:3])
+    store.close()
+    journal = tmp_path / 'scores.journal'
+    size = journal.stat().st_size
+    # A crash part way through writing the fourth record.
+    with open(journal, 'ab') as file:
+        file.write(b'\x40\x00\x00\x00\x12\x34')
+
+    reloaded = open_store(tmp_path)
+    assert reloaded.games == 3
+    assert journal.stat().st_size == size
+    record(reloaded, GAMES[3:])
+    reloaded.close()
+    assert open_store(tmp_path).games == len(GAMES)
+
+
+def test_a_crash_between_compacting_and_truncating_counts_no_game_twice(tmp_path):
+    store = open_store(tmp_path)
+    record(store, GAMES[:4])
+    store.close()
+    # Write the snapshot, but "crash" before the journal is emptied, so it still holds games 1 to 4.
+    open_store(tmp_path)._compact(types.SimpleNamespace(truncate=lambda size: None))
+    assert len(open_store(tmp_path).journal_path.read_bytes()) > 0
+
+    store = open_store(tmp_path)
+    assert (store.games, store.hi_score) == (4, 500)
+    record(store, GAMES[4:])
+    store.close()
+    reloaded = open_store(tmp_path)
+    assert reloaded.games == len(GAMES)
+    assert leaderboard(reloaded) == leaderboard(store)
+
+
+def test_compacting_moves_the_journal_into_the_snapshot(tmp_path):
+    store = open_store(tmp_path, compact_every=3)
+    record(store, GAMES)
+    store.close()
+    assert store.compactions >= 1
+    assert leaderboard(open_store(tmp_path)) == leaderboard(store)
+
+
+def test_write_errors_are_raised_instead_of_hanging(tmp_path):
+    blocker = tmp_path / 'not_a_folder'
+    blocker.write_bytes(b'')
+    store = open_store(blocker)
+    record(store, GAMES[:2])
+    with pytest.raises(OSError):
+        store.flush()
+    record(store, GAMES[2:])
+    with pytest.raises(OSError):
+        store.close()
+    # The index still has every game, even though none reached the disk.
+    assert store.games == len(GAMES)
+
+
+def test_headless_games_never_touch_the_score_files(settings):
+    sim = Simulation(settings)
+    policy = SweepPolicy()
+    for _ in range(2):
+        sim.restart()
+        while sim.game_active:
+            sim.step(policy(sim))
+        sim.game_stats.record_game()
+    sim.game_stats.save_scores()
+    assert sim.game_stats.store.games == 2
+    assert sim.game_stats.hi_score == max(record.score for record in sim.game_stats.store.top())
+    assert not settings.scores_file.exists()
+    assert not settings.scores_journal_file.exists()
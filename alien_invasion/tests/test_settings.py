@@ -0,0 +1,116 @@
+import json
+import os
+import pytest
+from settings import Settings
+from profile_watcher import ProfileWatcher
+from replay import MAGIC, VERSION, _HEADER, Recorder, Replay
+
+
+def test_difficulty_scale_change_takes_effect(settings):
+    settings.set_difficulty(1)
+    settings.apply_profile({'difficulty_scale': 2.0})
+    assert settings.fleet_speed == 8.0
+    settings.initialize_dynamic_settings()
+    settings.set_difficulty(1)
+    assert settings.fleet_speed == 8.0
+
+    fresh = Settings()
+    fresh.difficulty_scale = 2.0
+    fresh.initialize_dynamic_settings()
+    fresh.set_difficulty(1)
+    assert fresh.fleet_speed == settings.fleet_speed
+
+
+def test_dynamic_settings_keep_the_current_level(settings):
+    settings.set_difficulty(2)
+    settings.apply_profile({'fleet_speed': 5})
+    assert settings.fleet_speed == pytest.approx(5 * 1.1 ** 2)
+    assert settings.difficulty == 2
+
+
+@pytest.mark.parametrize('profile', [
+    {'fleet_speed': '6'},
+    {'bullet_amount': 2.5},
+    {'startup_report': 1},
+    {'render_mode': 3},
+    {'dynamic_overrides': {'fleet_speed': '6'}},
+    {'dynamic_overrides': {'no_such_setting': 1}},
+    {'formations': 'checker'},
+    {'fleet_drop_speed': 20, 'ship_speed': None},
+    {'difficulty_scale': 2.0, 'no_such_setting': 1},
+    {'fleet_speed': 5, 'difficulty': 4},
+    {'fleet_direction': -1},
+])
+def test_bad_profiles_change_nothing(settings, profile):
+    settings.set_difficulty(1)
+    before = settings.as_dict()
+    with pytest.raises((TypeError, ValueError)):
+        settings.apply_profile(profile)
+    assert settings.as_dict() == before
+
+
+def test_profile_values_are_converted(settings):
+    settings.apply_profile({'formations': ['rows'], 'asset_disk_cache': 'cache', 'fleet_speed': 5,
+                            'starfield_layers': [[10, 5, 100], [20, 10, 200]]})
+    assert settings.formations == ('rows',)
+    assert settings.starfield_layers == ((10, 5, 100), (20, 10, 200))
+    assert settings.asset_disk_cache.name == 'cache'
+    assert settings.fleet_speed == 5
+
+
+def touch(path, text, stamp):
+    path.write_text(text)
+    os.utime(path, ns=(stamp, stamp))
+
+
+@pytest.mark.parametrize('text', ['{"fleet_speed": ', '{"fleet_speed": "6"}', '{"fleet_sped": 6}'])
+def test_watcher_skips_broken_profiles(settings, tmp_path, text):
+    path = tmp_path / 'profile.json'
+    touch(path, json.dumps({'fleet_speed': 5}), 1_000_000_000)
+    settings.load_profile(path)
+    settings.profile_poll_interval = 0
+    watcher = ProfileWatcher(settings, path)
+    before = settings.as_dict()
+
+    touch(path, text, 2_000_000_000)
+    assert not watcher.poll()
+    assert settings.as_dict() == before
+
+    touch(path, json.dumps({'fleet_speed': 6}), 3_000_000_000)
+    assert watcher.poll()
+    assert settings.fleet_speed == 6
+
+
+def test_profile_isnt_reloaded_while_recording(settings, tmp_path):
+    from alien_invasion import AlienInvasion
+    path = tmp_path / 'profile.json'
+    path.write_text('{}')
+    assert AlienInvasion(settings, profile_path=path).profile_watcher
+    game = AlienInvasion(settings, record_path=tmp_path / 'session.air', profile_path=path)
+    assert game.profile_watcher is None
+    game.recorder.close()
+
+
+def test_replay_applies_the_recorded_settings_as_a_profile(make_settings, tmp_path):
+    settings = make_settings(formations=('rows', 'diamond'), difficulty_scale=1.5,
+                             dynamic_overrides={'fleet_speed': 6})
+    settings.initialize_dynamic_settings()
+    settings.set_difficulty(2)
+    Recorder(tmp_path / 'session.air', settings).close()
+
+    replayed = Replay(tmp_path / 'session.air').settings
+    assert replayed.formations == ('rows', 'diamond')
+    assert replayed.starfield_layers == settings.starfield_layers
+    assert replayed.button_color == settings.button_color
+    assert (replayed.difficulty, replayed.fleet_speed, replayed.difficulty_scale) == (0, 6, 1.5)
+
+
+def test_replay_reads_older_headers(tmp_path):
+    # Older recordings also held the dynamic settings and the game's state, which are left to the game.
+    header = json.dumps({'settings': {'fleet_speed': 9, 'difficulty': 3, 'fleet_direction': -1,
+                                      'formations': ['rows'], 'removed_setting': 1}}).encode()
+    path = tmp_path / 'old.air'
+    path.write_bytes(_HEADER.pack(MAGIC, VERSION, len(header)) + header)
+    replayed = Replay(path).settings
+    assert replayed.formations == ('rows',)
+    assert (replayed.difficulty, replayed.fleet_direction, replayed.fleet_speed) == (0, 1, 4)
@@ -0,0 +1,95 @@
+import numpy as np
+import pygame
+import pytest
+from renderer import Renderer
+from starfield import Starfield
+
+
+class Game:
+    def __init__(self, settings):
+        self.settings = settings
+        self.screen = pygame.Surface((settings.screen_w, settings.screen_h))
+
+
+@pytest.fixture
+def background(settings):
+    background = pygame.Surface((settings.screen_w, settings.screen_h))
+    background.fill((10, 20, 40))
+    pygame.draw.circle(background, (90, 60, 30), (600, 400), 300)
+    return background
+
+
+def expected_stars(starfield, background):
+    """
+    Returns background with every star drawn over it, nearest layer on top.
+    """
+    surface = background.copy()
+    pixels = pygame.surfarray.pixels2d(surface)
+    pixels[starfield.x, starfield.y] = pygame.surfarray.map_array(surface, starfield.color[None])[0]
+    del pixels
+    return pygame.surfarray.array2d(surface)
+
+
+@pytest.mark.parametrize('layers', [
+    None,
+    ((3000, 10, 110), (1500, 25, 170), (500, 60, 240)),
+    # Stars this dim are black, the same mapped color as an empty pixel.
+    ((2000, 10, 1), (2000, 25, 0), (500, 60, 240)),
+])
+def test_moved_stars_are_drawn_and_reported(make_settings, background, layers):
+    settings = make_settings() if layers is None else make_settings(starfield_layers=layers)
+    game = Game(settings)
+    starfield = Starfield(game, background)
+    game.screen.blit(starfield.surface, (0, 0))
+    screen = game.screen.get_rect()
+    for frame in range(120):
+        before = pygame.surfarray.array2d(starfield.surface)
+        starfield.update(1 / 60 if frame % 5 else 1 / 7)
+        after = pygame.surfarray.array2d(starfield.surface)
+        covered = np.zeros(after.shape, dtype=bool)
+        for rect in starfield.take_rects():
+            rect = rect.clip(screen)
+            covered[rect.left:rect.right, rect.top:rect.bottom] = True
+            game.screen.blit(starfield.surface, rect, rect)
+        assert not ((before != after) & ~covered).any()
+        assert np.array_equal(pygame.surfarray.array2d(game.screen), after)
+        if frame % 40 == 0:
+            assert np.array_equal(after, expected_stars(starfield, background))
+
+
+def test_updating_leaves_the_screen_to_the_renderer(settings, background):
+    game = Game(settings)
+    game.screen.fill((1, 2, 3))
+    starfield = Starfield(game, background)
+    for _ in range(30):
+        starfield.update(1 / 30)
+    assert starfield.take_rects()
+    assert not (pygame.surfarray.array2d(game.screen) != game.screen.map_rgb((1, 2, 3))).any()
+
+
+def test_default_stars_push_a_small_part_of_the_screen(settings, background):
+    starfield = Starfield(Game(settings), background)
+    areas = []
+    for _ in range(120):
+        starfield.update(1 / 60)
+        areas.append(sum(rect.width * rect.height for rect in starfield.take_rects()))
+    assert max(areas) < settings.screen_w * settings.screen_h * 0.1
+
+
+def test_updated_rects_count_towards_a_full_redraw(settings, background):
+    game = Game(settings)
+    game.screen = pygame.display.set_mode((settings.screen_w, settings.screen_h))
+    renderer = Renderer(game, background)
+    renderer.begin_frame([])
+    renderer.present()
+    assert renderer.full_redraws == 1
+
+    small = [pygame.Rect(0, row, 100, 8) for row in range(0, 80, 8)]
+    renderer.begin_frame([], small)
+    renderer.present()
+    assert renderer.dirty_frames == 1
+
+    most = [pygame.Rect(0, row, settings.screen_w, 8) for row in range(0, settings.screen_h * 3 // 4, 8)]
+    renderer.begin_frame([], most)
+    renderer.present()
+    assert renderer.full_redraws == 2
@@ -0,0 +1,18 @@
+from batch_runner import SessionSpec, run_session
+from profiler import FrameProfiler
+from simulation import Simulation, FrameInput
+
+
+def test_survival_time_follows_the_simulation_rate():
+    result = run_session(SessionSpec(0, {'sim_rate': 120, 'FPS': 30}, 'sweep', 0, 600))
+    assert result['survival_s'] == result['ticks'] / 120
+
+
+def test_each_step_charges_its_own_collision_checks(settings):
+    sim = Simulation(settings)
+    sim.profiler = profiler = FrameProfiler(4)
+    sim.restart()
+    profiler.start()
+    sim.step(FrameInput(fire=True))
+    profiler.end_frame()
+    assert profiler.column(FrameProfiler.COLLISIONS)[0] > 0
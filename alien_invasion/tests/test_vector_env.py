@@ -0,0 +1,40 @@
+import numpy as np
+from simulation import Simulation, FrameInput
+from vector_env import VectorEnv, UP, DOWN, FIRE
+
+ENVS = 4
+
+
+def test_vector_env_matches_simulation_over_many_episodes(make_settings):
+    # One life per game and a fast-dropping fleet, so every env finishes several episodes.
+    overrides = {'starting_ship_count': 0, 'fleet_drop_speed': 60}
+    env = VectorEnv(ENVS, make_settings(dynamic_overrides=overrides))
+    sims = [Simulation(make_settings(dynamic_overrides=overrides)) for _ in range(ENVS)]
+    for sim in sims:
+        sim.restart()
+    obs = env.reset()
+    rng = np.random.default_rng(5)
+    actions = np.zeros(ENVS, dtype=np.int64)
+
+    for step in range(6000):
+        if step % 20 == 0:
+            actions = rng.integers(0, 8, ENVS)
+        obs, rewards, done = env.step(actions)
+        for index, sim in enumerate(sims):
+            action = int(actions[index])
+            score = sim.game_stats.score
+            sim.step(FrameInput(bool(action & UP), bool(action & DOWN), bool(action & FIRE)))
+            assert rewards[index] == sim.game_stats.score - score
+            assert done[index] == (not sim.game_active)
+            if done[index]:
+                assert env.final_scores[index] == sim.game_stats.score
+                sim.restart()
+            assert obs['score'][index] == sim.game_stats.score
+            assert env.level[index] == sim.game_stats.level
+            assert obs['ship_y'][index] == sim.ship.rect.y
+            assert obs['alien_alive'][index].sum() == len(sim.alien_fleet.fleet)
+            bullets = sorted(tuple(bullet.rect.topleft) for bullet in sim.ship.arsenal.arsenal)
+            active = obs['bullet_active'][index]
+            assert bullets == sorted(tuple(xy) for xy in obs['bullets'][index][active].tolist())
+
+    assert env.episodes.min() >= 3
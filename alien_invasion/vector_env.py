@@ -0,0 +1,287 @@
+import numpy as np
+from settings import Settings
+from array_fleet import round_half_away
+from formations import level_formations
+
+UP = 1
+DOWN = 2
+FIRE = 4
+
+_FAR = 1 << 40
+
+
+def _formation_homes(settings: Settings):
+    """
+    Returns the x and y of every alien's place in each level's formation, in the order AlienFleet.create_fleet
+    makes them, padded to the largest formation, and which of those places hold an alien.
+    """
+    layouts = [formation.layout(settings.screen_w, settings.screen_h, settings.alien_w, settings.alien_h)
+               for formation in level_formations(settings)]
+    size = max(len(homes) for homes in layouts)
+    xs = np.zeros((len(layouts), size), dtype=np.int64)
+    ys = np.zeros((len(layouts), size), dtype=np.int64)
+    used = np.zeros((len(layouts), size), dtype=bool)
+    for index, homes in enumerate(layouts):
+        if homes:
+            xs[index, :len(homes)], ys[index, :len(homes)] = zip(*homes)
+        used[index, :len(homes)] = True
+    return xs, ys, used
+
+
+class VectorEnv:
+    """
+    Runs many independent games in lockstep for training agents.  The VectorEnv class is responsible for:
+    -  Keeping the ship, bullets, fleet and stats of every game in stacked NumPy arrays.
+    -  Advancing every game one step with a handful of array operations, however many games there are.
+    -  Returning observations, rewards and done flags for all games at once.
+
+    The rules follow Simulation.step: fire, move the ship and bullets, move the fleet, then check the ship,
+    the right edge, the bullets and the level.  Bullets are used up by the first alien they hit, the same
+    as groupcollide, so a VectorEnv and a Simulation restarted whenever its game ends, given the same inputs,
+    play the same games, episode after episode.  Collisions are always rect overlaps;
+    settings.collision_precision 'mask' games are only matched by a Simulation.
+
+    Actions are bit masks of UP, DOWN and FIRE, one per game.  Games that end are reset straight away;
+    their final score is kept in final_scores and the observation returned is the start of the new game.
+
+    Attributes:
+        num_envs (int): How many games are run.
+        score (numpy.ndarray): Each game's score.
+        level (numpy.ndarray): Each game's level.
+        ships_left (numpy.ndarray): Each game's remaining lives.
+        final_scores (numpy.ndarray): The score each game ended its last episode with.
+        episodes (numpy.ndarray): How many episodes each game has finished.
+
+    Methods:
+        __init__(self, num_envs, settings): Initializes the games.
+        reset(self): Starts a new game in every env and returns the observations.
+        step(self, actions): Advances every game by one step.
+        observe(self): Returns the current observations.
+    """
+    def __init__(self, num_envs: int, settings: Settings = None):
+        """
+        Initializes the games.
+
+        Args:
+            num_envs (int): How many games to run.
+            settings (Settings): The settings to play with. A default Settings is made if None.
+        """
+        if settings is None:
+            settings = Settings()
+        settings.initialize_dynamic_settings()
+        self.settings = settings
+        self.num_envs = num_envs
+        n = num_envs
+
+        self.screen_w = settings.screen_w
+        self.screen_h = settings.screen_h
+        self.ship_x = settings.screen_w - settings.ship_w
+        self.ship_center_y = settings.screen_h // 2 - settings.ship_h // 2
+        self.bullet_drop = settings.ship_h // 2 - settings.bullet_h // 2
+        self._formation_x, self._formation_y, self._formation_used = _formation_homes(settings)
+        aliens = self._formation_x.shape[1]
+        bullets = settings.bullet_amount
+
+        self.ship_y = np.zeros(n)
+        self.ship_top = np.zeros(n, dtype=np.int64)
+        self.bullet_x = np.zeros((n, bullets))
+        self.bullet_left = np.zeros((n, bullets), dtype=np.int64)
+        self.bullet_top = np.zeros((n, bullets), dtype=np.int64)
+        self.bullet_active = np.zeros((n, bullets), dtype=bool)
+        self.home_x = np.zeros((n, aliens), dtype=np.int64)
+        self.home_y = np.zeros((n, aliens), dtype=np.int64)
+        self.alive = np.ones((n, aliens), dtype=bool)
+        self.offset_x = np.zeros(n)
+        self.offset_y = np.zeros(n)
+        self.direction = np.ones(n, dtype=np.int64)
+
+        self.ship_speed = np.zeros(n)
+        self.bullet_speed = np.zeros(n)
+        self.fleet_speed = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.ships_left = np.zeros(n, dtype=np.int64)
+        self.final_scores = np.zeros(n, dtype=np.int64)
+        self.episodes = np.zeros(n, dtype=np.int64)
+
+        self._all = np.ones(n, dtype=bool)
+        self._rows = np.arange(n)
+        self._reset_games(self._all)
+
+    def reset(self):
+        """
+        Starts a new game in every env and returns the observations.
+        """
+        self._reset_games(self._all)
+        self.final_scores[:] = 0
+        self.episodes[:] = 0
+        return self.observe()
+
+    def _reset_games(self, mask):
+        """
+        Starts a new game in every env where mask is set, like Simulation.restart.
+        """
+        settings = self.settings
+        self.ship_speed[mask] = settings.ship_speed
+        self.bullet_speed[mask] = settings.bullet_speed
+        self.fleet_speed[mask] = settings.fleet_speed
+        self.direction[mask] = 1
+        self.score[mask] = 0
+        self.level[mask] = 1
+        self.ships_left[mask] = settings.starting_ship_count
+        self._center_ships(mask)
+        self._reset_levels(mask)
+
+    def _center_ships(self, mask):
+        self.ship_y[mask] = self.ship_center_y
+        self.ship_top[mask] = self.ship_center_y
+
+    def _reset_levels(self, mask):
+        """
+        Clears the bullets and re-generates the fleet, in its level's formation, in every env where mask is set.
+        """
+        formation = (self.level[mask] - 1) % len(self._formation_used)
+        self.bullet_active[mask] = False
+        self.home_x[mask] = self._formation_x[formation]
+        self.home_y[mask] = self._formation_y[formation]
+        self.alive[mask] = self._formation_used[formation]
+        self.offset_x[mask] = 0.0
+        self.offset_y[mask] = 0.0
+
+    def _lose_lives(self, mask, game_over):
+        """
+        Uses up a life in every env where mask is set, or ends the game if there are none left.
+        """
+        has_ships = self.ships_left > 0
+        lost = mask & has_ships
+        self.ships_left -= lost
+        self._reset_levels(lost)
+        game_over |= mask & ~has_ships
+
+    def _pixel_offsets(self):
+        return np.floor(self.offset_x + 0.5).astype(np.int64), np.floor(self.offset_y + 0.5).astype(np.int64)
+
+    def _bounds(self, home, extent):
+        """
+        Returns the lowest home and the highest home + extent of the living aliens in each env.
+        """
+        low = np.where(self.alive, home, _FAR).min(axis=1)
+        high = np.where(self.alive, home + extent, -_FAR).max(axis=1)
+        return low, high
+
+    def step(self, actions):
+        """
+        Advances every game by one step.
+
+        Args:
+            actions (numpy.ndarray): One bit mask of UP, DOWN and FIRE per game.
+
+        Returns:
+            tuple: The observations, each game's reward (alien_points per alien shot) and each game's done flag.
+        """
+        settings = self.settings
+        actions = np.asarray(actions)
+        up = (actions & UP) != 0
+        down = (actions & DOWN) != 0
+        fire = (actions & FIRE) != 0
+
+        # Fire into the first free bullet slot.
+        active = self.bullet_active
+        firing = np.nonzero(fire & (active.sum(axis=1) < settings.bullet_amount))[0]
+        slots = np.argmin(active[firing], axis=1)
+        active[firing, slots] = True
+        self.bullet_x[firing, slots] = self.ship_x
+        self.bullet_top[firing, slots] = self.ship_top[firing] + self.bullet_drop
+
+        # Move the ship, then the bullets.
+        self.ship_y -= self.ship_speed * (up & (self.ship_top > 0))
+        self.ship_y += self.ship_speed * (down & (self.ship_top + settings.ship_h < self.screen_h))
+        self.ship_top = round_half_away(self.ship_y)
+        self.bullet_x -= self.bullet_speed[:, None]
+        self.bullet_left = round_half_away(self.bullet_x)
+        active &= (self.bullet_left + settings.bullet_w > 0) & (self.bullet_left < self.screen_w)
+
+        # Move the fleet, dropping it and turning around at the top and bottom.
+        top, bottom = self._bounds(self.home_y, settings.alien_h)
+        pixel_y = self._pixel_offsets()[1]
+        at_edge = (bottom + pixel_y >= self.screen_h) | (top + pixel_y <= 0)
+        self.offset_x += settings.fleet_drop_speed * at_edge
+        self.direction[at_edge] *= -1
+        self.offset_y += self.fleet_speed * self.direction
+
+        game_over = np.zeros(self.num_envs, dtype=bool)
+
+        # The ship against the fleet.
+        pixel_x, pixel_y = self._pixel_offsets()
+        alien_x = self.home_x + pixel_x[:, None]
+        alien_y = self.home_y + pixel_y[:, None]
+        ship_top = self.ship_top[:, None]
+        rammed = (self.alive
+                  & (alien_x < self.ship_x + settings.ship_w) & (alien_x + settings.alien_w > self.ship_x)
+                  & (alien_y < ship_top + settings.ship_h) & (alien_y + settings.alien_h > ship_top)).any(axis=1)
+        self._center_ships(rammed)
+        self._lose_lives(rammed, game_over)
+
+        # The fleet against the right edge.
+        right = self._bounds(self.home_x, settings.alien_w)[1]
+        self._lose_lives(right + self._pixel_offsets()[0] >= self.screen_w, game_over)
+
+        # The bullets against the fleet; each bullet is used up by the first alien it hits.
+        rewards = np.zeros(self.num_envs, dtype=np.int64)
+        shooting = np.nonzero(self.bullet_active.any(axis=1))[0]
+        if len(shooting):
+            pixel_x, pixel_y = self._pixel_offsets()
+            alien_x = (self.home_x[shooting] + pixel_x[shooting, None])[:, None, :]
+            alien_y = (self.home_y[shooting] + pixel_y[shooting, None])[:, None, :]
+            bullet_x = self.bullet_left[shooting, :, None]
+            bullet_y = self.bullet_top[shooting, :, None]
+            overlap = (self.bullet_active[shooting, :, None] & self.alive[shooting, None, :]
+                       & (bullet_x < alien_x + settings.alien_w) & (bullet_x + settings.bullet_w > alien_x)
+                       & (bullet_y < alien_y + settings.alien_h) & (bullet_y + settings.bullet_h > alien_y))
+            hit = overlap.any(axis=2)
+            games, bullets = np.nonzero(hit)
+            targets = overlap[games, bullets].argmax(axis=1)
+            killed = np.zeros(self.alive.shape, dtype=bool)
+            killed[shooting[games], targets] = True
+            self.alive &= ~killed
+            self.bullet_active[shooting[games], bullets] = False
+            rewards = killed.sum(axis=1) * settings.alien_points
+            self.score += rewards
+
+        # Start the next level wherever the fleet was destroyed.
+        cleared = ~self.alive.any(axis=1)
+        if cleared.any():
+            scale = np.where(cleared, settings.difficulty_scale, 1.0)
+            self.ship_speed *= scale
+            self.bullet_speed *= scale
+            self.fleet_speed *= scale
+            self.level += cleared
+            self._reset_levels(cleared)
+
+        if game_over.any():
+            self.final_scores[game_over] = self.score[game_over]
+            self.episodes += game_over
+            self._reset_games(game_over)
+        return self.observe(), rewards, game_over
+
+    def observe(self):
+        """
+        Returns the current observations as a dict of stacked arrays:
+        ship_y (N), bullets (N, bullets, 2) and bullet_active (N, bullets), aliens (N, aliens, 2) and
+        alien_alive (N, aliens), lives (N) and score (N).  Positions are the top left corners on the screen.
+        Each formation is padded to the largest one's size; the padding is never alive.
+        """
+        pixel_x, pixel_y = self._pixel_offsets()
+        aliens = np.empty(self.alive.shape + (2,), dtype=np.int64)
+        aliens[..., 0] = self.home_x + pixel_x[:, None]
+        aliens[..., 1] = self.home_y + pixel_y[:, None]
+        bullets = np.stack((self.bullet_left, self.bullet_top), axis=-1)
+        return {
+            'ship_y': self.ship_top.copy(),
+            'bullets': bullets,
+            'bullet_active': self.bullet_active.copy(),
+            'aliens': aliens,
+            'alien_alive': self.alive.copy(),
+            'lives': self.ships_left.copy(),
+            'score': self.score.copy(),
+        }